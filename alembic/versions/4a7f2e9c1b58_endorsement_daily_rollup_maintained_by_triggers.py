@@ -0,0 +1,108 @@
+"""endorsement_daily_rollup table (kg endorsed per day, prodcode, category and status) maintained by triggers on endorsement table1
+
+Revision ID: 4a7f2e9c1b58
+Revises: e1b4d7c2a9f6
+Create Date: 2026-10-19 13:48:30.102644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a7f2e9c1b58'
+down_revision: Union[str, Sequence[str], None] = 'e1b4d7c2a9f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_KEY = "t_date_endorsed, t_prodcode, t_category, t_status"
+
+# ADDS kg/endorsements TO ONE ROLLUP ROW (NEGATIVE VALUES REMOVE), A ROW THAT COUNTS NO ENDORSEMENT IS DELETED
+ADD_TO_ROLLUP_FUNCTION = f"""
+    CREATE OR REPLACE FUNCTION add_to_endorsement_daily_rollup(
+        for_date date, prodcode text, category text, status text, kg double precision, endorsements integer
+    ) RETURNS void
+    LANGUAGE sql AS $$
+        INSERT INTO endorsement_daily_rollup AS rollup ({ROLLUP_KEY}, total_kg, endorsement_count, updated_at)
+        VALUES (for_date, prodcode, category, status, kg, endorsements, now())
+        ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+            total_kg = rollup.total_kg + EXCLUDED.total_kg,
+            endorsement_count = rollup.endorsement_count + EXCLUDED.endorsement_count,
+            updated_at = now();
+
+        DELETE FROM endorsement_daily_rollup
+        WHERE t_date_endorsed = for_date AND t_prodcode = prodcode AND t_category = category AND t_status = status
+          AND endorsement_count <= 0;
+    $$
+"""
+
+# ONLY ACTIVE ENDORSEMENTS ARE COUNTED: A SOFT DELETE REMOVES THE ROW FROM THE ROLLUP, AN UNDELETE ADDS IT BACK
+ROLLUP_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION maintain_endorsement_daily_rollup() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_deleted THEN
+            PERFORM add_to_endorsement_daily_rollup(
+                OLD.t_date_endorsed, OLD.t_prodcode, OLD.t_category::text, OLD.t_status::text, -OLD.t_qtykg, -1
+            );
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_deleted THEN
+            PERFORM add_to_endorsement_daily_rollup(
+                NEW.t_date_endorsed, NEW.t_prodcode, NEW.t_category::text, NEW.t_status::text, NEW.t_qtykg, 1
+            );
+        END IF;
+
+        RETURN NULL;
+    END
+    $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'endorsement_daily_rollup',
+        sa.Column('t_date_endorsed', sa.Date(), nullable=False),
+        sa.Column('t_prodcode', sa.String(), nullable=False),
+        sa.Column('t_category', sa.String(), nullable=False),
+        sa.Column('t_status', sa.String(), nullable=False),
+        sa.Column('total_kg', sa.Float(), nullable=False, server_default=sa.text('0'), comment="Sum of t_qtykg of the active endorsements."),
+        sa.Column('endorsement_count', sa.Integer(), nullable=False, server_default=sa.text('0'), comment="Number of active endorsements."),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('t_date_endorsed', 't_prodcode', 't_category', 't_status'),
+        comment="Kg endorsed per day, prodcode, category and status. Maintained by the trigger trg_tbl_endorsement_t1_daily_rollup."
+    )
+    op.create_index('ix_endorsement_daily_rollup_prodcode_date', 'endorsement_daily_rollup', ['t_prodcode', 't_date_endorsed'])
+
+    op.execute(ADD_TO_ROLLUP_FUNCTION)
+    op.execute(ROLLUP_TRIGGER_FUNCTION)
+
+    # ------ BACKFILL: NO SAVE MAY HAPPEN BETWEEN THE SNAPSHOT AND THE TRIGGER (LOCK HELD UNTIL THE END OF THE MIGRATION) ------
+    op.execute("LOCK TABLE tbl_endorsement_t1 IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(f"""
+        INSERT INTO endorsement_daily_rollup ({ROLLUP_KEY}, total_kg, endorsement_count)
+        SELECT t_date_endorsed, t_prodcode, t_category::text, t_status::text, SUM(t_qtykg), COUNT(*)
+        FROM tbl_endorsement_t1
+        WHERE is_deleted = false
+        GROUP BY t_date_endorsed, t_prodcode, t_category, t_status
+    """)
+
+    # ONLY THE COLUMNS OF THE ROLLUP KEY, THE QUANTITY AND THE SOFT DELETE FLAG CHANGE THE ROLLUP
+    op.execute("""
+        CREATE TRIGGER trg_tbl_endorsement_t1_daily_rollup
+        AFTER INSERT OR DELETE OR UPDATE OF t_date_endorsed, t_prodcode, t_category, t_status, t_qtykg, is_deleted
+        ON tbl_endorsement_t1
+        FOR EACH ROW EXECUTE FUNCTION maintain_endorsement_daily_rollup()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_tbl_endorsement_t1_daily_rollup ON tbl_endorsement_t1")
+    op.execute("DROP FUNCTION IF EXISTS maintain_endorsement_daily_rollup()")
+    op.execute("DROP FUNCTION IF EXISTS add_to_endorsement_daily_rollup(date, text, text, text, double precision, integer)")
+    op.drop_index('ix_endorsement_daily_rollup_prodcode_date', table_name='endorsement_daily_rollup')
+    op.drop_table('endorsement_daily_rollup')
@@ -0,0 +1,212 @@
+"""excess kg of an endorsement (t_excess_kg) kept by trigger from the lot excess rows, excess_kg in endorsement_daily_rollup
+
+Revision ID: 7d2c5e8a3f14
+Revises: 4a7f2e9c1b58
+Create Date: 2026-10-19 14:31:52.660318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2c5e8a3f14'
+down_revision: Union[str, Sequence[str], None] = '4a7f2e9c1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_KEY = "t_date_endorsed, t_prodcode, t_category, t_status"
+
+# tbl_endorsement_t1.t_excess_kg FOLLOWS THE tbl_endorsement_lot_excess ROWS OF ITS LOTS. WHEN A DELETE OF t1
+# CASCADES TO THE EXCESS ROWS THE PARENT IS ALREADY GONE (NOTHING TO UPDATE), THE ROLLUP TRIGGER OF t1 HAS
+# ALREADY REMOVED ITS t_excess_kg
+EXCESS_KG_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION maintain_endorsement_excess_kg() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE tbl_endorsement_t1 t1 SET t_excess_kg = t1.t_excess_kg - OLD.t_excess_amount
+            FROM tbl_endorsement_t2 t2
+            WHERE t2.t_id = OLD.tbl_endorsement_t2_ref AND t2.t_date_endorsed = OLD.t2_date_endorsed
+              AND t1.t_id = t2.t1_id;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE tbl_endorsement_t1 t1 SET t_excess_kg = t1.t_excess_kg + NEW.t_excess_amount
+            FROM tbl_endorsement_t2 t2
+            WHERE t2.t_id = NEW.tbl_endorsement_t2_ref AND t2.t_date_endorsed = NEW.t2_date_endorsed
+              AND t1.t_id = t2.t1_id;
+        END IF;
+
+        RETURN NULL;
+    END
+    $$
+"""
+
+# SAME AS 4a7f2e9c1b58 WITH THE EXCESS KG
+ADD_TO_ROLLUP_FUNCTION = f"""
+    CREATE OR REPLACE FUNCTION add_to_endorsement_daily_rollup(
+        for_date date, prodcode text, category text, status text,
+        kg double precision, excess double precision, endorsements integer
+    ) RETURNS void
+    LANGUAGE sql AS $$
+        INSERT INTO endorsement_daily_rollup AS rollup ({ROLLUP_KEY}, total_kg, excess_kg, endorsement_count, updated_at)
+        VALUES (for_date, prodcode, category, status, kg, excess, endorsements, now())
+        ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+            total_kg = rollup.total_kg + EXCLUDED.total_kg,
+            excess_kg = rollup.excess_kg + EXCLUDED.excess_kg,
+            endorsement_count = rollup.endorsement_count + EXCLUDED.endorsement_count,
+            updated_at = now();
+
+        DELETE FROM endorsement_daily_rollup
+        WHERE t_date_endorsed = for_date AND t_prodcode = prodcode AND t_category = category AND t_status = status
+          AND endorsement_count <= 0;
+    $$
+"""
+
+ROLLUP_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION maintain_endorsement_daily_rollup() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_deleted THEN
+            PERFORM add_to_endorsement_daily_rollup(
+                OLD.t_date_endorsed, OLD.t_prodcode, OLD.t_category::text, OLD.t_status::text,
+                -OLD.t_qtykg, -OLD.t_excess_kg, -1
+            );
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_deleted THEN
+            PERFORM add_to_endorsement_daily_rollup(
+                NEW.t_date_endorsed, NEW.t_prodcode, NEW.t_category::text, NEW.t_status::text,
+                NEW.t_qtykg, NEW.t_excess_kg, 1
+            );
+        END IF;
+
+        RETURN NULL;
+    END
+    $$
+"""
+
+# 4a7f2e9c1b58 VERSIONS (downgrade)
+ADD_TO_ROLLUP_FUNCTION_V1 = f"""
+    CREATE OR REPLACE FUNCTION add_to_endorsement_daily_rollup(
+        for_date date, prodcode text, category text, status text, kg double precision, endorsements integer
+    ) RETURNS void
+    LANGUAGE sql AS $$
+        INSERT INTO endorsement_daily_rollup AS rollup ({ROLLUP_KEY}, total_kg, endorsement_count, updated_at)
+        VALUES (for_date, prodcode, category, status, kg, endorsements, now())
+        ON CONFLICT ({ROLLUP_KEY}) DO UPDATE SET
+            total_kg = rollup.total_kg + EXCLUDED.total_kg,
+            endorsement_count = rollup.endorsement_count + EXCLUDED.endorsement_count,
+            updated_at = now();
+
+        DELETE FROM endorsement_daily_rollup
+        WHERE t_date_endorsed = for_date AND t_prodcode = prodcode AND t_category = category AND t_status = status
+          AND endorsement_count <= 0;
+    $$
+"""
+
+ROLLUP_TRIGGER_FUNCTION_V1 = """
+    CREATE OR REPLACE FUNCTION maintain_endorsement_daily_rollup() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_deleted THEN
+            PERFORM add_to_endorsement_daily_rollup(
+                OLD.t_date_endorsed, OLD.t_prodcode, OLD.t_category::text, OLD.t_status::text, -OLD.t_qtykg, -1
+            );
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_deleted THEN
+            PERFORM add_to_endorsement_daily_rollup(
+                NEW.t_date_endorsed, NEW.t_prodcode, NEW.t_category::text, NEW.t_status::text, NEW.t_qtykg, 1
+            );
+        END IF;
+
+        RETURN NULL;
+    END
+    $$
+"""
+
+def create_rollup_trigger(columns: str) -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_tbl_endorsement_t1_daily_rollup ON tbl_endorsement_t1")
+    op.execute(f"""
+        CREATE TRIGGER trg_tbl_endorsement_t1_daily_rollup
+        AFTER INSERT OR DELETE OR UPDATE OF {columns}
+        ON tbl_endorsement_t1
+        FOR EACH ROW EXECUTE FUNCTION maintain_endorsement_daily_rollup()
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NO SAVE UNTIL THE END OF THE MIGRATION: THE BACKFILLS AND THE TRIGGERS SEE THE SAME ROWS
+    op.execute("LOCK TABLE tbl_endorsement_t1 IN SHARE ROW EXCLUSIVE MODE")
+
+    # ------ t_excess_kg OF EVERY ENDORSEMENT ------
+    op.add_column(
+        'tbl_endorsement_t1',
+        sa.Column(
+            't_excess_kg',
+            sa.Float(),
+            nullable=False,
+            server_default=sa.text('0'),
+            comment="Sum of the tbl_endorsement_lot_excess amounts of the lots, kept by trigger."
+        )
+    )
+    op.add_column('tbl_endorsement_t1_archive', sa.Column('t_excess_kg', sa.Float(), nullable=True))
+
+    op.execute("""
+        UPDATE tbl_endorsement_t1 t1
+        SET t_excess_kg = excess.total
+        FROM (
+            SELECT t2.t1_id, SUM(e.t_excess_amount) AS total
+            FROM tbl_endorsement_lot_excess e
+            JOIN tbl_endorsement_t2 t2 ON t2.t_id = e.tbl_endorsement_t2_ref AND t2.t_date_endorsed = e.t2_date_endorsed
+            GROUP BY t2.t1_id
+        ) excess
+        WHERE t1.t_id = excess.t1_id
+    """)
+
+    op.execute(EXCESS_KG_TRIGGER_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER trg_tbl_endorsement_lot_excess_excess_kg
+        AFTER INSERT OR DELETE OR UPDATE OF t_excess_amount
+        ON tbl_endorsement_lot_excess
+        FOR EACH ROW EXECUTE FUNCTION maintain_endorsement_excess_kg()
+    """)
+
+    # ------ excess_kg IN THE DAILY ROLLUP (REBUILT FROM THE ACTIVE ENDORSEMENTS) ------
+    op.add_column(
+        'endorsement_daily_rollup',
+        sa.Column('excess_kg', sa.Float(), nullable=False, server_default=sa.text('0'), comment="Sum of t_excess_kg of the active endorsements.")
+    )
+
+    op.execute("DROP FUNCTION IF EXISTS add_to_endorsement_daily_rollup(date, text, text, text, double precision, integer)")
+    op.execute(ADD_TO_ROLLUP_FUNCTION)
+    op.execute(ROLLUP_TRIGGER_FUNCTION)
+    create_rollup_trigger("t_date_endorsed, t_prodcode, t_category, t_status, t_qtykg, t_excess_kg, is_deleted")
+
+    op.execute("DELETE FROM endorsement_daily_rollup")
+    op.execute(f"""
+        INSERT INTO endorsement_daily_rollup ({ROLLUP_KEY}, total_kg, excess_kg, endorsement_count)
+        SELECT t_date_endorsed, t_prodcode, t_category::text, t_status::text, SUM(t_qtykg), SUM(t_excess_kg), COUNT(*)
+        FROM tbl_endorsement_t1
+        WHERE is_deleted = false
+        GROUP BY t_date_endorsed, t_prodcode, t_category, t_status
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS add_to_endorsement_daily_rollup(date, text, text, text, double precision, double precision, integer)")
+    op.execute(ADD_TO_ROLLUP_FUNCTION_V1)
+    op.execute(ROLLUP_TRIGGER_FUNCTION_V1)
+    create_rollup_trigger("t_date_endorsed, t_prodcode, t_category, t_status, t_qtykg, is_deleted")
+    op.drop_column('endorsement_daily_rollup', 'excess_kg')
+
+    op.execute("DROP TRIGGER IF EXISTS trg_tbl_endorsement_lot_excess_excess_kg ON tbl_endorsement_lot_excess")
+    op.execute("DROP FUNCTION IF EXISTS maintain_endorsement_excess_kg()")
+    op.drop_column('tbl_endorsement_t1_archive', 't_excess_kg')
+    op.drop_column('tbl_endorsement_t1', 't_excess_kg')
@@ -0,0 +1,38 @@
+"""partial index on the single lot number of the active endorsement table2 rows
+
+Revision ID: 85b1b8399bac
+Revises: 88473d29176b
+Create Date: 2026-10-19 11:31:07.264518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '85b1b8399bac'
+down_revision: Union[str, Sequence[str], None] = '88473d29176b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ROWS SAVED BEFORE THE ORM DEFAULT WAS SET HAVE NULL, THEY ARE ACTIVE AND MUST BE IN THE PARTIAL INDEX
+    op.execute("UPDATE tbl_endorsement_t2 SET is_deleted = false WHERE is_deleted IS NULL")
+
+    # NOT UNIQUE: THE SAME SINGLE LOT IS STORED MORE THAN ONCE BY DESIGN (EXCESS ROW OF A SINGLE LOT,
+    # QUANTITY ADDED TO AN EXISTING LOT), THE INDEX ONLY MAKES THE DUPLICATE CHECK OF THE SAVE AN INDEX PROBE
+    op.create_index(
+        'ix_tbl_endorsement_t2_lotnumbersingle_active',
+        'tbl_endorsement_t2',
+        ['t_lotnumbersingle'],
+        postgresql_where=sa.text('is_deleted = false')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tbl_endorsement_t2_lotnumbersingle_active', table_name='tbl_endorsement_t2')
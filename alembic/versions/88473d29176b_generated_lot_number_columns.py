@@ -0,0 +1,55 @@
+"""generated lot number columns (lot_start_num, lot_end_num, lot_suffix) with indexes on both endorsement tables
+
+Revision ID: 88473d29176b
+Revises: b597257f8202
+Create Date: 2026-10-19 10:48:52.907133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88473d29176b'
+down_revision: Union[str, Sequence[str], None] = 'b597257f8202'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SAME EXPRESSIONS AS models.Endorsement (a single lot has lot_start_num = lot_end_num).
+# A LOT NUMBER THAT DOES NOT START WITH 4 DIGITS GIVES NULL INSTEAD OF FAILING THE MIGRATION.
+def start_num(column: str) -> str:
+    return f"(substring({column} from '^([0-9]{{4}})'))::integer"
+
+def end_num(column: str) -> str:
+    return f"(substring(COALESCE(NULLIF(split_part({column}, '-', 2), ''), {column}) from '^([0-9]{{4}})'))::integer"
+
+def suffix(column: str) -> str:
+    return f"substring(split_part({column}, '-', 1) from '^[0-9]{{4}}(.*)$')"
+
+LOT_COLUMNS = {
+    'tbl_endorsement_t1': 't_lotnumberwhole',
+    'tbl_endorsement_t2': 't_lotnumbersingle',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED GENERATED COLUMNS ARE COMPUTED FOR THE EXISTING ROWS WHEN THEY ARE ADDED (TABLE REWRITE)
+    for table, column in LOT_COLUMNS.items():
+        op.add_column(table, sa.Column('lot_start_num', sa.Integer(), sa.Computed(start_num(column), persisted=True), nullable=True))
+        op.add_column(table, sa.Column('lot_end_num', sa.Integer(), sa.Computed(end_num(column), persisted=True), nullable=True))
+        op.add_column(table, sa.Column('lot_suffix', sa.String(), sa.Computed(suffix(column), persisted=True), nullable=True))
+
+        # EQUALITY ON THE SUFFIX, RANGE ON THE START (lot_end_num IS CHECKED FROM THE INDEX ENTRY)
+        op.create_index(f'ix_{table}_lot_range', table, ['lot_suffix', 'lot_start_num', 'lot_end_num'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in LOT_COLUMNS:
+        op.drop_index(f'ix_{table}_lot_range', table_name=table)
+        op.drop_column(table, 'lot_suffix')
+        op.drop_column(table, 'lot_end_num')
+        op.drop_column(table, 'lot_start_num')
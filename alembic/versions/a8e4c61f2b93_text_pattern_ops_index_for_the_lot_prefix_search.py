@@ -0,0 +1,36 @@
+"""text_pattern_ops partial index on the whole lot number of the active endorsements for the prefix search of the list view
+
+Revision ID: a8e4c61f2b93
+Revises: 7d2c5e8a3f14
+Create Date: 2026-10-19 16:12:40.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e4c61f2b93'
+down_revision: Union[str, Sequence[str], None] = '7d2c5e8a3f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # LIKE '1234A%' CAN ONLY USE A text_pattern_ops INDEX (THE UNIQUE INDEX USES THE DATABASE COLLATION),
+    # PARTIAL LIKE THE OTHER INDEXES OF THE LIST VIEW: SOFT DELETED ROWS ARE NEVER LISTED
+    op.create_index(
+        'ix_tbl_endorsement_t1_lotnumberwhole_prefix',
+        'tbl_endorsement_t1',
+        ['t_lotnumberwhole'],
+        postgresql_ops={'t_lotnumberwhole': 'text_pattern_ops'},
+        postgresql_where=sa.text('is_deleted = false')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tbl_endorsement_t1_lotnumberwhole_prefix', table_name='tbl_endorsement_t1')
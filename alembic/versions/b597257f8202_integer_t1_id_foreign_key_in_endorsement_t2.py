@@ -0,0 +1,128 @@
+"""integer t1_id foreign key in endorsement table2, retire the t_refno foreign key
+
+Revision ID: b597257f8202
+Revises: d5d3d06c7410
+Create Date: 2026-10-19 10:04:18.552013
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b597257f8202'
+down_revision: Union[str, Sequence[str], None] = 'd5d3d06c7410'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# endorsement_combined (see d5d3d06c7410) WITH THE PARENT/CHILD JOIN GIVEN AS A PARAMETER
+COMBINED_SELECT = """
+    SELECT
+        t1.t_id AS id,
+        t1.t_refno,
+        t1.t_lotnumberwhole AS t_lot_number,
+        t1.t_date_endorsed,
+        SUM(t2.t_qty) AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        MIN(t2.t_bag_num)::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t1'::text AS t_source_table
+    FROM tbl_endorsement_t1 t1
+    JOIN tbl_endorsement_t2 t2 ON {join}
+    GROUP BY t1.t_id
+
+    UNION ALL
+
+    SELECT
+        t2.t_id AS id,
+        t2.t_refno,
+        t2.t_lotnumbersingle AS t_lot_number,
+        t1.t_date_endorsed,
+        t2.t_qty AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        t2.t_bag_num::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t2'::text AS t_source_table
+    FROM tbl_endorsement_t2 t2
+    LEFT JOIN tbl_endorsement_t1 t1 ON {join}
+"""
+
+def recreate_combined_view(join: str) -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.endorsement_combined")
+    op.execute(f"CREATE MATERIALIZED VIEW public.endorsement_combined AS {COMBINED_SELECT.format(join=join)} WITH DATA")
+    op.execute("CREATE UNIQUE INDEX ix_endorsement_combined_source_id ON public.endorsement_combined (t_source_table, id)")
+    op.execute("CREATE INDEX ix_endorsement_combined_refno ON public.endorsement_combined (t_refno)")
+    op.execute("CREATE INDEX ix_endorsement_combined_lot_number ON public.endorsement_combined (t_lot_number)")
+    op.execute("CREATE INDEX ix_endorsement_combined_date_endorsed ON public.endorsement_combined (t_date_endorsed)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'tbl_endorsement_t2',
+        sa.Column(
+            't1_id',
+            sa.Integer(),
+            nullable=True,
+            comment="Foreign key to tbl_endorsement_t1.t_id (integer join, replaces the t_refno foreign key)."
+        )
+    )
+
+    # BACKFILL FROM THE OLD STRING RELATION, EVERY t2 ROW HAD A VALID t_refno (IT WAS A FOREIGN KEY)
+    op.execute("""
+        UPDATE tbl_endorsement_t2 t2
+        SET t1_id = t1.t_id
+        FROM tbl_endorsement_t1 t1
+        WHERE t1.t_refno = t2.t_refno
+    """)
+
+    op.alter_column('tbl_endorsement_t2', 't1_id', nullable=False)
+    op.create_index('ix_tbl_endorsement_t2_t1_id', 'tbl_endorsement_t2', ['t1_id'])
+    op.create_foreign_key(
+        'tbl_endorsement_t2_t1_id_fkey',
+        'tbl_endorsement_t2', 'tbl_endorsement_t1',
+        ['t1_id'], ['t_id'],
+        ondelete='CASCADE'
+    )
+
+    # DELETING A t1 ROW NOW CASCADES IN THE DATABASE (t1 -> t2 -> lot excess) INSTEAD OF ONE ORM DELETE PER ROW
+    op.drop_constraint('tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey', 'tbl_endorsement_lot_excess', type_='foreignkey')
+    op.create_foreign_key(
+        'tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey',
+        'tbl_endorsement_lot_excess', 'tbl_endorsement_t2',
+        ['tbl_endorsement_t2_ref'], ['t_id'],
+        ondelete='CASCADE'
+    )
+
+    # t_refno STAYS ON t2 AS A PLAIN COLUMN (DISPLAY AND EXISTING LOT MESSAGES), ONLY THE STRING FOREIGN KEY IS RETIRED
+    op.drop_constraint('tbl_endorsement_t2_t_refno_fkey', 'tbl_endorsement_t2', type_='foreignkey')
+
+    recreate_combined_view("t1.t_id = t2.t1_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    recreate_combined_view("t1.t_refno = t2.t_refno")
+
+    op.create_foreign_key(
+        'tbl_endorsement_t2_t_refno_fkey',
+        'tbl_endorsement_t2', 'tbl_endorsement_t1',
+        ['t_refno'], ['t_refno']
+    )
+    op.drop_constraint('tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey', 'tbl_endorsement_lot_excess', type_='foreignkey')
+    op.create_foreign_key(
+        'tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey',
+        'tbl_endorsement_lot_excess', 'tbl_endorsement_t2',
+        ['tbl_endorsement_t2_ref'], ['t_id']
+    )
+    op.drop_constraint('tbl_endorsement_t2_t1_id_fkey', 'tbl_endorsement_t2', type_='foreignkey')
+    op.drop_index('ix_tbl_endorsement_t2_t1_id', table_name='tbl_endorsement_t2')
+    op.drop_column('tbl_endorsement_t2', 't1_id')
@@ -0,0 +1,312 @@
+"""monthly range partitions of endorsement table2 on the endorsement date
+
+Revision ID: c3e91a7f5d20
+Revises: 85b1b8399bac
+Create Date: 2026-10-19 12:06:44.810327
+
+Requires PostgreSQL 12+ (foreign keys referencing a partitioned table, generated columns
+copied with LIKE ... INCLUDING GENERATED). Changing the t_date_endorsed of an endorsement to
+another month moves its lots to another partition. Before PostgreSQL 15 that move runs the
+ON DELETE action of tbl_endorsement_lot_excess (the excess rows would be deleted), so the
+trigger trg_tbl_endorsement_t1_same_month_date rejects such a change on those servers.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e91a7f5d20'
+down_revision: Union[str, Sequence[str], None] = '85b1b8399bac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# PARTITIONS CREATED AHEAD OF THE CURRENT MONTH (THE APP KEEPS THIS MANY, see app.repositories.partitions)
+MONTHS_AHEAD = 3
+
+# COLUMNS COPIED BETWEEN THE OLD AND THE NEW TABLE (THE GENERATED lot_* COLUMNS ARE COMPUTED AGAIN)
+COPY_COLUMNS = (
+    "t_id, t1_id, t_refno, t_lotnumbersingle, t_qty, t_bag_num, is_deleted, t_remarks, "
+    "is_lot_number_entered, created_at, updated_at, t_date_endorsed"
+)
+
+# endorsement_combined (see b597257f8202), IT DEPENDS ON tbl_endorsement_t2 AND IS CREATED AGAIN ON THE NEW TABLE
+COMBINED_SELECT = """
+    SELECT
+        t1.t_id AS id,
+        t1.t_refno,
+        t1.t_lotnumberwhole AS t_lot_number,
+        t1.t_date_endorsed,
+        SUM(t2.t_qty) AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        MIN(t2.t_bag_num)::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t1'::text AS t_source_table
+    FROM tbl_endorsement_t1 t1
+    JOIN tbl_endorsement_t2 t2 ON t1.t_id = t2.t1_id
+    GROUP BY t1.t_id
+
+    UNION ALL
+
+    SELECT
+        t2.t_id AS id,
+        t2.t_refno,
+        t2.t_lotnumbersingle AS t_lot_number,
+        t1.t_date_endorsed,
+        t2.t_qty AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        t2.t_bag_num::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t2'::text AS t_source_table
+    FROM tbl_endorsement_t2 t2
+    LEFT JOIN tbl_endorsement_t1 t1 ON t1.t_id = t2.t1_id
+"""
+
+# ONE PARTITION PER MONTH, e.g. tbl_endorsement_t2_2026_10. A MONTH THAT ALREADY HAS ROWS IN THE
+# DEFAULT PARTITION IS SKIPPED WITH A WARNING (CREATE ... PARTITION OF WOULD FAIL ON THOSE ROWS)
+CREATE_PARTITION_FUNCTION = """
+    CREATE OR REPLACE FUNCTION create_endorsement_t2_partition(for_month date) RETURNS text
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        month_start date := date_trunc('month', for_month)::date;
+        month_end date := (date_trunc('month', for_month) + interval '1 month')::date;
+        partition_name text := 'tbl_endorsement_t2_' || to_char(for_month, 'YYYY_MM');
+    BEGIN
+        IF to_regclass(partition_name) IS NOT NULL THEN
+            RETURN partition_name;
+        END IF;
+
+        IF EXISTS (
+            SELECT 1 FROM tbl_endorsement_t2_default
+            WHERE t_date_endorsed >= month_start AND t_date_endorsed < month_end
+        ) THEN
+            RAISE WARNING 'tbl_endorsement_t2_default has rows of %, partition % not created', to_char(for_month, 'YYYY-MM'), partition_name;
+            RETURN NULL;
+        END IF;
+
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF tbl_endorsement_t2 FOR VALUES FROM (%L) TO (%L)',
+            partition_name, month_start, month_end
+        );
+
+        RETURN partition_name;
+    END
+    $$
+"""
+
+# THE CURRENT MONTH AND THE NEXT months_ahead MONTHS, RETURNS THE PARTITIONS THAT EXIST
+ENSURE_PARTITIONS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION ensure_endorsement_t2_partitions(months_ahead integer) RETURNS SETOF text
+    LANGUAGE sql AS $$
+        SELECT create_endorsement_t2_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', current_date),
+            date_trunc('month', current_date) + make_interval(months => months_ahead),
+            interval '1 month'
+        ) AS month
+    $$
+"""
+
+# BEFORE POSTGRESQL 15 A ROW MOVED TO ANOTHER PARTITION IS A DELETE + INSERT FOR THE FOREIGN KEYS: THE ON UPDATE
+# CASCADE OF THE LOTS WOULD DELETE THEIR tbl_endorsement_lot_excess ROWS (AND THE t_excess_kg / ROLLUP BUILT ON THEM).
+# THE VERSION IS READ WHEN THE TRIGGER RUNS, A SERVER UPGRADED TO 15+ ALLOWS THE CHANGE WITHOUT A NEW MIGRATION
+SAME_MONTH_DATE_FUNCTION = """
+    CREATE OR REPLACE FUNCTION check_endorsement_same_month_date() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF date_trunc('month', NEW.t_date_endorsed) <> date_trunc('month', OLD.t_date_endorsed)
+           AND current_setting('server_version_num')::integer < 150000 THEN
+            RAISE EXCEPTION 'Endorsement % cannot be moved from % to % (another month) on PostgreSQL %',
+                OLD.t_refno, OLD.t_date_endorsed, NEW.t_date_endorsed, current_setting('server_version')
+                USING ERRCODE = 'check_violation',
+                      HINT = 'Its lots would change partition and lose their excess rows. Delete the endorsement and save it again with the new date.';
+        END IF;
+
+        RETURN NEW;
+    END
+    $$
+"""
+
+
+def create_combined_view() -> None:
+    op.execute(f"CREATE MATERIALIZED VIEW public.endorsement_combined AS {COMBINED_SELECT} WITH DATA")
+    op.execute("CREATE UNIQUE INDEX ix_endorsement_combined_source_id ON public.endorsement_combined (t_source_table, id)")
+    op.execute("CREATE INDEX ix_endorsement_combined_refno ON public.endorsement_combined (t_refno)")
+    op.execute("CREATE INDEX ix_endorsement_combined_lot_number ON public.endorsement_combined (t_lot_number)")
+    op.execute("CREATE INDEX ix_endorsement_combined_date_endorsed ON public.endorsement_combined (t_date_endorsed)")
+
+def create_t2_indexes() -> None:
+    op.create_index('ix_tbl_endorsement_t2_t1_id', 'tbl_endorsement_t2', ['t1_id'])
+    op.create_index('ix_tbl_endorsement_t2_lot_range', 'tbl_endorsement_t2', ['lot_suffix', 'lot_start_num', 'lot_end_num'])
+    op.create_index(
+        'ix_tbl_endorsement_t2_lotnumbersingle_active',
+        'tbl_endorsement_t2',
+        ['t_lotnumbersingle'],
+        postgresql_where=sa.text('is_deleted = false')
+    )
+
+def rename_old_t2() -> None:
+    """Moves the current tbl_endorsement_t2 aside, its index names are freed for the new table."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.endorsement_combined")
+    op.drop_constraint('tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey', 'tbl_endorsement_lot_excess', type_='foreignkey')
+
+    op.drop_index('ix_tbl_endorsement_t2_lotnumbersingle_active', table_name='tbl_endorsement_t2')
+    op.drop_index('ix_tbl_endorsement_t2_lot_range', table_name='tbl_endorsement_t2')
+    op.drop_index('ix_tbl_endorsement_t2_t1_id', table_name='tbl_endorsement_t2')
+
+    op.rename_table('tbl_endorsement_t2', 'tbl_endorsement_t2_old')
+    op.execute("ALTER TABLE tbl_endorsement_t2_old RENAME CONSTRAINT tbl_endorsement_t2_pkey TO tbl_endorsement_t2_old_pkey")
+
+    # THE t_id SEQUENCE IS KEPT (IDS CONTINUE), IT WOULD BE DROPPED WITH THE OLD TABLE OTHERWISE
+    op.execute("ALTER SEQUENCE tbl_endorsement_t2_t_id_seq OWNED BY NONE")
+
+def drop_old_t2() -> None:
+    op.execute(f"INSERT INTO tbl_endorsement_t2 ({COPY_COLUMNS}) SELECT {COPY_COLUMNS} FROM tbl_endorsement_t2_old")
+    op.drop_table('tbl_endorsement_t2_old')
+    op.execute("ALTER SEQUENCE tbl_endorsement_t2_t_id_seq OWNED BY tbl_endorsement_t2.t_id")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ------ PARTITION KEY: THE ENDORSEMENT DATE OF THE PARENT, COPIED ON EVERY LOT ------
+    op.add_column(
+        'tbl_endorsement_t2',
+        sa.Column(
+            't_date_endorsed',
+            sa.Date(),
+            nullable=True,
+            comment="Copy of tbl_endorsement_t1.t_date_endorsed, partition key of the monthly partitions."
+        )
+    )
+    op.execute("""
+        UPDATE tbl_endorsement_t2 t2
+        SET t_date_endorsed = t1.t_date_endorsed
+        FROM tbl_endorsement_t1 t1
+        WHERE t1.t_id = t2.t1_id
+    """)
+    op.alter_column('tbl_endorsement_t2', 't_date_endorsed', nullable=False)
+
+    # THE LOT EXCESS ROW KEEPS THE PARTITION KEY OF ITS LOT FOR THE COMPOSITE FOREIGN KEY
+    op.add_column(
+        'tbl_endorsement_lot_excess',
+        sa.Column(
+            't2_date_endorsed',
+            sa.Date(),
+            nullable=True,
+            comment="t_date_endorsed of the tbl_endorsement_t2 row (part of the foreign key to the partitioned table)."
+        )
+    )
+    op.execute("""
+        UPDATE tbl_endorsement_lot_excess excess
+        SET t2_date_endorsed = t2.t_date_endorsed
+        FROM tbl_endorsement_t2 t2
+        WHERE t2.t_id = excess.tbl_endorsement_t2_ref
+    """)
+    op.alter_column('tbl_endorsement_lot_excess', 't2_date_endorsed', nullable=False)
+
+    # THE t2 FOREIGN KEY INCLUDES THE DATE SO A LOT ALWAYS HAS THE DATE OF ITS ENDORSEMENT (ON UPDATE CASCADE)
+    op.create_unique_constraint('uq_tbl_endorsement_t1_id_date_endorsed', 'tbl_endorsement_t1', ['t_id', 't_date_endorsed'])
+
+    # ------ NEW PARTITIONED TABLE (SAME COLUMNS, DEFAULTS, GENERATED COLUMNS AND COMMENTS) ------
+    rename_old_t2()
+
+    op.execute("""
+        CREATE TABLE tbl_endorsement_t2 (
+            LIKE tbl_endorsement_t2_old INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS,
+            CONSTRAINT tbl_endorsement_t2_pkey PRIMARY KEY (t_id, t_date_endorsed)
+        ) PARTITION BY RANGE (t_date_endorsed)
+    """)
+    op.execute("CREATE TABLE tbl_endorsement_t2_default PARTITION OF tbl_endorsement_t2 DEFAULT")
+
+    op.execute(CREATE_PARTITION_FUNCTION)
+    op.execute(ENSURE_PARTITIONS_FUNCTION)
+
+    # EVERY MONTH THAT HAS LOTS, THEN THE MONTHS AHEAD, SO THE DEFAULT PARTITION STAYS EMPTY
+    op.execute("""
+        SELECT create_endorsement_t2_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', (SELECT min(t_date_endorsed) FROM tbl_endorsement_t2_old)),
+            date_trunc('month', current_date),
+            interval '1 month'
+        ) AS month
+    """)
+    op.execute(f"SELECT ensure_endorsement_t2_partitions({MONTHS_AHEAD})")
+
+    drop_old_t2()
+
+    # ------ INDEXES AND FOREIGN KEYS (CREATED ON EVERY PARTITION, ALSO THE FUTURE ONES) ------
+    create_t2_indexes()
+    op.create_foreign_key(
+        'tbl_endorsement_t2_t1_id_date_fkey',
+        'tbl_endorsement_t2', 'tbl_endorsement_t1',
+        ['t1_id', 't_date_endorsed'], ['t_id', 't_date_endorsed'],
+        ondelete='CASCADE',
+        onupdate='CASCADE'
+    )
+    op.create_foreign_key(
+        'tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey',
+        'tbl_endorsement_lot_excess', 'tbl_endorsement_t2',
+        ['tbl_endorsement_t2_ref', 't2_date_endorsed'], ['t_id', 't_date_endorsed'],
+        ondelete='CASCADE',
+        onupdate='CASCADE'
+    )
+
+    # ------ NO CROSS-PARTITION MOVE OF THE LOTS BEFORE POSTGRESQL 15 (SEE SAME_MONTH_DATE_FUNCTION) ------
+    op.execute(SAME_MONTH_DATE_FUNCTION)
+    op.execute("""
+        CREATE TRIGGER trg_tbl_endorsement_t1_same_month_date
+        BEFORE UPDATE OF t_date_endorsed ON tbl_endorsement_t1
+        FOR EACH ROW
+        WHEN (OLD.t_date_endorsed IS DISTINCT FROM NEW.t_date_endorsed)
+        EXECUTE FUNCTION check_endorsement_same_month_date()
+    """)
+
+    create_combined_view()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_tbl_endorsement_t1_same_month_date ON tbl_endorsement_t1")
+    op.execute("DROP FUNCTION IF EXISTS check_endorsement_same_month_date()")
+
+    rename_old_t2()
+
+    op.execute("""
+        CREATE TABLE tbl_endorsement_t2 (
+            LIKE tbl_endorsement_t2_old INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING COMMENTS,
+            CONSTRAINT tbl_endorsement_t2_pkey PRIMARY KEY (t_id)
+        )
+    """)
+
+    # DROPS EVERY MONTHLY PARTITION AND THE DEFAULT PARTITION WITH THE OLD TABLE
+    drop_old_t2()
+    op.execute("DROP FUNCTION IF EXISTS ensure_endorsement_t2_partitions(integer)")
+    op.execute("DROP FUNCTION IF EXISTS create_endorsement_t2_partition(date)")
+
+    create_t2_indexes()
+    op.create_foreign_key(
+        'tbl_endorsement_t2_t1_id_fkey',
+        'tbl_endorsement_t2', 'tbl_endorsement_t1',
+        ['t1_id'], ['t_id'],
+        ondelete='CASCADE'
+    )
+    op.create_foreign_key(
+        'tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey',
+        'tbl_endorsement_lot_excess', 'tbl_endorsement_t2',
+        ['tbl_endorsement_t2_ref'], ['t_id'],
+        ondelete='CASCADE'
+    )
+
+    op.drop_constraint('uq_tbl_endorsement_t1_id_date_endorsed', 'tbl_endorsement_t1', type_='unique')
+    op.drop_column('tbl_endorsement_lot_excess', 't2_date_endorsed')
+    op.drop_column('tbl_endorsement_t2', 't_date_endorsed')
+
+    create_combined_view()
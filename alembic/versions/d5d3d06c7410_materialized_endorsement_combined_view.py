@@ -0,0 +1,75 @@
+"""materialized endorsement_combined view with a unique index for concurrent refresh
+
+Revision ID: d5d3d06c7410
+Revises: 0620f898789f
+Create Date: 2026-10-19 09:12:40.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5d3d06c7410'
+down_revision: Union[str, Sequence[str], None] = '0620f898789f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SAME COLUMNS AS models.EndorsementCombinedView. (t_source_table, id) IDENTIFIES A ROW:
+# ONE ROW PER ENDORSEMENT (id = tbl_endorsement_t1.t_id) AND ONE ROW PER LOT (id = tbl_endorsement_t2.t_id)
+COMBINED_SELECT = """
+    SELECT
+        t1.t_id AS id,
+        t1.t_refno,
+        t1.t_lotnumberwhole AS t_lot_number,
+        t1.t_date_endorsed,
+        SUM(t2.t_qty) AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        MIN(t2.t_bag_num)::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t1'::text AS t_source_table
+    FROM tbl_endorsement_t1 t1
+    JOIN tbl_endorsement_t2 t2 ON t1.t_refno = t2.t_refno
+    GROUP BY t1.t_id
+
+    UNION ALL
+
+    SELECT
+        t2.t_id AS id,
+        t2.t_refno,
+        t2.t_lotnumbersingle AS t_lot_number,
+        t1.t_date_endorsed,
+        t2.t_qty AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        t2.t_bag_num::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t2'::text AS t_source_table
+    FROM tbl_endorsement_t2 t2
+    LEFT JOIN tbl_endorsement_t1 t1 ON t2.t_refno = t1.t_refno
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP VIEW IF EXISTS public.endorsement_combined")
+    op.execute(f"CREATE MATERIALIZED VIEW public.endorsement_combined AS {COMBINED_SELECT} WITH DATA")
+
+    # REFRESH MATERIALIZED VIEW CONCURRENTLY NEEDS A UNIQUE INDEX WITHOUT A WHERE CLAUSE
+    op.execute("CREATE UNIQUE INDEX ix_endorsement_combined_source_id ON public.endorsement_combined (t_source_table, id)")
+    op.execute("CREATE INDEX ix_endorsement_combined_refno ON public.endorsement_combined (t_refno)")
+    op.execute("CREATE INDEX ix_endorsement_combined_lot_number ON public.endorsement_combined (t_lot_number)")
+    op.execute("CREATE INDEX ix_endorsement_combined_date_endorsed ON public.endorsement_combined (t_date_endorsed)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.endorsement_combined")
+    op.execute(f"CREATE VIEW public.endorsement_combined AS {COMBINED_SELECT}")
@@ -0,0 +1,180 @@
+"""partial indexes on the active endorsement rows, deleted_at and archive tables of the soft deleted rows
+
+Revision ID: e1b4d7c2a9f6
+Revises: c3e91a7f5d20
+Create Date: 2026-10-19 13:02:15.447190
+
+Requires PostgreSQL 13+ (BEFORE ROW trigger on the partitioned tbl_endorsement_t2).
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b4d7c2a9f6'
+down_revision: Union[str, Sequence[str], None] = 'c3e91a7f5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SOFT_DELETE_TABLES = ('tbl_endorsement_t1', 'tbl_endorsement_t2')
+
+# ROWS MOVED BY app.workers.deleted_rows_archiver (SAME COLUMNS AS THE LIVE TABLE + archived_at)
+ARCHIVE_TABLES = {
+    'tbl_endorsement_t1_archive': 'tbl_endorsement_t1',
+    'tbl_endorsement_t2_archive': 'tbl_endorsement_t2',
+    'tbl_endorsement_lot_excess_archive': 'tbl_endorsement_lot_excess',
+}
+
+ACTIVE = sa.text('is_deleted = false')
+
+# endorsement_combined (see c3e91a7f5d20) WITH THE SOFT DELETE FILTER GIVEN AS A PARAMETER
+COMBINED_SELECT = """
+    SELECT
+        t1.t_id AS id,
+        t1.t_refno,
+        t1.t_lotnumberwhole AS t_lot_number,
+        t1.t_date_endorsed,
+        SUM(t2.t_qty) AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        MIN(t2.t_bag_num)::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t1'::text AS t_source_table
+    FROM tbl_endorsement_t1 t1
+    JOIN tbl_endorsement_t2 t2 ON t1.t_id = t2.t1_id {active_t2}
+    {active_t1}
+    GROUP BY t1.t_id
+
+    UNION ALL
+
+    SELECT
+        t2.t_id AS id,
+        t2.t_refno,
+        t2.t_lotnumbersingle AS t_lot_number,
+        t1.t_date_endorsed,
+        t2.t_qty AS t_total_quantity,
+        t1.t_prodcode,
+        t1.t_status::text AS t_status,
+        t1.t_endorsed_by,
+        t2.t_bag_num::text AS t_bag_num,
+        t1.t_category::text AS t_category,
+        t1.t_has_excess,
+        'tbl_endorsement_t2'::text AS t_source_table
+    FROM tbl_endorsement_t2 t2
+    LEFT JOIN tbl_endorsement_t1 t1 ON t1.t_id = t2.t1_id
+    {active_both}
+"""
+
+DELETED_AT_FUNCTION = """
+    CREATE OR REPLACE FUNCTION set_endorsement_deleted_at() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NEW.is_deleted AND NOT OLD.is_deleted THEN
+            NEW.deleted_at := now();
+        ELSIF NOT NEW.is_deleted THEN
+            NEW.deleted_at := NULL;
+        END IF;
+
+        RETURN NEW;
+    END
+    $$
+"""
+
+
+def recreate_combined_view(active_only: bool) -> None:
+    select = COMBINED_SELECT.format(
+        active_t2="AND t2.is_deleted = false" if active_only else "",
+        active_t1="WHERE t1.is_deleted = false" if active_only else "",
+        active_both="WHERE t2.is_deleted = false AND t1.is_deleted = false" if active_only else "",
+    )
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public.endorsement_combined")
+    op.execute(f"CREATE MATERIALIZED VIEW public.endorsement_combined AS {select} WITH DATA")
+    op.execute("CREATE UNIQUE INDEX ix_endorsement_combined_source_id ON public.endorsement_combined (t_source_table, id)")
+    op.execute("CREATE INDEX ix_endorsement_combined_refno ON public.endorsement_combined (t_refno)")
+    op.execute("CREATE INDEX ix_endorsement_combined_lot_number ON public.endorsement_combined (t_lot_number)")
+    op.execute("CREATE INDEX ix_endorsement_combined_date_endorsed ON public.endorsement_combined (t_date_endorsed)")
+
+def create_lot_range_indexes(where=None) -> None:
+    for table in SOFT_DELETE_TABLES:
+        op.drop_index(f'ix_{table}_lot_range', table_name=table)
+        op.create_index(f'ix_{table}_lot_range', table, ['lot_suffix', 'lot_start_num', 'lot_end_num'], postgresql_where=where)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ------ is_deleted NOT NULL DEFAULT false (NULL WAS TREATED AS ACTIVE, see 85b1b8399bac) ------
+    for table in SOFT_DELETE_TABLES:
+        op.execute(f"UPDATE {table} SET is_deleted = false WHERE is_deleted IS NULL")
+        op.alter_column(table, 'is_deleted', nullable=False, server_default=sa.text('false'))
+
+        op.add_column(
+            table,
+            sa.Column(
+                'deleted_at',
+                sa.DateTime(timezone=True),
+                nullable=True,
+                comment="Set by trigger when is_deleted becomes true, the archival job moves the row after ARCHIVE_DELETED_AFTER_DAYS."
+            )
+        )
+        # ROWS DELETED BEFORE THE COLUMN EXISTED: THEIR LAST UPDATE IS THE BEST GUESS
+        op.execute(f"UPDATE {table} SET deleted_at = COALESCE(updated_at, created_at, now()) WHERE is_deleted")
+
+    op.execute(DELETED_AT_FUNCTION)
+    for table in SOFT_DELETE_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_deleted_at
+            BEFORE UPDATE OF is_deleted ON {table}
+            FOR EACH ROW EXECUTE FUNCTION set_endorsement_deleted_at()
+        """)
+
+    # ------ PARTIAL INDEXES: ONLY THE ACTIVE ROWS (EVERY QUERY OF THE APP FILTERS is_deleted = false) ------
+    create_lot_range_indexes(where=ACTIVE)
+    op.create_index('ix_tbl_endorsement_t1_date_endorsed_active', 'tbl_endorsement_t1', ['t_date_endorsed'], postgresql_where=ACTIVE)
+    op.create_index('ix_tbl_endorsement_t1_created_at_active', 'tbl_endorsement_t1', ['created_at'], postgresql_where=ACTIVE)
+
+    # THE ARCHIVAL JOB LOOKS ONLY AT THE DELETED ROWS, OLDEST FIRST
+    for table in SOFT_DELETE_TABLES:
+        op.create_index(f'ix_{table}_deleted_at', table, ['deleted_at'], postgresql_where=sa.text('is_deleted = true'))
+
+    # ------ ARCHIVE TABLES (NOT PARTITIONED, GENERATED COLUMNS ARE STORED AS PLAIN VALUES) ------
+    for archive, table in ARCHIVE_TABLES.items():
+        op.execute(f"""
+            CREATE TABLE {archive} (
+                LIKE {table},
+                archived_at timestamp with time zone NOT NULL DEFAULT now(),
+                CONSTRAINT {archive}_pkey PRIMARY KEY (t_id)
+            )
+        """)
+
+    op.create_index('ix_tbl_endorsement_t1_archive_refno', 'tbl_endorsement_t1_archive', ['t_refno'])
+    op.create_index('ix_tbl_endorsement_t2_archive_t1_id', 'tbl_endorsement_t2_archive', ['t1_id'])
+
+    recreate_combined_view(active_only=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    recreate_combined_view(active_only=False)
+
+    for archive in ARCHIVE_TABLES:
+        op.drop_table(archive)
+
+    for table in SOFT_DELETE_TABLES:
+        op.drop_index(f'ix_{table}_deleted_at', table_name=table)
+
+    op.drop_index('ix_tbl_endorsement_t1_created_at_active', table_name='tbl_endorsement_t1')
+    op.drop_index('ix_tbl_endorsement_t1_date_endorsed_active', table_name='tbl_endorsement_t1')
+    create_lot_range_indexes(where=None)
+
+    for table in SOFT_DELETE_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_deleted_at ON {table}")
+        op.drop_column(table, 'deleted_at')
+        op.alter_column(table, 'is_deleted', nullable=True, server_default=None)
+
+    op.execute("DROP FUNCTION IF EXISTS set_endorsement_deleted_at()")
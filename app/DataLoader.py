@@ -1,6 +1,4 @@
-from config.db import prodcode_engine
-from app.helpers import create_session
-from sqlalchemy import MetaData, Table, select
+from app.repositories import get_prodcode_repository, PRODCODE_CACHE_PATH, CircuitOpenError
 
 from datetime import datetime
 
@@ -10,24 +8,11 @@ import traceback
 
 class FetchProdCode():
     def __init__(self):
-        self.Session = create_session(prodcode_engine)
+        self.repository = get_prodcode_repository()
     
     def process_fetching(self):
-        session = self.Session()
-
         try:
-            metadata = MetaData()
-            product_code_table = Table(
-                "tbl_prod01", 
-                metadata, 
-                autoload_with=prodcode_engine
-            )
-            prodcode_col = product_code_table.columns["T_PRODCODE"]
-
-            stmt = select(prodcode_col.distinct())
-
-            results = session.execute(stmt).fetchall()
-            codes = [ row[0] for row in results ]
+            codes = self.repository.all_codes()
 
             # STORE THE PRODUCTION CODES IN A JSON FILE
             payload = {
@@ -39,18 +24,17 @@ class FetchProdCode():
             # WRITE JSON STRING
             self._store_to_json_path(data=payload)
 
+        except CircuitOpenError as e:
+            # THE PRODCODE DATABASE IS DOWN, THE EXISTING CACHE FILE IS KEPT
+            print(e)
+
         except Exception as e:
             print(f"Error filtering product codes: {e}")
             traceback.print_exc()
-        finally:
-            session.close()
     
     def _store_to_json_path(self, data: list):
-        current_dir = os.path.dirname(__file__)
-        cached_dir = os.path.join(current_dir, "views", "cache")
-        os.makedirs(cached_dir, exist_ok=True)
-
-        json_path = os.path.join(cached_dir, "prodcode.json")
+        json_path = PRODCODE_CACHE_PATH
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
 
         length_validation = self._check_length_in_json_data(json_path)
 
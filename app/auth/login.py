@@ -8,31 +8,30 @@ from PyQt6.QtWidgets import (
     QInputDialog
 )
 from PyQt6.QtGui import QFont, QPixmap
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Callable
 
-from app.dashboard.dashboard import FGDashboard
 from app.StyledMessage import StyledMessageBox
 
-# import models here
-from models import User, AuthLog
-
-# registration
-from app.auth.registration import Registration
-
 # helpers
-from app.helpers import button_cursor_pointer, record_auth_log, load_styles
+from app.helpers import button_cursor_pointer, load_styles, get_icon
+
+# background connectivity check
+from app.workers import ConnectionProbeThread, StartupWarmup, run_ui_task, on_loop
+from app.instrumentation import instrumented_action
+from config.db import get_engine
+from config.pyqtConfig import print_connection_status
 
 # super password
-from constants.Enums import ITCredentials, AuthLogStatus
+from constants.Enums import ITCredentials
 
 import sys
 import hashlib
+import traceback
 import socket
 import os
-import qtawesome as qta
 
 class LoginForm(QWidget):
     """
@@ -59,7 +58,8 @@ class LoginForm(QWidget):
         super().__init__(*args, **kwargs)
         self.setWindowTitle("User Login")
         self.setFixedSize(400, 550)
-        self.setWindowIcon(qta.icon("fa5s.lock", color="steelblue"))
+        # NOTE: qtawesome (icon fonts) is loaded after the window is shown
+        QTimer.singleShot(0, lambda: self.setWindowIcon(get_icon("fa5s.lock", color="steelblue")))
 
         self.main_layout = QVBoxLayout()
         self.main_layout.setContentsMargins(40, 40, 40, 40)
@@ -87,6 +87,13 @@ class LoginForm(QWidget):
         self.subtitle_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.subtitle_label.setStyleSheet("color:#555;")
 
+        # DATABASE CONNECTION STATUS (UPDATED BY THE BACKGROUND PROBE)
+        self.connection_status_label = QLabel("Connecting to database...")
+        self.connection_status_label.setObjectName("LoginConnectionStatus")
+        self.connection_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.connection_status_label.setWordWrap(True)
+        self.connection_status_label.setStyleSheet("color:#888;")
+
         # INPUT FIELDS
         self.username_input = QLineEdit()
         self.username_input.setPlaceholderText("Username")
@@ -105,6 +112,7 @@ class LoginForm(QWidget):
         self.main_layout.addWidget(self.logo_label)
         self.main_layout.addWidget(self.title_label)
         self.main_layout.addWidget(self.subtitle_label)
+        self.main_layout.addWidget(self.connection_status_label)
         self.main_layout.addSpacing(20)
         self.main_layout.addWidget(self.username_input)
         self.main_layout.addWidget(self.password_input)
@@ -120,6 +128,8 @@ class LoginForm(QWidget):
         try:
             self.Session = session_factory
             self.dashboard_window = None
+            self.is_db_connected = None
+            self.connection_probe = None
         except SQLAlchemyError as e:
             QMessageBox.critical(
                 None, "Database Error",
@@ -129,6 +139,52 @@ class LoginForm(QWidget):
 
             sys.exit(1)
     
+    def start_connection_probe(self):
+        """
+        Check the database connectivity on a background thread.
+
+        The login button stays disabled until the main database answers, so the
+        window is shown immediately even if the database host is slow or down.
+        """
+
+        if self.connection_probe is not None and self.connection_probe.isRunning():
+            return
+
+        self.login_button.setEnabled(False)
+        self.connection_status_label.setText("Connecting to database...")
+        self.connection_status_label.setStyleSheet("color:#888;")
+
+        self.connection_probe = ConnectionProbeThread(self)
+        self.connection_probe.probe_finished.connect(self.on_connection_probe_finished)
+        self.connection_probe.start()
+
+    def on_connection_probe_finished(self, result: dict):
+        """
+        Update the login UI with the result of the connectivity probe.
+
+        Args:
+            result (dict): Result emitted by ConnectionProbeThread.probe_finished.
+        """
+
+        main_db = result.get("main", {})
+        prodcode_db = result.get("prodcode", {})
+
+        self.is_db_connected = main_db.get("connected", False)
+        print_connection_status(self.is_db_connected, get_engine())
+
+        # THE LOGIN BUTTON ALSO WORKS AS A RETRY WHEN THE DATABASE IS DOWN
+        self.login_button.setEnabled(True)
+
+        if not self.is_db_connected:
+            self.connection_status_label.setText("Database unreachable. Press LOGIN to retry.")
+            self.connection_status_label.setStyleSheet("color:#c0392b;")
+        elif not prodcode_db.get("connected", False):
+            self.connection_status_label.setText("Connected (product code database unavailable)")
+            self.connection_status_label.setStyleSheet("color:#d68910;")
+        else:
+            self.connection_status_label.setText("Connected")
+            self.connection_status_label.setStyleSheet("color:#1e8449;")
+
     def apply_styles(self):
         """
         Apply styles and cursor changes to buttons and load stylesheet from file.
@@ -178,16 +234,23 @@ class LoginForm(QWidget):
 
         return socket.gethostname()
 
+    @instrumented_action()
     def handle_login(self):
         """
         Handle user login attempt.
 
-        Validates input, hashes password, queries database for matching user.
+        Validates input, hashes password, then queries database for matching user
+        without blocking the window (see login_async).
         Shows message boxes for errors or success.
         Records authentication logs for success or failure.
         Opens dashboard window if login is successful.
         """
 
+        if not self.is_db_connected:
+            self.start_connection_probe()
+            
+            return
+
         username = self.username_input.text().strip()
         password = self.password_input.text()
         
@@ -203,71 +266,76 @@ class LoginForm(QWidget):
         
         workstation_name = self.get_workstation_name()
 
-        # start the session here
-        session = self.Session()
+        # THE LOOKUP RUNS ON THE ASYNCIO LOOP, THE WINDOW STAYS RESPONSIVE UNTIL THE ANSWER COMES BACK
+        self.login_button.setDisabled(True)
+        run_ui_task(
+            self.login_async(username, hashed_password, workstation_name),
+            on_error=self.on_login_error
+        )
 
-        try:
-            user = session.query(User).filter_by(
-                username=username,
-                password=hashed_password
-            ).first()
+    async def login_async(self, username: str, hashed_password: str, workstation_name: str):
+        """
+        Coroutine of handle_login (run with run_ui_task).
 
-            if not user:
-                QMessageBox.warning(
-                    self,
-                    "Login failed",
-                    "Invalid username or password"
-                )
+        Args:
+            username (str): Entered username.
+            hashed_password (str): SHA-256 hash of the entered password.
+            workstation_name (str): Hostname recorded in the auth log.
+        """
+        # IMPORTED HERE SO THE ASYNCIO EXTENSION IS NOT LOADED BEFORE THE LOGIN WINDOW IS SHOWN
+        from app.repositories import get_async_repository
 
-                # log failed attempt
-                record_auth_log(
-                    session=session,
-                    data_required={
-                        "username": username,
-                        "event_type": AuthLogStatus.get_event_type("login"),
-                        "status": AuthLogStatus.FAILED.value,
-                        "additional_info": f"Attempted from {workstation_name}"
-                    },
-                    auth_log_model=AuthLog,
-                    commit=True
-                )
-                
-                return
-
-            # login is successful
-            record_auth_log(
-                session=session,
-                data_required={
-                    "user_id": user.user_id,
-                    "username": user.username,
-                    "event_type": AuthLogStatus.get_event_type("login"),
-                    "status": AuthLogStatus.SUCCESS.value,
-                    "additional_info": f"Logged in from {workstation_name}"
-                },
-                auth_log_model=AuthLog,
-                commit=True
-            )
+        user = await on_loop(
+            get_async_repository().authenticate(username, hashed_password, workstation_name)
+        )
+        self.login_button.setDisabled(False)
 
-            StyledMessageBox.information(
+        if not user:
+            QMessageBox.warning(
                 self,
-                "Login Success",
-                f"Welcome, {user.username}"
-            )
-
-            # if the login is successful get the role of the current user with username of that.
-            # OPEN THE MAIN DASHBAORD
-            self.open_dashboard_main_window(
-                session_factory=self.Session,
-                username=username,
-                role=user.role.value,
-                open_win=True
+                "Login failed",
+                "Invalid username or password"
             )
             
-        except SQLAlchemyError as e:
+            return
+
+        # START LOADING WHAT THE DASHBOARD NEEDS WHILE THE WELCOME MESSAGE IS DISPLAYED
+        warmup = StartupWarmup(session_factory=self.Session).start()
+
+        StyledMessageBox.information(
+            self,
+            "Login Success",
+            f"Welcome, {user.username}"
+        )
+
+        # if the login is successful get the role of the current user with username of that.
+        # OPEN THE MAIN DASHBAORD
+        self.open_dashboard_main_window(
+            session_factory=self.Session,
+            username=username,
+            role=user.role.value,
+            open_win=True,
+            warmup=warmup
+        )
+
+    def on_login_error(self, error: Exception):
+        # NOTE: CALLED FROM A QT SLOT (run_ui_task), RAISING HERE WOULD ABORT THE WHOLE APPLICATION
+        self.login_button.setDisabled(False)
+
+        print(f"Login failed with {type(error).__name__}: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+        if isinstance(error, SQLAlchemyError):
             StyledMessageBox.critical(
                 self,
                 "Database Error",
-                f"An error occured during login: {e}"
+                f"An error occured during login: {error}"
+            )
+        else:
+            StyledMessageBox.critical(
+                self,
+                "Login Error",
+                f"An unexpected error occured during login ({type(error).__name__}): {error}"
             )
     
     def open_dashboard_main_window(
@@ -275,7 +343,8 @@ class LoginForm(QWidget):
         username: str, 
         role: str, 
         session_factory: Callable[..., Session], 
-        open_win=False
+        open_win=False,
+        warmup: StartupWarmup = None
     ):
         """
         Open the main dashboard window and close the login form if specified.
@@ -285,9 +354,13 @@ class LoginForm(QWidget):
             role (str): Role of logged in user.
             session_factory (Callable[..., Session]): Factory for creating DB sessions.
             open_win (bool): Whether to open the dashboard window. Defaults to False.
+            warmup (StartupWarmup, optional): Warm-up started after the credentials were validated.
         """
         
         if open_win:
+            # THE DASHBOARD (AND EVERY VIEW IT IMPORTS) IS ONLY LOADED AFTER A SUCCESSFUL LOGIN
+            from app.dashboard.dashboard import FGDashboard
+
             # CLOSE THIS LOGIN INTERFACE
             self.close()
             
@@ -296,7 +369,8 @@ class LoginForm(QWidget):
                 session_factory=session_factory,
                 username=username, 
                 role=role, 
-                login_widget=self
+                login_widget=self,
+                warmup=warmup
             )
             self.dashboard_window.show()
     
@@ -316,6 +390,8 @@ class LoginForm(QWidget):
         
         if ok:
             if super_password == ITCredentials.SUPER_PASSWORD.value:
+                from app.auth.registration import Registration
+
                 self.registration_widget = Registration(session_factory=self.Session)
                 self.registration_widget.show()
             else:
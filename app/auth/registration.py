@@ -12,13 +12,14 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from typing import Callable
 
-from app.helpers import button_cursor_pointer, record_auth_log, add_new_user, load_styles
+from app.helpers import button_cursor_pointer, load_styles
+from app.workers import run_ui_task, on_loop
 from app.StyledMessage import StyledMessageBox
-from models import User, AuthLog
-from constants.Enums import Department, UserRole, AuthLogStatus
+from constants.Enums import Department, UserRole
 
 import hashlib
 import socket
+import traceback
 import os
 
 class Registration(QWidget):
@@ -33,7 +34,7 @@ class Registration(QWidget):
     - Ensures password confirmation matches
     - Hashes the password with SHA-256
     - Checks if username already exists in the database
-    - Creates a new user record using SQLAlchemy session
+    - Creates a new user record through the asyncio data layer (AsyncRepository)
     - Records an authentication log entry for registration
     - Handles database errors and shows user feedback via message boxes
 
@@ -183,70 +184,69 @@ class Registration(QWidget):
         hashed_password = self.hash_password(password)
         workstation_name = self.get_workstation_name()
 
-        # initialize the session here that was imported in the Login widget
-        session = self.Session()
-        try:
-            # Check if user exists
-            if session.query(User).filter_by(username=username).first():
-                StyledMessageBox.warning(
-                    self,
-                    "Registration Failed",
-                    "Username already exists."
-                )
-                return
- 
-            # record new user in the User model
-            user_details = {
-                "username": username.lower(),
-                "password": hashed_password,
-                "workstation_name": workstation_name,
-                "role": UserRole[role].value,
-                "department": Department[department].value
-            }
-
-            new_user = add_new_user(
-                session=session,
-                data_required=user_details,
-                user_model=User
-            )
+        # record new user in the User model
+        user_details = {
+            "username": username.lower(),
+            "password": hashed_password,
+            "workstation_name": workstation_name,
+            "role": UserRole[role].value,
+            "department": Department[department].value
+        }
 
-            record_auth_log(
-                session=session,
-                data_required={
-                    "user_id": new_user.user_id,
-                    "username": new_user.username,
-                    "event_type": AuthLogStatus.get_event_type("registration"),
-                    "status": AuthLogStatus.SUCCESS.value
-                },
-                auth_log_model=AuthLog
-            )
-        except SQLAlchemyError as e:
-            session.rollback()
-            StyledMessageBox.critical(
-                self,
-                "Database Error",
-                f"An error occurred: {e}"
-            )
-            print(f"SQLAlchemyError: {e}")
-        except TypeError as e:
-            session.rollback()
-            
-            StyledMessageBox.critical(
+        # THE QUERIES RUN ON THE ASYNCIO LOOP, THE FORM STAYS RESPONSIVE
+        self.register_button.setDisabled(True)
+        run_ui_task(self.register_async(username, user_details), on_error=self.on_registration_error)
+
+    async def register_async(self, username: str, user_details: dict):
+        """
+        Coroutine of handle_registration (run with run_ui_task).
+
+        Args:
+            username (str): Entered username, checked for uniqueness.
+            user_details (dict): Column values of the new User.
+        """
+        # IMPORTED HERE SO THE ASYNCIO EXTENSION IS ONLY LOADED WHEN IT IS USED
+        from app.repositories import get_async_repository
+
+        repository = get_async_repository()
+
+        # Check if user exists
+        if await on_loop(repository.username_exists(username)):
+            self.register_button.setDisabled(False)
+            StyledMessageBox.warning(
                 self,
-                "Program Error",
-                f"An error occurred: {e}"
+                "Registration Failed",
+                "Username already exists."
             )
+            return
+
+        # the user and its registration log are committed in one transaction
+        await on_loop(repository.register_user(user_details))
+        self.register_button.setDisabled(False)
 
-            print(f"TypeError: {e}")
+        StyledMessageBox.information(
+            self,
+            "Success",
+            "User registered successfully."
+        )
+        self.close()
+
+    def on_registration_error(self, error: Exception):
+        # NOTE: CALLED FROM A QT SLOT (run_ui_task), RAISING HERE WOULD ABORT THE WHOLE APPLICATION
+        self.register_button.setDisabled(False)
+
+        print(f"{type(error).__name__}: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+        if isinstance(error, SQLAlchemyError):
+            title = "Database Error"
+        elif isinstance(error, TypeError):
+            title = "Program Error"
         else:
-             # commit everything if there is no failed transaction on both helper function 
-            session.commit()
+            title = "Registration Error"
 
-            StyledMessageBox.information(
-                self,
-                "Success",
-                "User registered successfully."
-            )
-            self.close()
-        finally:
-            session.close()
+        StyledMessageBox.critical(
+            self,
+            title,
+            f"An error occurred: {error}"
+        )
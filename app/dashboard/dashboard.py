@@ -2,28 +2,20 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFrame, QStackedWidget, QStatusBar
 )
-from app.views import (
-    # EndorsementMainView,
-    QCFailedToPassed,
-    QCLabExcess,
-    ReceivingReport,
-
-    DeliveryReceipt,
-    ReturnReplacement,
-    OutgoingRecord,
-    RequisitionLogbook,
-    QCFailedEndorsement
-)
-
-from app.views.endorsement import EndorsementMainView
+# NOTE: THE VIEW MODULES ARE ONLY IMPORTED WHEN THEIR PAGE IS BUILT (see app/views/__init__.py)
+from app import views
+from app.views import endorsement as endorsement_views
 
 
 from app.helpers import load_styles, button_cursor_pointer, get_default_mac, get_ip_address
-from PyQt6.QtGui import QFont
+from PyQt6.QtGui import QFont, QShortcut, QKeySequence
 from PyQt6.QtCore import QSize, QTimer
-from typing import Type, Callable
+from typing import Type, Callable, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
+from config.db import get_pool_stats
+from app.workers.db_heartbeat import get_database_heartbeat, CONNECTED, DEGRADED, DOWN
+from app.instrumentation import get_query_metrics, enable_query_metrics, disable_query_metrics, export_query_metrics
 
 import qtawesome as qta
 import os
@@ -35,6 +27,7 @@ class FGDashboard(QMainWindow):
         username: str, 
         role: str, 
         login_widget: QWidget, 
+        warmup=None,
         *args, 
         **kwargs
     ):
@@ -46,6 +39,7 @@ class FGDashboard(QMainWindow):
         self.username = username
         self.role = role
         self.login_widget = login_widget
+        self.warmup = warmup  # app.workers.StartupWarmup (results of the first queries)
 
         self.setWindowTitle("FG Dashboard")
         # self.setGeometry(100, 100, 1300, 800)
@@ -68,24 +62,37 @@ class FGDashboard(QMainWindow):
         # MAIN CONTENT AREA
         self.stacked_widget = QStackedWidget()
 
+        # PAGE REGISTRY (index by order). EACH PAGE IS ONLY BUILT THE FIRST TIME IT IS SHOWN
+        self.pages = []
+
         # INITIALIZED STACK (index by order)
+        # OVERVIEW (READS ONLY THE PRE-AGGREGATED endorsement_daily_rollup, BUILT WITHOUT ANY QUERY)
+        self.add_stack_page("Overview", "Production KPIs", lambda: views.KPIOverview())
+
         # INCOMING
-        # self.add_stack_page("Endorsement Widget", "Endorsement Form", EndorsementMainView(session_factory=self.Session))
-        self.add_stack_page("Endorsement Widget", "Endorsement Form", EndorsementMainView(session_factory=self.Session))
-        self.add_stack_page("QC Failed to Passed Widget", "QC Failed to Passed Form", QCFailedToPassed())
-        self.add_stack_page("QC Lab Excess Widget", "QC Lab Excess Form", QCLabExcess())
-        self.add_stack_page("Receiving Report Widget", "Receiving Report Form", ReceivingReport())
+        self.add_stack_page("Endorsement Widget", "Endorsement Form", lambda: endorsement_views.EndorsementMainView(session_factory=self.Session, warmup=self.warmup))
+        self.add_stack_page("QC Failed to Passed Widget", "QC Failed to Passed Form", lambda: views.QCFailedToPassed())
+        self.add_stack_page("QC Lab Excess Widget", "QC Lab Excess Form", lambda: views.QCLabExcess())
+        self.add_stack_page("Receiving Report Widget", "Receiving Report Form", lambda: views.ReceivingReport())
 
         # OUTGOING
-        self.add_stack_page("Delivery Receipt Widget", "Delivery Receipt Form", DeliveryReceipt())
-        self.add_stack_page("Return Replacement Widget", "Return Replacement Form", ReturnReplacement())
-        self.add_stack_page("Outgoing Form Widget", "Outgoing Form", OutgoingRecord())
-        self.add_stack_page("Requisition Logbook Widget", "Requisition Logbook Form", RequisitionLogbook())
-        self.add_stack_page("QC Failed Endorsement Widget", "QC Failed Endorsement Form", QCFailedEndorsement())
+        self.add_stack_page("Delivery Receipt Widget", "Delivery Receipt Form", lambda: views.DeliveryReceipt())
+        self.add_stack_page("Return Replacement Widget", "Return Replacement Form", lambda: views.ReturnReplacement())
+        self.add_stack_page("Outgoing Form Widget", "Outgoing Form", lambda: views.OutgoingRecord())
+        self.add_stack_page("Requisition Logbook Widget", "Requisition Logbook Form", lambda: views.RequisitionLogbook())
+        self.add_stack_page("QC Failed Endorsement Widget", "QC Failed Endorsement Form", lambda: views.QCFailedEndorsement())
+
+        # ONLY THE FIRST PAGE IS BUILT BEFORE THE DASHBOARD IS SHOWN, THE REST ARE PRE-WARMED WHEN IDLE
+        self.show_page(0)
+        QTimer.singleShot(500, self.prewarm_pages)
 
         # STATUS BAR
         self.setup_status_bar()
 
+        # TOGGLE THE QUERY METRICS (THE COLLECTED METRICS ARE EXPORTED WHEN IT IS TURNED OFF)
+        self.query_metrics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+M"), self)
+        self.query_metrics_shortcut.activated.connect(self.toggle_query_metrics)
+
         # INITIALIZE STYLES
         self.apply_styles()
 
@@ -121,6 +128,10 @@ class FGDashboard(QMainWindow):
         self.db_status_text_label = QLabel()
         self.db_status_text_label.setObjectName("FGDashboard-db-status-text-label")
 
+        # CONNECTION POOL USAGE OF THE MAIN DATABASE (DETAILS OF BOTH ENGINES IN THE TOOLTIP)
+        self.pool_status_label = QLabel()
+        self.pool_status_label.setObjectName("FGDashboard-pool-status-label")
+
         self.time_label = QLabel()
         self.time_label.setObjectName("FGDashboard-status-time-label")
 
@@ -130,11 +141,11 @@ class FGDashboard(QMainWindow):
         self.default_ip_address = QLabel(get_ip_address())
         self.default_mac_address = QLabel(get_default_mac())
         
-        # icon for db_status_icon_label
+        # icon for db_status_icon_label (UPDATED BY THE DATABASE HEARTBEAT, SEE update_db_health)
         self.db_status_icon_label.setPixmap(
-            qta.icon("fa5s.check-circle", color="green").pixmap(QSize(16, 16))
+            qta.icon("fa5s.circle-notch", color="grey").pixmap(QSize(16, 16))
         )
-        self.db_status_text_label.setText("DB Connected ")
+        self.db_status_text_label.setText("DB Checking... ")
         
         self.status_bar.addPermanentWidget(self.powered_by_software)
         self.status_bar.addPermanentWidget(create_separator())
@@ -143,6 +154,7 @@ class FGDashboard(QMainWindow):
         self.status_bar.addPermanentWidget(create_separator())
         self.status_bar.addPermanentWidget(self.db_status_icon_label)
         self.status_bar.addPermanentWidget(self.db_status_text_label)
+        self.status_bar.addPermanentWidget(self.pool_status_label)
         self.status_bar.addPermanentWidget(create_separator())
         self.status_bar.addPermanentWidget(self.time_label)
         self.status_bar.addPermanentWidget(create_separator())
@@ -151,12 +163,78 @@ class FGDashboard(QMainWindow):
         self.status_bar.addPermanentWidget(self.default_mac_address)
 
         self.status_timer = QTimer(self)
-        self.status_timer.timeout.connect(
-            lambda: self.time_label.setText(f" {datetime.now().strftime('%b %d, %Y  %I:%M:%S %p')} "
-        ))
+        self.status_timer.timeout.connect(self.update_status_bar)
         self.status_timer.setObjectName("FGDashboard-status-qtimer")
 
+        self.update_status_bar()
         self.status_timer.start(1000)
+
+        # ------------------------ DATABASE HEARTBEAT ------------------------
+        self.db_heartbeat = get_database_heartbeat()
+        self.db_heartbeat.health_updated.connect(self.update_db_health)
+
+        if not self.db_heartbeat.isRunning():
+            self.db_heartbeat.start()
+
+    def update_db_health(self, health: dict):
+        states = {
+            CONNECTED: ("fa5s.check-circle", "green", "DB Connected"),
+            DEGRADED: ("fa5s.exclamation-triangle", "orange", "DB Slow"),
+            DOWN: ("fa5s.times-circle", "red", "DB Down"),
+        }
+        main_health = health.get("main", {})
+        icon_name, color, text = states.get(main_health.get("state"), states[DOWN])
+
+        if main_health.get("p50_ms") is not None:
+            text += f" (p50 {main_health['p50_ms']:.0f} ms / p95 {main_health['p95_ms']:.0f} ms)"
+
+        prodcode_health = health.get("prodcode")
+        if prodcode_health and prodcode_health["state"] == DOWN:
+            text += " | Prodcode DB Down"
+
+        self.db_status_icon_label.setPixmap(qta.icon(icon_name, color=color).pixmap(QSize(16, 16)))
+        self.db_status_text_label.setText(f"{text} ")
+
+        tooltip_lines = []
+        for name, result in health.items():
+            line = f"{name}: {result['state']}"
+
+            if result["p50_ms"] is not None:
+                line += f", last {result['latency_ms'] or '-'} ms, p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms"
+            if result["error"]:
+                line += f"\n  {result['error'].splitlines()[0]}"
+
+            tooltip_lines.append(line)
+
+        self.db_status_text_label.setToolTip("\n".join(tooltip_lines))
+
+    def update_status_bar(self):
+        self.time_label.setText(f" {datetime.now().strftime('%b %d, %Y  %I:%M:%S %p')} ")
+        self.update_pool_status()
+
+    def update_pool_status(self):
+        pool_stats = get_pool_stats()
+        main_stats = pool_stats.get("main")
+
+        if main_stats is None:
+            self.pool_status_label.setText("")
+            return
+
+        self.pool_status_label.setText(
+            f"Pool {main_stats['in_use']}/{main_stats['size'] + main_stats['max_overflow']} "
+            f"(wait {main_stats['last_wait_ms']:.0f} ms)"
+        )
+
+        tooltip_lines = []
+        for name, stats in pool_stats.items():
+            tooltip_lines.append(
+                f"{name}: in use {stats['in_use']}, idle {stats['checked_in']}, "
+                f"overflow {stats['overflow']}/{stats['max_overflow']}, "
+                f"checkouts {stats['checkouts']}, wait avg {stats['avg_wait_ms']} ms / max {stats['max_wait_ms']} ms, "
+                f"timeouts {stats['timeouts']}, connect failures {stats['connect_failures']}"
+            )
+
+        self.pool_status_label.setToolTip("\n".join(tooltip_lines))
     
     def side_menu_widget(self):
         side_menu = QWidget()
@@ -191,6 +269,13 @@ class FGDashboard(QMainWindow):
         layout.addWidget(profile)
         layout.addWidget(separator)
 
+        btn_overview = QPushButton("  Overview")
+        btn_overview.setIcon(qta.icon("fa5s.chart-line", color="#ecf0f1"))
+        btn_overview.clicked.connect(lambda: self.show_page(0))
+        button_cursor_pointer(btn_overview)
+
+        layout.addWidget(btn_overview)
+
         # === Incoming Section ===
         incoming_label = QLabel("INCOMING")
         incoming_label.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
@@ -199,22 +284,22 @@ class FGDashboard(QMainWindow):
 
         btn_endorsement = QPushButton("  Endorsement Form")
         btn_endorsement.setIcon(qta.icon("fa5s.file-signature", color="#ecf0f1"))
-        btn_endorsement.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+        btn_endorsement.clicked.connect(lambda: self.show_page(1))
         button_cursor_pointer(btn_endorsement)
           
         btn_qc_failed_to_passed = QPushButton("  QC Failed → Passed")
         btn_qc_failed_to_passed.setIcon(qta.icon("fa5s.check-double", color="#ecf0f1"))
-        btn_qc_failed_to_passed.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))  # Index 1
+        btn_qc_failed_to_passed.clicked.connect(lambda: self.show_page(2))  # Index 2
         button_cursor_pointer(btn_qc_failed_to_passed)
 
         btn_qc_lab_excess = QPushButton("  QC Lab Excess Sheet")
         btn_qc_lab_excess.setIcon(qta.icon("fa5s.vials", color="#ecf0f1"))
-        btn_qc_lab_excess.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))  # Index 2
+        btn_qc_lab_excess.clicked.connect(lambda: self.show_page(3))  # Index 3
         button_cursor_pointer(btn_qc_lab_excess)
 
         btn_receiving_report = QPushButton("  Receiving Report")
         btn_receiving_report.setIcon(qta.icon("fa5s.file-invoice", color="#ecf0f1"))
-        btn_receiving_report.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(3))  # Index 3
+        btn_receiving_report.clicked.connect(lambda: self.show_page(4))  # Index 4
         button_cursor_pointer(btn_receiving_report)
 
         layout.addWidget(btn_endorsement)
@@ -230,27 +315,27 @@ class FGDashboard(QMainWindow):
 
         btn_delivery_receipt = QPushButton("  Delivery Receipt")
         btn_delivery_receipt.setIcon(qta.icon("fa5s.truck", color="#ecf0f1"))
-        btn_delivery_receipt.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(4))  # Index 5
+        btn_delivery_receipt.clicked.connect(lambda: self.show_page(5))  # Index 5
         button_cursor_pointer(btn_delivery_receipt)
 
         btn_rrf = QPushButton("  Return Replacement")
         btn_rrf.setIcon(qta.icon("fa5s.exchange-alt", color="#ecf0f1"))
-        btn_rrf.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(5))  # Index 5
+        btn_rrf.clicked.connect(lambda: self.show_page(6))  # Index 6
         button_cursor_pointer(btn_rrf)
 
         btn_outgoing_form = QPushButton("  Outgoing Record Form")
         btn_outgoing_form.setIcon(qta.icon("fa5s.file-export", color="#ecf0f1"))
-        btn_outgoing_form.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(6))  # Index 6
+        btn_outgoing_form.clicked.connect(lambda: self.show_page(7))  # Index 7
         button_cursor_pointer(btn_outgoing_form)
 
         btn_logbook = QPushButton("  Requisition Logbook")
         btn_logbook.setIcon(qta.icon("fa5s.book", color="#ecf0f1"))
-        btn_logbook.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(7))  # Index 7
+        btn_logbook.clicked.connect(lambda: self.show_page(8))  # Index 8
         button_cursor_pointer(btn_logbook)
 
         btn_qc_failed_out = QPushButton("  QC Failed Endorsement")
         btn_qc_failed_out.setIcon(qta.icon("fa5s.times-circle", color="#ecf0f1"))
-        btn_qc_failed_out.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(8))  # Index 8
+        btn_qc_failed_out.clicked.connect(lambda: self.show_page(9))  # Index 9
         button_cursor_pointer(btn_qc_failed_out)
 
         layout.addWidget(btn_delivery_receipt)
@@ -272,13 +357,32 @@ class FGDashboard(QMainWindow):
         return side_menu
 
     # this is for adding the stack to the initialized stack here in the dashboard
-    def add_stack_page(self, title: str, message: str, widget_instance: Type[QWidget]):
-        page = self.create_stack_page(title, message, widget_instance)
+    def add_stack_page(
+        self, 
+        title: str, 
+        message: str, 
+        widget_factory: Callable[[], QWidget], 
+        prewarm: bool = True
+    ) -> int:
+        """
+        Register a page. The widget is created by widget_factory the first time the page is shown
+        (or when the dashboard is idle if prewarm is True). Returns the index of the page.
+        """
+        page, page_layout = self.create_stack_page(title, message)
         self.stacked_widget.addWidget(page)
 
+        self.pages.append({
+            "factory": widget_factory,
+            "layout": page_layout,
+            "widget": None,
+            "prewarm": prewarm,
+        })
+
+        return len(self.pages) - 1
+
     # this is for creating the stack page
-    def create_stack_page(self, title: str, message: str, widget_instance: Type[QWidget]):
-        """Create a unified page with title, message, and embedded widget"""
+    def create_stack_page(self, title: str, message: str):
+        """Create a unified page with title and message. The widget is inserted later by build_page()"""
 
         main_page = QWidget()
         layout = QVBoxLayout(main_page)
@@ -296,16 +400,63 @@ class FGDashboard(QMainWindow):
 
         layout.addWidget(title_label)
         layout.addWidget(message_label)
-        layout.addWidget(widget_instance)
         layout.addStretch()
 
-        return main_page
+        return main_page, layout
+
+    def build_page(self, index: int) -> Optional[QWidget]:
+        """Create the widget of the page if it was not created yet and return it"""
+        if not 0 <= index < len(self.pages):
+            return None
+
+        page = self.pages[index]
+
+        if page["widget"] is None:
+            widget_instance = page["factory"]()
+            
+            # INSERT BEFORE THE STRETCH (title, message, widget, stretch)
+            page["layout"].insertWidget(page["layout"].count() - 1, widget_instance)
+            page["widget"] = widget_instance
+
+        return page["widget"]
+
+    def show_page(self, index: int):
+        self.build_page(index)
+        self.stacked_widget.setCurrentIndex(index)
+
+    def prewarm_pages(self):
+        """Build the next page marked for pre-warming, one page per idle event loop turn"""
+        for index, page in enumerate(self.pages):
+            if page["widget"] is None and page["prewarm"]:
+                self.build_page(index)
+                QTimer.singleShot(0, self.prewarm_pages)
+                
+                return
 
     def apply_styles(self):
         qss_path = os.path.join(os.path.dirname(__file__), "styles", "dashboard.css")
 
         load_styles(qss_path, self)
     
+    def toggle_query_metrics(self):
+        if get_query_metrics().enabled:
+            disable_query_metrics()
+            json_path, prom_path = export_query_metrics()
+            self.status_bar.showMessage(f"Query metrics off, exported to {json_path} and {prom_path}", 10000)
+        else:
+            enable_query_metrics()
+            self.status_bar.showMessage("Query metrics on (Ctrl+Shift+M to stop and export)", 10000)
+
+    def closeEvent(self, event):
+        # STOP PINGING THE DATABASES (THE NEXT LOGIN STARTS THE HEARTBEAT AGAIN)
+        self.db_heartbeat.health_updated.disconnect(self.update_db_health)
+        self.db_heartbeat.stop()
+
+        if get_query_metrics().enabled:
+            export_query_metrics()
+
+        super().closeEvent(event)
+
     def close_dashboard_main_window(self):
         # close the main widget here
         self.close()
@@ -1,12 +1,14 @@
 # function for pointing hand cursor
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QPushButton, QWidget
+from PyQt6.QtGui import QIcon
 from sqlalchemy import text
 from sqlalchemy.orm import Session, DeclarativeMeta, sessionmaker
 from sqlalchemy.engine import Engine
 from typing import Type, Dict, Any
 from constants.Enums import CategoryEnum
 from app.StyledMessage import TerminalCustomStylePrint
+from app.repositories.lot_numbers import parse_lot_number
 
 import uuid
 import socket
@@ -33,6 +35,12 @@ def create_session(engine: Engine) -> sessionmaker[Session]:
     
     return session_factory
 
+# FOR CREATING A QTAWESOME ICON (qtawesome LOADS ITS ICON FONTS ON IMPORT SO IT IS IMPORTED ON FIRST USE)
+def get_icon(name: str, **kwargs) -> QIcon:
+    import qtawesome as qta
+
+    return qta.icon(name, **kwargs)
+
 # FOR CREATING CURSOR POINTER ON BUTTON
 def button_cursor_pointer(button_widget: Type[QPushButton]):
     if isinstance(button_widget, QPushButton):
@@ -109,14 +117,12 @@ def load_styles(qss_path, classWidget: Type[QWidget]) -> None:
 # ------    FOR CREATING THE ENDORSEMENT TABLE 2 and LOT EXCESS ITEMS -------
 def parse_lot_range(lot_range: str):
     """Extracts start and end numeric parts from the lot range."""
-    start_lot, end_lot = lot_range.split("-")
-    start_num, start_suffix = int(start_lot[:4]), start_lot[4:]
-    end_num, end_suffix = int(end_lot[:4]), end_lot[4:]
+    lot = parse_lot_number(lot_range)
 
-    if start_suffix != end_suffix:
+    if lot.suffix != lot.end_suffix:
         raise ValueError("Lot suffixes must match.")
 
-    return start_num, end_num, start_suffix
+    return lot.start_num, lot.end_num, lot.suffix
 
 def populate_endorsement_items(
     endorsement_model: Type[DeclarativeMeta],
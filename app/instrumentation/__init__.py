@@ -0,0 +1,21 @@
+from app.instrumentation.query_metrics import (
+    QueryMetrics,
+    query_context,
+    instrumented_action,
+    fingerprint_statement,
+    get_query_metrics,
+    enable_query_metrics,
+    disable_query_metrics,
+    export_query_metrics,
+)
+from app.instrumentation.slow_query_log import (
+    SlowQueryLog,
+    redact_parameters,
+    get_slow_query_log,
+    enable_slow_query_log,
+)
+from app.instrumentation.ui_watchdog import (
+    EventLoopWatchdog,
+    timed_slot,
+    get_slot_timings,
+)
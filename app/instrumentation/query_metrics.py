@@ -0,0 +1,356 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+import time
+
+# ------------------------ ORIGIN OF THE QUERIES ------------------------
+# NOTE: ContextVar (not a global) so the worker threads and the GUI thread keep their own tag
+_current_tag: ContextVar[Tuple[str, str]] = ContextVar("query_metrics_tag", default=("unknown", "unknown"))
+
+# UPPER BOUNDS OF THE LATENCY BUCKETS IN MILLISECONDS (THE LAST BUCKET IS +Inf)
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAMETER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+@contextmanager
+def query_context(view: str, action: str):
+    """Tags every query executed inside the block with the view and the action that triggered it."""
+    token = _current_tag.set((view, action))
+
+    try:
+        yield
+    finally:
+        _current_tag.reset(token)
+
+def signal_argument_fitter(method):
+    """
+    Qt signals (e.g. clicked(bool)) pass more arguments than a slot accepts and Qt drops them,
+    but only for the real method. Wrappers of slots use this to drop them the same way.
+    """
+    code = inspect.unwrap(method).__code__
+
+    if code.co_flags & inspect.CO_VARARGS:
+        return lambda args: args
+
+    max_positional = code.co_argcount - 1  # WITHOUT self
+
+    return lambda args: args[:max_positional]
+
+def instrumented_action(action: Optional[str] = None):
+    """
+    Decorator for view methods, tags their queries with the class name and the method name.
+
+    Args:
+        action (str, optional): Name of the action. Defaults to the method name.
+    """
+    def decorator(method):
+        fit_arguments = signal_argument_fitter(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            args = fit_arguments(args)
+
+            with query_context(type(self).__name__, action or method.__name__):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+def fingerprint_statement(statement: str) -> str:
+    """Replaces the literals and bind parameters of a statement so the same query with other values groups together."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+class QueryMetrics:
+    """
+    In-process registry of the executed statements, grouped by fingerprint, view and action.
+
+    The engine events are only listened to while the registry is enabled, so a disabled
+    registry costs nothing on the query path.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines: List[Engine] = []
+        self._entries: Dict[Tuple[str, str, str], dict] = {}
+        self._statements: Dict[str, str] = {}
+        # THE COMPILED STATEMENTS USE BIND PARAMETERS, SO THE SAME STRING COMES BACK AND IS ONLY NORMALIZED ONCE
+        self._fingerprints: Dict[str, Tuple[str, str]] = {}
+
+    # ------------------------ TOGGLE ------------------------
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    def enable(self, *engines: Engine) -> None:
+        for db_engine in engines:
+            if db_engine in self._engines:
+                continue
+
+            event.listen(db_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(db_engine, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(db_engine, "handle_error", self._handle_error)
+            self._engines.append(db_engine)
+
+    def disable(self) -> None:
+        for db_engine in self._engines:
+            event.remove(db_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(db_engine, "after_cursor_execute", self._after_cursor_execute)
+            event.remove(db_engine, "handle_error", self._handle_error)
+
+        self._engines = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._statements.clear()
+
+    # ------------------------ ENGINE EVENTS ------------------------
+    # NOTE: THE START TIME LIVES ON THE EXECUTION CONTEXT OF THE STATEMENT, NOT ON THE POOLED CONNECTION,
+    # SO A STATEMENT THAT RAISES LEAVES NOTHING BEHIND (after_cursor_execute IS NOT FIRED FOR IT)
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_metrics_start", None)
+
+        if started is None:
+            # THE REGISTRY WAS ENABLED WHILE THIS STATEMENT WAS RUNNING
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        rows = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+
+        self.record(statement, elapsed_ms, rows)
+
+    def _handle_error(self, exception_context):
+        # FAILED, TIMED OUT (statement_timeout) AND CANCELED (pg_cancel_backend) STATEMENTS, THE SLOWEST ONES
+        started = getattr(exception_context.execution_context, "_query_metrics_start", None)
+
+        if started is None or exception_context.statement is None:
+            # CONNECT ERROR OR STATEMENT STARTED BEFORE THE REGISTRY WAS ENABLED
+            return
+
+        from config.timeouts import error_sqlstate
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        original = exception_context.original_exception
+
+        self.record(exception_context.statement, elapsed_ms, error=error_sqlstate(original) or type(original).__name__)
+
+    def record(self, statement: str, elapsed_ms: float, rows: int = 0, error: Optional[str] = None) -> None:
+        """
+        Adds one execution of a statement to the registry.
+
+        Args:
+            statement (str): The executed SQL (grouped by its fingerprint).
+            elapsed_ms (float): Duration, also for a failed statement (a timeout is the slowest case).
+            rows (int): Rows returned or affected.
+            error (str, optional): SQLSTATE (e.g. "57014" for a timeout or cancel) or exception class of a failed statement.
+        """
+        view, action = _current_tag.get()
+        cached = self._fingerprints.get(statement)
+
+        if cached is None:
+            normalized = fingerprint_statement(statement)
+            cached = self._fingerprints[statement] = (hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized)
+
+        fingerprint, normalized = cached
+        key = (fingerprint, view, action)
+
+        with self._lock:
+            self._statements.setdefault(fingerprint, normalized)
+            entry = self._entries.get(key)
+
+            if entry is None:
+                entry = self._entries[key] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                    "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                    "errors": {},
+                }
+
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["rows"] += rows
+
+            if error is not None:
+                entry["errors"][error] = entry["errors"].get(error, 0) + 1
+
+            bucket_index = next(
+                (index for index, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+                len(LATENCY_BUCKETS_MS)
+            )
+            entry["buckets"][bucket_index] += 1
+
+    # ------------------------ EXPORT ------------------------
+    def snapshot(self) -> List[dict]:
+        """Returns one dictionary per (fingerprint, view, action), the most expensive first."""
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": fingerprint,
+                    "statement": self._statements[fingerprint],
+                    "view": view,
+                    "action": action,
+                    "count": entry["count"],
+                    "total_ms": round(entry["total_ms"], 2),
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "rows": entry["rows"],
+                    "buckets": dict(zip([*map(str, LATENCY_BUCKETS_MS), "+Inf"], entry["buckets"])),
+                    "errors": dict(entry["errors"]),
+                }
+                for (fingerprint, view, action), entry in self._entries.items()
+            ]
+
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def export_json(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"generated_at": time.time(), "queries": self.snapshot()}, f, indent=2)
+
+        return path
+
+    def to_prometheus(self) -> str:
+        def label(value: str) -> str:
+            return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+        lines = [
+            "# HELP fg_query_duration_milliseconds Duration of the executed SQL statements.",
+            "# TYPE fg_query_duration_milliseconds histogram",
+        ]
+        rows_lines = [
+            "# HELP fg_query_rows_total Rows returned or affected by the SQL statements.",
+            "# TYPE fg_query_rows_total counter",
+        ]
+        errors_lines = [
+            "# HELP fg_query_errors_total Failed SQL statements by SQLSTATE (57014 = timeout or cancel) or exception class.",
+            "# TYPE fg_query_errors_total counter",
+        ]
+        info_lines = [
+            "# HELP fg_query_info Normalized statement of a fingerprint.",
+            "# TYPE fg_query_info gauge",
+        ]
+
+        for row in self.snapshot():
+            labels = f'fingerprint="{row["fingerprint"]}",view="{label(row["view"])}",action="{label(row["action"])}"'
+            cumulative = 0
+
+            for bound, count in row["buckets"].items():
+                cumulative += count
+                lines.append(f'fg_query_duration_milliseconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+
+            lines.append(f"fg_query_duration_milliseconds_sum{{{labels}}} {row['total_ms']}")
+            lines.append(f"fg_query_duration_milliseconds_count{{{labels}}} {row['count']}")
+            rows_lines.append(f"fg_query_rows_total{{{labels}}} {row['rows']}")
+
+            for error, count in row["errors"].items():
+                errors_lines.append(f'fg_query_errors_total{{{labels},error="{label(error)}"}} {count}')
+
+        with self._lock:
+            for fingerprint, statement in self._statements.items():
+                info_lines.append(f'fg_query_info{{fingerprint="{fingerprint}",statement="{label(statement)}"}} 1')
+
+        return "\n".join(lines + rows_lines + errors_lines + info_lines) + "\n"
+
+    def export_prometheus(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # WRITE THEN RENAME SO THE NODE EXPORTER TEXTFILE COLLECTOR NEVER READS A HALF WRITTEN FILE
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+
+        os.replace(tmp_path, path)
+
+        return path
+
+# ------------------------ SINGLETON ------------------------
+_query_metrics = QueryMetrics()
+
+def get_query_metrics() -> QueryMetrics:
+    return _query_metrics
+
+def config_engines() -> List[Engine]:
+    """Sync engines of config.db to instrument: main and prodcode if configured (the async one, see instrument_config_engines)."""
+    from config.db import get_engine, get_prodcode_engine, prodcode_db
+
+    engines = [get_engine()]
+    if prodcode_db is not None:
+        engines.append(get_prodcode_engine())
+
+    return engines
+
+# ONE HOOK PER REGISTRY (id -> hook), config.db KEEPS A SINGLE PENDING COPY OF EACH
+_async_engine_hooks: Dict[int, Callable[[Engine], None]] = {}
+
+def instrument_config_engines(registry) -> None:
+    """
+    Enables a registry (QueryMetrics / SlowQueryLog) on the engines of config.db.
+
+    The asyncio engine is not created for this: its sync_engine is added at once if it already
+    exists, otherwise when get_async_engine() first creates it (config.db.on_async_engine_created)
+    and only if the registry is still enabled then.
+    """
+    from config.db import on_async_engine_created
+
+    registry.enable(*config_engines())
+
+    hook = _async_engine_hooks.setdefault(
+        id(registry),
+        lambda async_sync_engine: registry.enable(async_sync_engine) if registry.enabled else None
+    )
+    on_async_engine_created(hook)
+
+def enable_query_metrics() -> QueryMetrics:
+    """Starts collecting on the engines of config.db (see instrument_config_engines)."""
+    instrument_config_engines(_query_metrics)
+
+    return _query_metrics
+
+def disable_query_metrics() -> QueryMetrics:
+    _query_metrics.disable()
+
+    return _query_metrics
+
+def export_query_metrics(directory: str = None) -> Tuple[str, str]:
+    """
+    Writes query_metrics.json and query_metrics.prom.
+
+    Args:
+        directory (str, optional): Output directory. Defaults to the QUERY_METRICS_DIR environment variable or "metrics".
+
+    Returns:
+        Tuple[str, str]: Paths of the JSON and the Prometheus text file.
+    """
+    directory = directory or os.getenv("QUERY_METRICS_DIR", "metrics")
+
+    return (
+        _query_metrics.export_json(os.path.join(directory, "query_metrics.json")),
+        _query_metrics.export_prometheus(os.path.join(directory, "query_metrics.prom")),
+    )
@@ -0,0 +1,278 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from app.instrumentation.query_metrics import query_context, fingerprint_statement, instrument_config_engines
+
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+# PARAMETERS WHOSE NAME MATCHES ARE NEVER WRITTEN TO THE LOG
+_SENSITIVE_PARAMETER = re.compile(r"password|passwd|secret|token|hash", re.IGNORECASE)
+_MAX_PARAMETER_LENGTH = 64
+
+# ONLY PLAIN READS ARE EXPLAINED, EXPLAIN ANALYZE EXECUTES THE STATEMENT AGAIN
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_LOCKING_READ = re.compile(r"\bFOR\s+(UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b", re.IGNORECASE)
+
+# ROOT OF THE PROJECT, USED TO FIND THE CALLER OF THE QUERY IN THE STACK
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_INSTRUMENTATION_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def redact_parameters(parameters: Any) -> Any:
+    """Masks the sensitive parameters and shortens the long ones (also for executemany lists)."""
+    def redact_value(name: Optional[str], value: Any) -> Any:
+        if name is not None and _SENSITIVE_PARAMETER.search(str(name)):
+            return "***"
+
+        if isinstance(value, (bytes, bytearray)):
+            return f"<{len(value)} bytes>"
+
+        if isinstance(value, str) and len(value) > _MAX_PARAMETER_LENGTH:
+            return f"{value[:_MAX_PARAMETER_LENGTH]}...({len(value)} chars)"
+
+        return value
+
+    if isinstance(parameters, dict):
+        return {name: redact_value(name, value) for name, value in parameters.items()}
+
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return [redact_parameters(row) for row in parameters]
+
+        return [redact_value(None, value) for value in parameters]
+
+    return parameters
+
+def find_caller_frame() -> str:
+    """Returns 'file:line in function' of the innermost project frame that is not part of the instrumentation."""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+
+        if not filename.startswith(_PROJECT_ROOT) or filename.startswith(_INSTRUMENTATION_DIR):
+            continue
+
+        if "site-packages" in filename:
+            continue
+
+        return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+
+    return "unknown"
+
+class SlowQueryLog:
+    """
+    Writes every statement slower than the threshold to a rotating log file.
+
+    Each entry has the duration, the statement, the redacted parameters and the caller.
+    SELECT statements are also explained with EXPLAIN (ANALYZE, BUFFERS) on a separate
+    connection in a background thread, so the GUI never waits for the plan.
+
+    Args:
+        threshold_ms (float): Statements slower than this are logged. Defaults to SLOW_QUERY_THRESHOLD_MS (500).
+        log_path (str): Log file. Defaults to SLOW_QUERY_LOG_PATH ("logs/slow_queries.log").
+        explain (bool): Capture the plan of SELECT statements. Defaults to SLOW_QUERY_EXPLAIN (true).
+        explain_interval (float): Seconds before the same statement fingerprint is explained again.
+    """
+    def __init__(
+        self,
+        threshold_ms: float = None,
+        log_path: str = None,
+        explain: bool = None,
+        explain_interval: float = 600
+    ):
+        self.threshold_ms = threshold_ms if threshold_ms is not None else float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 500))
+        self.log_path = log_path or os.getenv("SLOW_QUERY_LOG_PATH", os.path.join("logs", "slow_queries.log"))
+        self.explain = explain if explain is not None else os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+        self.explain_interval = explain_interval
+
+        self._engines: List[Engine] = []
+        self._explained_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._logger: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    @property
+    def logger(self) -> logging.Logger:
+        if self._logger is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+
+            handler = RotatingFileHandler(self.log_path, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+
+            self._logger = logging.getLogger("fg.slow_query")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.addHandler(handler)
+
+        return self._logger
+
+    # ------------------------ TOGGLE ------------------------
+    def enable(self, *engines: Engine) -> None:
+        for db_engine in engines:
+            if db_engine in self._engines:
+                continue
+
+            event.listen(db_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(db_engine, "after_cursor_execute", self._after_cursor_execute)
+            event.listen(db_engine, "handle_error", self._handle_error)
+            self._engines.append(db_engine)
+
+        if self.explain and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def disable(self) -> None:
+        for db_engine in self._engines:
+            event.remove(db_engine, "before_cursor_execute", self._before_cursor_execute)
+            event.remove(db_engine, "after_cursor_execute", self._after_cursor_execute)
+            event.remove(db_engine, "handle_error", self._handle_error)
+
+        self._engines = []
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # ------------------------ ENGINE EVENTS ------------------------
+    # NOTE: THE START TIME LIVES ON THE EXECUTION CONTEXT (SEE QueryMetrics), A FAILED STATEMENT LEAVES NOTHING ON THE POOLED CONNECTION
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._slow_query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_start", None)
+
+        if started is None:
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if elapsed_ms < self.threshold_ms or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        self.logger.warning(
+            "SLOW QUERY %.1f ms | caller: %s | executemany: %s\n  statement: %s\n  parameters: %r",
+            elapsed_ms,
+            find_caller_frame(),
+            executemany,
+            " ".join(statement.split()),
+            redact_parameters(parameters),
+        )
+
+        if self._should_explain(statement, executemany):
+            db_engine = conn.engine
+
+            # THE ASYNC ENGINE CANNOT BE USED FROM A PLAIN THREAD, ITS STATEMENTS ARE EXPLAINED ON THE
+            # SYNC ENGINE OF THE SAME DATABASE (BOTH DRIVERS USE THE SAME PARAMETER STYLE)
+            if db_engine.dialect.is_async:
+                from config.db import get_engine
+                db_engine = get_engine()
+
+            self._executor.submit(self._explain, db_engine, statement, parameters)
+
+    def _handle_error(self, exception_context):
+        # after_cursor_execute IS NOT FIRED FOR A STATEMENT THAT RAISES: THE STATEMENTS STOPPED BY statement_timeout
+        # OR pg_cancel_backend (SQLSTATE 57014) ARE LOGGED HERE, ALWAYS, THE OTHER FAILED ONES IF THEY WERE SLOW
+        started = getattr(exception_context.execution_context, "_slow_query_start", None)
+
+        # EXPLAIN FAILURES ARE LOGGED BY _explain
+        if started is None or exception_context.statement is None or exception_context.statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        from config.timeouts import QUERY_CANCELED_SQLSTATE, error_sqlstate
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        original = exception_context.original_exception
+        sqlstate = error_sqlstate(original)
+
+        if elapsed_ms < self.threshold_ms and sqlstate != QUERY_CANCELED_SQLSTATE:
+            return
+
+        # NEVER EXPLAINED: EXPLAIN ANALYZE WOULD RUN THE STATEMENT THAT JUST TIMED OUT AGAIN
+        self.logger.warning(
+            "FAILED QUERY %.1f ms | SQLSTATE %s (%s) | caller: %s | executemany: %s\n  statement: %s\n  parameters: %r",
+            elapsed_ms,
+            sqlstate or "-",
+            type(original).__name__,
+            find_caller_frame(),
+            exception_context.execution_context.executemany,
+            " ".join(exception_context.statement.split()),
+            redact_parameters(exception_context.parameters),
+        )
+
+    def record_pipeline(self, name: str, statements: List[str], elapsed_ms: float) -> None:
+        """
+        Logs a psycopg pipeline slower than the threshold (e.g. EndorsementWriter.save).
+
+        The pipelines do not go through a SQLAlchemy engine, so the engine events never see
+        them. The time is the one of the whole pipeline, no parameter is logged and nothing
+        is explained (the statements write).
+        """
+        if not self.enabled or elapsed_ms < self.threshold_ms:
+            return
+
+        self.logger.warning(
+            "SLOW PIPELINE %.1f ms | %s | %d statement(s)\n  statements: %s",
+            elapsed_ms,
+            name,
+            len(statements),
+            "\n              ".join(" ".join(statement.split()) for statement in statements),
+        )
+
+    # ------------------------ EXPLAIN ------------------------
+    def _should_explain(self, statement: str, executemany: bool) -> bool:
+        if not self.explain or self._executor is None or executemany:
+            return False
+
+        if not _EXPLAINABLE.match(statement) or _LOCKING_READ.search(statement):
+            return False
+
+        fingerprint = fingerprint_statement(statement)
+        now = time.monotonic()
+
+        with self._lock:
+            if now - self._explained_at.get(fingerprint, float("-inf")) < self.explain_interval:
+                return False
+
+            self._explained_at[fingerprint] = now
+
+        return True
+
+    def _explain(self, db_engine: Engine, statement: str, parameters: Any) -> None:
+        try:
+            with query_context("SlowQueryLog", "explain"), db_engine.connect() as connection:
+                # THE PLAN IS NOT WORTH A RUNAWAY QUERY, AND THE TRANSACTION IS ROLLED BACK ON EXIT
+                connection.exec_driver_sql("SET LOCAL statement_timeout = '30s'")
+                rows = connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).fetchall()
+
+            plan = "\n    ".join(row[0] for row in rows)
+            self.logger.info("EXPLAIN of: %s\n    %s", " ".join(statement.split())[:200], plan)
+        except Exception as e:
+            self.logger.info("EXPLAIN failed for: %s | %s", " ".join(statement.split())[:200], e)
+
+# ------------------------ SINGLETON ------------------------
+_slow_query_log = None
+
+def get_slow_query_log() -> SlowQueryLog:
+    global _slow_query_log
+
+    if _slow_query_log is None:
+        _slow_query_log = SlowQueryLog()
+
+    return _slow_query_log
+
+def enable_slow_query_log() -> SlowQueryLog:
+    """Starts logging the slow statements of the engines of config.db (see instrument_config_engines)."""
+    slow_query_log = get_slow_query_log()
+    instrument_config_engines(slow_query_log)
+
+    return slow_query_log
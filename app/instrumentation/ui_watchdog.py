@@ -0,0 +1,193 @@
+from PyQt6.QtCore import QTimer
+from collections import Counter
+from functools import wraps
+from typing import Dict, List, Optional
+
+from app.instrumentation.query_metrics import signal_argument_fitter
+
+import os
+import sys
+import threading
+import time
+import traceback
+
+# ------------------------ SLOT TIMINGS ------------------------
+# NOTE: THE SLOTS RUN ON THE GUI THREAD, THE WATCHDOG THREAD ONLY READS THE LAST ENTRY OF THE STACK
+_active_handlers: List[str] = []
+_slot_timings: Dict[str, dict] = {}
+_timings_lock = threading.Lock()
+
+def timed_slot(method):
+    """Times every call of a slot and marks it as the running handler for the stall detector."""
+    fit_arguments = signal_argument_fitter(method)
+    name = method.__qualname__
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        args = (args[0], *fit_arguments(args[1:])) if args else args
+        _active_handlers.append(name)
+        start = time.perf_counter()
+
+        try:
+            return method(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _active_handlers.pop()
+
+            with _timings_lock:
+                timing = _slot_timings.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+                timing["calls"] += 1
+                timing["total_ms"] += elapsed_ms
+                timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+
+    return wrapper
+
+def get_slot_timings() -> Dict[str, dict]:
+    with _timings_lock:
+        return {
+            name: {**timing, "avg_ms": round(timing["total_ms"] / timing["calls"], 2)}
+            for name, timing in _slot_timings.items()
+        }
+
+# ------------------------ STALL DETECTOR ------------------------
+class EventLoopWatchdog:
+    """
+    Detects when the Qt event loop stops processing events.
+
+    A QTimer on the GUI thread stamps a heartbeat every tick_ms. A daemon thread checks the
+    heartbeat and, once it is older than threshold_ms, samples the stack of the GUI thread
+    (sys._current_frames) until the loop is alive again. Every stall is recorded with its
+    duration, the timed_slot that was running and the most frequent sampled stack.
+
+    Args:
+        threshold_ms (float): Stall threshold. Defaults to UI_STALL_THRESHOLD_MS (250).
+        tick_ms (int): Interval of the GUI heartbeat.
+        sample_ms (int): Interval between two stack samples during a stall.
+    """
+    def __init__(self, threshold_ms: float = None, tick_ms: int = 50, sample_ms: int = 100):
+        self.threshold_ms = threshold_ms or float(os.getenv("UI_STALL_THRESHOLD_MS", 250))
+        self.tick_ms = tick_ms
+        self.sample_ms = sample_ms
+
+        self.stalls: List[dict] = []
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._timer = QTimer()
+        self._timer.setObjectName("EventLoopWatchdog-heartbeat-qtimer")
+        self._timer.timeout.connect(self._beat)
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+
+    def start(self) -> "EventLoopWatchdog":
+        """Must be called from the GUI thread."""
+        self._gui_thread_id = threading.get_ident()
+        self._beat()
+        self._timer.start(self.tick_ms)
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _sample_gui_stack(self) -> Optional[str]:
+        frame = sys._current_frames().get(self._gui_thread_id)
+
+        if frame is None:
+            return None
+
+        return "".join(traceback.format_stack(frame, limit=15))
+
+    def _watch(self):
+        stall = None
+        poll_seconds = min(self.tick_ms, self.sample_ms) / 1000
+
+        while not self._stop_event.wait(poll_seconds):
+            last_beat = self._last_beat
+            lag_ms = (time.monotonic() - last_beat) * 1000
+
+            if lag_ms > self.threshold_ms:
+                if stall is None:
+                    stall = {"started": last_beat, "handlers": Counter(), "stacks": Counter()}
+
+                stack = self._sample_gui_stack()
+                if stack:
+                    stall["stacks"][stack] += 1
+                stall["handlers"][_active_handlers[-1] if _active_handlers else "<no timed slot>"] += 1
+
+            elif stall is not None:
+                self._record_stall(stall, last_beat)
+                stall = None
+
+    def _record_stall(self, stall: dict, resumed_at: float) -> None:
+        duration_ms = (resumed_at - stall["started"]) * 1000 - self.tick_ms
+        handler = stall["handlers"].most_common(1)[0][0]
+        stack = stall["stacks"].most_common(1)[0][0] if stall["stacks"] else ""
+
+        self.stalls.append({
+            "handler": handler,
+            "duration_ms": round(duration_ms, 1),
+            "samples": sum(stall["stacks"].values()),
+            "stack": stack,
+            "at": time.strftime("%H:%M:%S"),
+        })
+
+        print(f"UI STALL: {duration_ms:.0f} ms in {handler}")
+
+    def report(self, top: int = 10) -> str:
+        """Worst offenders of the session: stalls grouped by handler, then the slot timings."""
+        by_handler: Dict[str, dict] = {}
+
+        for stall in self.stalls:
+            entry = by_handler.setdefault(stall["handler"], {"stalls": 0, "total_ms": 0.0, "worst": stall})
+            entry["stalls"] += 1
+            entry["total_ms"] += stall["duration_ms"]
+
+            if stall["duration_ms"] > entry["worst"]["duration_ms"]:
+                entry["worst"] = stall
+
+        lines = [f"--- UI STALLS (> {self.threshold_ms:.0f} ms): {len(self.stalls)} ---"]
+
+        for handler, entry in sorted(by_handler.items(), key=lambda item: item[1]["total_ms"], reverse=True)[:top]:
+            lines.append(
+                f"{handler}: {entry['stalls']} stall(s), total {entry['total_ms']:.0f} ms, "
+                f"worst {entry['worst']['duration_ms']:.0f} ms at {entry['worst']['at']}"
+            )
+            if entry["worst"]["stack"]:
+                lines.append("    " + entry["worst"]["stack"].strip().replace("\n", "\n    "))
+
+        lines.append("--- SLOT TIMINGS ---")
+        timings = sorted(get_slot_timings().items(), key=lambda item: item[1]["max_ms"], reverse=True)
+
+        for name, timing in timings[:top]:
+            lines.append(
+                f"{name}: {timing['calls']} call(s), avg {timing['avg_ms']:.1f} ms, max {timing['max_ms']:.1f} ms"
+            )
+
+        return "\n".join(lines)
+
+    def write_report(self, path: str = None) -> str:
+        path = path or os.getenv("UI_STALL_REPORT_PATH", os.path.join("logs", "ui_stalls.log"))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"\n=== SESSION {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n{self.report()}\n")
+
+        return path
+
+    def stop_and_report(self) -> None:
+        self.stop()
+        print(self.report())
+        self.write_report()
@@ -0,0 +1,31 @@
+from typing import Any, Callable, Dict
+
+import importlib
+import sys
+
+# ------------------------ LAZY PACKAGE ATTRIBUTES (PEP 562) ------------------------
+# NOTE: standard library only, the packages that use it (app.repositories, app.widgets...) must
+# stay cheap to import before the login window is shown (see scripts/check_import_time.py).
+
+def lazy_module_getattr(module_name: str, lazy_attributes: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Returns the module __getattr__ of a package whose attributes are imported on first access.
+
+    Example:
+        _LAZY_WIDGETS = {"TableWidget": "app.widgets.tablewidget"}
+        __getattr__ = lazy_module_getattr(__name__, _LAZY_WIDGETS)
+
+    Args:
+        module_name (str): __name__ of the package.
+        lazy_attributes (Dict[str, str]): Attribute name -> module that defines it.
+    """
+    def __getattr__(name: str) -> Any:
+        if name in lazy_attributes:
+            attribute = getattr(importlib.import_module(lazy_attributes[name]), name)
+            setattr(sys.modules[module_name], name, attribute)  # next lookups skip __getattr__
+
+            return attribute
+
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
@@ -0,0 +1,19 @@
+from app.repositories.prodcode_repository import ProdCodeRepository, get_prodcode_repository
+from app.repositories.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.repositories.prodcode_index import ProdCodeIndex, get_prodcode_index, PRODCODE_CACHE_PATH
+from app.repositories.lot_numbers import LotNumber, parse_lot_number, lot_range_overlaps, lot_contains, lot_end_suffix, lot_prefix
+from app.repositories.rollups import ROLLUP_DIMENSIONS, rollup_totals, rollup_totals_statement, rollup_version_statement, total_kg_between
+from app.repositories.filter_summary import FilterConditions, FilterSummary, filter_summary_statement
+
+# NOTE: the asyncio data layer is imported on first attribute access (PEP 562), the login
+# window does not need sqlalchemy.ext.asyncio before the first query.
+from app.lazy_imports import lazy_module_getattr
+
+_LAZY_REPOSITORIES = {
+    "AsyncRepository": "app.repositories.async_repository",
+    "get_async_repository": "app.repositories.async_repository",
+    "QueryHandle": "app.repositories.async_repository",
+    "QueryCanceledError": "app.repositories.async_repository",
+}
+
+__getattr__ = lazy_module_getattr(__name__, _LAZY_REPOSITORIES)
@@ -0,0 +1,230 @@
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from config.db import get_async_engine
+from config.timeouts import QUERY_CANCELED_SQLSTATE, statement_timeout_clause
+from app.repositories.rollups import rollup_totals_statement, rollup_version_statement
+from app.repositories.filter_summary import FilterSummary
+from constants.Enums import AuthLogStatus
+from models import EndorsementModel, User, AuthLog
+
+import asyncio
+
+class QueryCanceledError(Exception):
+    """Raised when the query was canceled before it reached the server (same SQLSTATE as query_canceled)."""
+    sqlstate = QUERY_CANCELED_SQLSTATE
+
+class QueryHandle():
+    """
+    Handle of one running search, lets the GUI cancel it on the server.
+
+    The repository records the backend pid of the session before the query is sent,
+    cancel() then runs pg_cancel_backend(pid) on another connection of the loop. A search
+    can run several queries at once with gather() (e.g. the page and its summary), the
+    same handle cancels all of them.
+
+    The pids are only read on the loop thread while lock is held, and a session takes the
+    same lock before its connection goes back to the pool: a cancel can never reach a
+    pooled connection that already runs another query (next page, KPI refresh, login...).
+    """
+    def __init__(self):
+        self.backend_pids: Set[int] = set()
+        self.cancel_requested = False
+        self.lock = asyncio.Lock() # used on the loop only (bound to it on first use)
+
+    def cancel(self) -> None:
+        from app.workers.async_bridge import get_async_loop
+
+        # NOT STARTED YET: THE REPOSITORY RAISES QueryCanceledError INSTEAD OF SENDING THE QUERY
+        self.cancel_requested = True
+        get_async_loop().submit(get_async_repository().cancel_handle(self))
+
+class AsyncRepository():
+    """
+    Asyncio data layer over the AsyncEngine of the main database (psycopg 3 async driver).
+
+    The coroutines run on the loop of app.workers.async_bridge and are awaited by the views
+    with on_loop()/gather() inside run_ui_task(). Every coroutine opens its own AsyncSession,
+    so independent ones can run concurrently with gather(). expire_on_commit is off because
+    the returned objects are read on the GUI thread after the session is closed.
+
+    Args:
+        engine (AsyncEngine, optional): Defaults to config.db.get_async_engine().
+    """
+
+    def __init__(self, engine: AsyncEngine = None):
+        self._engine = engine
+        self._session_factory = None
+
+    @property
+    def Session(self) -> async_sessionmaker:
+        # THE ENGINE IS CREATED ON FIRST USE (ON THE LOOP THREAD)
+        if self._session_factory is None:
+            self._session_factory = async_sessionmaker(self._engine or get_async_engine(), expire_on_commit=False)
+
+        return self._session_factory
+
+    # ------------------------ USERS ------------------------
+    async def authenticate(self, username: str, hashed_password: str, workstation_name: str) -> Optional[User]:
+        """Looks up the user and records the success/failed login in the same transaction."""
+        async with self.Session() as session:
+            user = (await session.execute(
+                select(User).filter_by(username=username, password=hashed_password)
+            )).scalars().first()
+
+            if user is None:
+                session.add(AuthLog(
+                    username=username,
+                    event_type=AuthLogStatus.get_event_type("login"),
+                    status=AuthLogStatus.FAILED.value,
+                    additional_info=f"Attempted from {workstation_name}"
+                ))
+            else:
+                session.add(AuthLog(
+                    user_id=user.user_id,
+                    username=user.username,
+                    event_type=AuthLogStatus.get_event_type("login"),
+                    status=AuthLogStatus.SUCCESS.value,
+                    additional_info=f"Logged in from {workstation_name}"
+                ))
+
+            await session.commit()
+
+            return user
+
+    async def username_exists(self, username: str) -> bool:
+        async with self.Session() as session:
+            return (await session.execute(
+                select(User.user_id).filter_by(username=username).limit(1)
+            )).first() is not None
+
+    async def register_user(self, user_details: Dict[str, Any]) -> User:
+        """Adds the user and its registration log in one transaction."""
+        async with self.Session() as session:
+            new_user = User(**user_details)
+            session.add(new_user)
+            await session.flush()  # makes new_user.user_id available
+
+            session.add(AuthLog(
+                user_id=new_user.user_id,
+                username=new_user.username,
+                event_type=AuthLogStatus.get_event_type("registration"),
+                status=AuthLogStatus.SUCCESS.value
+            ))
+            await session.commit()
+
+            return new_user
+
+    async def list_usernames(self) -> List[str]:
+        async with self.Session() as session:
+            return list((await session.execute(select(User.username))).scalars().all())
+
+    # ------------------------ ENDORSEMENTS ------------------------
+    async def next_refno(self) -> str:
+        """Async version of app.helpers.fetch_current_t_refno_in_endorsement."""
+        async with self.Session() as session:
+            seq_name = (await session.execute(
+                text("SELECT pg_get_serial_sequence(:table, :column) AS seq_name"),
+                {"table": EndorsementModel.__tablename__, "column": "t_id"}
+            )).scalar()
+            current_value = (await session.execute(text(f"SELECT last_value FROM {seq_name}"))).scalar()
+
+            return f"EF-{current_value + 1}"
+
+    async def filter_endorsements(
+        self,
+        statement: Select,
+        timeout_ms: int = 0,
+        handle: QueryHandle = None
+    ) -> List[EndorsementModel]:
+        """
+        Runs a select() of EndorsementModel built by a view (e.g. the list view filters).
+
+        Args:
+            statement (Select): Query of the view.
+            timeout_ms (int, optional): statement_timeout of the query, 0 keeps the server default.
+            handle (QueryHandle, optional): Receives the backend pid so the query can be canceled.
+
+        Raises:
+            DBAPIError: SQLSTATE 57014 when the timeout expired or the query was canceled (see config.timeouts.is_query_canceled).
+        """
+        async with self._cancelable_session(timeout_ms, handle) as session:
+            return await self._endorsements(session, statement)
+
+    async def filter_summary(
+        self,
+        statement: Select,
+        timeout_ms: int = 0,
+        handle: QueryHandle = None
+    ) -> FilterSummary:
+        """Runs a filter_summary_statement (app.repositories.filter_summary), same arguments and errors as filter_endorsements."""
+        async with self._cancelable_session(timeout_ms, handle) as session:
+            return FilterSummary.from_rows((await session.execute(statement)).all())
+
+    # ------------------------ ROLLUPS ------------------------
+    async def rollup_totals(self, **kwargs) -> List[Any]:
+        """Async version of app.repositories.rollups.rollup_totals (same arguments)."""
+        async with self.Session() as session:
+            return list((await session.execute(rollup_totals_statement(**kwargs))).all())
+
+    async def rollup_version(self) -> Tuple:
+        """(row count, last update, total kg, excess kg) of endorsement_daily_rollup, see rollup_version_statement."""
+        async with self.Session() as session:
+            return tuple((await session.execute(rollup_version_statement())).one())
+
+    async def cancel_handle(self, handle: QueryHandle) -> None:
+        """Cancels the queries of a QueryHandle that are still running (see QueryHandle)."""
+        async with handle.lock:
+            for backend_pid in list(handle.backend_pids):
+                await self.cancel_backend(backend_pid)
+
+    async def cancel_backend(self, backend_pid: int) -> bool:
+        """Asks the server to cancel the running query of another session (pg_cancel_backend)."""
+        async with self.Session() as session:
+            return bool((await session.execute(select(func.pg_cancel_backend(backend_pid)))).scalar())
+
+    @asynccontextmanager
+    async def _cancelable_session(self, timeout_ms: int, handle: Optional[QueryHandle]) -> AsyncIterator[Any]:
+        async with self.Session() as session:
+            if timeout_ms:
+                await session.execute(statement_timeout_clause(timeout_ms))
+
+            backend_pid = None
+            if handle is not None:
+                backend_pid = (await session.execute(select(func.pg_backend_pid()))).scalar()
+
+                async with handle.lock:
+                    if handle.cancel_requested:
+                        raise QueryCanceledError("Query canceled before it was sent.")
+
+                    handle.backend_pids.add(backend_pid)
+
+            try:
+                yield session
+            finally:
+                # THE CONNECTION GOES BACK TO THE POOL: WAIT FOR A CANCEL BEING SENT, A LATER ONE NO LONGER SEES THE PID
+                if handle is not None:
+                    async with handle.lock:
+                        handle.backend_pids.discard(backend_pid)
+
+    @staticmethod
+    async def _endorsements(session, statement: Select) -> List[EndorsementModel]:
+        # NOTE: t2 items are eager loaded, a lazy load is not possible once the session is closed (and not on the GUI thread)
+        statement = statement.options(selectinload(EndorsementModel.endorsement_t2_items))
+
+        return list((await session.execute(statement)).scalars().all())
+
+# ------------------------ SINGLETON ------------------------
+_async_repository = None
+
+def get_async_repository() -> AsyncRepository:
+    global _async_repository
+
+    if _async_repository is None:
+        _async_repository = AsyncRepository()
+
+    return _async_repository
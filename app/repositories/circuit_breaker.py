@@ -0,0 +1,174 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import os
+import threading
+import time
+
+# ------------------------ STATES ------------------------
+CLOSED = "closed"        # CALLS GO TO THE DATABASE
+OPEN = "open"            # CALLS FAIL IMMEDIATELY WITH CircuitOpenError
+HALF_OPEN = "half_open"  # THE BACKGROUND PROBE IS TRYING THE DATABASE, CALLS STILL FAIL IMMEDIATELY
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a database that is known to be unreachable."""
+    def __init__(self, name: str):
+        super().__init__(f"The {name} database is unreachable, using the local cache.")
+        self.name = name
+
+class CircuitBreaker():
+    """
+    Stops calling a failing database after a number of consecutive failures.
+
+    Once open, every call raises CircuitOpenError right away (no connect timeout),
+    and a daemon thread runs the probe every probe_interval seconds. The first
+    probe that succeeds closes the breaker again.
+
+    Args:
+        name (str): Name used in the messages, e.g. "prodcode".
+        probe (Callable): Checks the database, raises if it is still unreachable.
+        failure_threshold (int): Consecutive failures that open the breaker. Defaults to PRODCODE_BREAKER_FAILURES (3).
+        probe_interval (float): Seconds between two probes. Defaults to PRODCODE_BREAKER_PROBE_INTERVAL (30).
+        failure_exceptions (Tuple): Exceptions counted as a failure, others (e.g. ValueError) are only re-raised.
+    """
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Any],
+        failure_threshold: int = None,
+        probe_interval: float = None,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold or int(os.getenv("PRODCODE_BREAKER_FAILURES", 3))
+        self.probe_interval = probe_interval or float(os.getenv("PRODCODE_BREAKER_PROBE_INTERVAL", 30))
+        self.failure_exceptions = failure_exceptions
+
+        self._state = CLOSED
+        self._failures = 0
+        self._times_opened = 0
+        self._short_circuited = 0
+        self._opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self._state != CLOSED
+
+    def add_listener(self, callback: Callable[[str, str], None]) -> None:
+        """callback(name, state) is called on every state change (from the calling or the probe thread)."""
+        self._listeners.append(callback)
+
+    # ------------------------ CALLS ------------------------
+    def call(self, function: Callable, *args, **kwargs) -> Any:
+        if self._state != CLOSED:
+            with self._lock:
+                self._short_circuited += 1
+
+            raise CircuitOpenError(self.name)
+
+        try:
+            result = function(*args, **kwargs)
+        except self.failure_exceptions as e:
+            self.record_failure(e)
+            raise
+
+        self.record_success()
+
+        return result
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self, error: BaseException, trip: bool = False) -> None:
+        """Counts a failure, opens the breaker at the threshold (or right away with trip=True)."""
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error).strip().splitlines()[0] if str(error).strip() else type(error).__name__
+
+            if self._state != CLOSED or (self._failures < self.failure_threshold and not trip):
+                return
+
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self._times_opened += 1
+
+            if self._probe_thread is None or not self._probe_thread.is_alive():
+                self._stop_event.clear()
+                self._probe_thread = threading.Thread(target=self._probe_loop, name=f"{self.name}-breaker-probe", daemon=True)
+                self._probe_thread.start()
+
+        print(f"Circuit breaker '{self.name}' opened after {self._failures} failures: {self._last_error}")
+        self._notify(OPEN)
+
+    # ------------------------ HALF-OPEN PROBE ------------------------
+    def _probe_loop(self) -> None:
+        while not self._stop_event.wait(self.probe_interval):
+            self._set_state(HALF_OPEN)
+
+            try:
+                self.probe()
+            except Exception as e:
+                with self._lock:
+                    self._last_error = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+
+                self._set_state(OPEN)
+                continue
+
+            with self._lock:
+                self._failures = 0
+                self._opened_at = None
+                self._state = CLOSED
+                # CLEARED WITH THE STATE: A FAILURE THAT TRIPS THE BREAKER WHILE THIS THREAD IS STILL NOTIFYING
+                # STARTS A NEW PROBE (is_alive() WOULD STILL BE TRUE AND THE BREAKER WOULD STAY OPEN FOREVER)
+                self._probe_thread = None
+
+            print(f"Circuit breaker '{self.name}' closed, the database is reachable again.")
+            self._notify(CLOSED)
+
+            return
+
+    def _set_state(self, state: str) -> None:
+        with self._lock:
+            if self._state == state:
+                return
+
+            self._state = state
+
+        self._notify(state)
+
+    def _notify(self, state: str) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(self.name, state)
+            except Exception as e:
+                print(f"Circuit breaker listener failed: {e}")
+
+    def stop(self) -> None:
+        """Stops the probe thread (the breaker stays in its current state)."""
+        self._stop_event.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Example:
+            {"state": "open", "failures": 3, "times_opened": 1, "short_circuited": 42,
+             "open_for_s": 12.5, "last_error": "connection timeout expired"}
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "times_opened": self._times_opened,
+                "short_circuited": self._short_circuited,
+                "open_for_s": round(time.monotonic() - self._opened_at, 1) if self._opened_at is not None else None,
+                "last_error": self._last_error,
+            }
@@ -0,0 +1,400 @@
+from psycopg import sql
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.db import url, connect_timeout
+from config.timeouts import statement_timeout_ms
+from app.repositories.lot_numbers import parse_lot_number
+
+import os
+import psycopg
+import threading
+import time
+
+# IDLE SECONDS AFTER WHICH THE WRITER CONNECTION IS CHECKED (SELECT 1) BEFORE IT IS USED AGAIN, THE SERVER,
+# A FIREWALL OR A NAT MAY HAVE DROPPED IT IN THE MEANTIME (0 CHECKS IT BEFORE EVERY USE)
+IDLE_CHECK_SECONDS = float(os.getenv("WRITER_IDLE_CHECK_SECONDS", 60))
+
+# ------------------------ STATEMENTS ------------------------
+# NOTE: every statement is executed with prepare=True, the connection is kept open so the
+# server-side prepared statements are reused by the next saves.
+
+# SAME RULE AS EndorsementFormSchema.validate_no_overlapping_lots: RANGED LOTS WITH THE SAME SUFFIX MUST NOT OVERLAP.
+# USES THE GENERATED LOT COLUMNS AND THEIR (lot_suffix, lot_start_num, lot_end_num) INDEX
+OVERLAPPING_LOT_SQL = """
+    SELECT t_lotnumberwhole, t_prodcode
+    FROM tbl_endorsement_t1
+    WHERE is_deleted = false
+      AND t_lotnumberwhole <> %(lot_number)s
+      AND position('-' in t_lotnumberwhole) > 0
+      AND lot_suffix = %(suffix)s
+      AND lot_start_num <= %(end_num)s
+      AND lot_end_num >= %(start_num)s
+    LIMIT 1
+"""
+
+EXISTING_LOT_SQL = """
+    SELECT t2.t_id, t2.t_refno, t2.t_qty, t2.t_lotnumbersingle,
+           t1.t_prodcode, t1.t_date_endorsed, t1.t_category, t1.t_lotnumberwhole,
+           t1.t_endorsed_by, t1.t_status
+    FROM tbl_endorsement_t2 t2
+    JOIN tbl_endorsement_t1 t1 ON t1.t_id = t2.t1_id
+    WHERE t2.t_lotnumbersingle = %(lot_number)s
+      AND t2.is_deleted = false
+    LIMIT 1
+"""
+
+# EVERY SINGLE LOT OF A NEW RANGE THAT IS ALREADY STORED, ONE PROBE OF THE PARTIAL
+# ix_tbl_endorsement_t2_lotnumbersingle_active INDEX WHATEVER THE SIZE OF THE RANGE
+EXISTING_SINGLE_LOTS_SQL = """
+    SELECT DISTINCT t_lotnumbersingle, t_refno
+    FROM tbl_endorsement_t2
+    WHERE t_lotnumbersingle = ANY(%(lot_numbers)s)
+      AND is_deleted = false
+    ORDER BY t_lotnumbersingle, t_refno
+"""
+
+INSERT_T1_SQL = """
+    INSERT INTO tbl_endorsement_t1 (
+        t_refno, t_date_endorsed, t_category, t_prodcode, t_lotnumberwhole,
+        t_qtykg, t_wtlot, t_status, t_has_excess, t_endorsed_by, is_deleted
+    ) VALUES (
+        %(t_refno)s, %(t_date_endorsed)s, %(t_category)s, %(t_prodcode)s, %(t_lotnumberwhole)s,
+        %(t_qtykg)s, %(t_wtlot)s, %(t_status)s, %(t_has_excess)s, %(t_endorsed_by)s, false
+    )
+"""
+
+# t1_id OF THE PARENT IS NOT KNOWN BEFORE THE PIPELINE RUNS, IT IS LOOKED UP THROUGH THE UNIQUE t_refno INDEX.
+# t_date_endorsed IS THE DATE OF THE PARENT (PARTITION KEY, PART OF THE FOREIGN KEY TO tbl_endorsement_t1)
+PARENT_ID_SQL = "(SELECT t_id FROM tbl_endorsement_t1 WHERE t_refno = %(t_refno)s)"
+
+INSERT_T2_SQL = f"""
+    INSERT INTO tbl_endorsement_t2 (
+        t1_id, t_date_endorsed, t_refno, t_lotnumbersingle, t_qty, t_bag_num, is_deleted, is_lot_number_entered
+    ) VALUES (
+        {PARENT_ID_SQL}, %(t_date_endorsed)s, %(t_refno)s, %(t_lotnumbersingle)s, %(t_qty)s, %(t_bag_num)s, false, %(is_lot_number_entered)s
+    )
+"""
+
+# THE EXCESS ROW NEEDS THE ID OF ITS T2 ROW, THE CTE INSERTS BOTH IN ONE STATEMENT (NO RETURNING ROUND TRIP)
+INSERT_T2_WITH_EXCESS_SQL = f"""
+    WITH lot AS (
+        INSERT INTO tbl_endorsement_t2 (
+            t1_id, t_date_endorsed, t_refno, t_lotnumbersingle, t_qty, t_bag_num, is_deleted, is_lot_number_entered
+        ) VALUES (
+            {PARENT_ID_SQL}, %(t_date_endorsed)s, %(t_refno)s, %(t_lotnumbersingle)s, %(t_qty)s, %(t_bag_num)s, false, %(is_lot_number_entered)s
+        )
+        RETURNING t_id, t_date_endorsed
+    )
+    INSERT INTO tbl_endorsement_lot_excess (tbl_endorsement_t2_ref, t2_date_endorsed, t_excess_amount)
+    SELECT t_id, t_date_endorsed, %(t_excess_amount)s FROM lot
+"""
+
+ADD_QTY_TO_PARENT_SQL = """
+    UPDATE tbl_endorsement_t1 SET t_qtykg = t_qtykg + %(t_qty)s, updated_at = now()
+    WHERE t_refno = %(t_refno)s
+"""
+
+# THE DATE LIMITS THE UPDATE TO ONE MONTHLY PARTITION
+MARK_LOT_ENTERED_SQL = """
+    UPDATE tbl_endorsement_t2 SET is_lot_number_entered = true, updated_at = now()
+    WHERE t_id = %(t_id)s AND t_date_endorsed = %(t_date_endorsed)s
+"""
+
+class EndorsementWriter():
+    """
+    Saves an endorsement with psycopg 3 pipeline mode.
+
+    The ORM save used one round trip per statement (overlap check, duplicate lot check,
+    t1 insert, every t2 insert, every excess insert, commit, reference number). Here the
+    two checks share one round trip (precheck) and the whole write transaction, including
+    the next reference number, is sent as one pipeline (save).
+
+    The connection is kept open between saves. After IDLE_CHECK_SECONDS without use it is
+    checked with SELECT 1 and replaced if the server dropped it, and the read-only precheck
+    is sent once more on a new connection if the connection broke during it. The statements
+    do not go through SQLAlchemy, so each pipeline is recorded as one entry in the query
+    metrics and the slow query log (see _record_pipeline).
+
+    Args:
+        conninfo (str, optional): Connection string. Defaults to the main database of config.db.
+    """
+
+    def __init__(self, conninfo: str = None):
+        self.conninfo = conninfo or url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection: Optional[psycopg.Connection] = None
+        self._refno_sequence_sql = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def connection(self) -> psycopg.Connection:
+        """Returns the writer connection, reconnects if it was closed, broken or dropped while idle."""
+        if self._is_open() and time.monotonic() - self._last_used >= IDLE_CHECK_SECONDS:
+            try:
+                self._connection.execute("SELECT 1")
+            except psycopg.OperationalError as e:
+                print(f"Writer connection was dropped while idle, reconnecting: {e}")
+                self._discard_connection()
+
+        if not self._is_open():
+            # autocommit: THE CHECKS DO NOT OPEN A TRANSACTION, THE SAVE USES AN EXPLICIT ONE.
+            # THE statement_timeout OF THE CREATE VIEW APPLIES TO EVERY STATEMENT OF THIS CONNECTION
+            self._connection = psycopg.connect(
+                self.conninfo,
+                autocommit=True,
+                connect_timeout=connect_timeout,
+                options=f"-c statement_timeout={statement_timeout_ms('endorsement-create')}"
+            )
+            self._refno_sequence_sql = None
+
+        self._last_used = time.monotonic()
+
+        return self._connection
+
+    def close(self) -> None:
+        """Closes the writer connection (on exit), the next save opens a new one."""
+        with self._lock:
+            self._discard_connection()
+
+    def _is_open(self) -> bool:
+        return self._connection is not None and not self._connection.closed and not self._connection.broken
+
+    def _discard_connection(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except psycopg.Error:
+                pass
+
+        self._connection = None
+        self._refno_sequence_sql = None
+
+    @staticmethod
+    def _record_pipeline(name: str, statements: List[str], started: float) -> None:
+        # THE ENGINE EVENTS OF app.instrumentation NEVER SEE THESE STATEMENTS, ONE ENTRY PER PIPELINE
+        from app.instrumentation import get_query_metrics, get_slow_query_log
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        query_metrics = get_query_metrics()
+        if query_metrics.enabled:
+            query_metrics.record(f"PIPELINE EndorsementWriter.{name}", elapsed_ms)
+
+        get_slow_query_log().record_pipeline(f"EndorsementWriter.{name}", statements, elapsed_ms)
+
+    def _next_refno_sql(self, connection: psycopg.Connection) -> sql.Composed:
+        # THE SEQUENCE NAME IS LOOKED UP ONCE PER CONNECTION (SAME QUERY AS fetch_current_t_refno_in_endorsement)
+        if self._refno_sequence_sql is None:
+            sequence_name = connection.execute(
+                "SELECT pg_get_serial_sequence('tbl_endorsement_t1', 't_id')"
+            ).fetchone()[0]
+            self._refno_sequence_sql = sql.SQL("SELECT last_value FROM {}").format(
+                sql.Identifier(*sequence_name.split("."))
+            )
+
+        return self._refno_sequence_sql
+
+    def precheck(
+        self,
+        lot_number: str
+    ) -> Tuple[Optional[Tuple[str, str]], Optional[SimpleNamespace], List[Tuple[str, str]]]:
+        """
+        Runs the overlapping range check and the existing lot checks in one round trip.
+
+        Args:
+            lot_number (str): Validated t_lotnumberwhole.
+
+        Returns:
+            Tuple: (overlapping (t_lotnumberwhole, t_prodcode) or None, existing t2 lot or None,
+            [(t_lotnumbersingle, t_refno), ...] single lots of a range that already exist).
+            The existing lot has the attributes used by EndorsementCreateView.set_message_existing_record
+            (t_id, t_refno, t_qty, t_lotnumbersingle and endorsement_parent).
+        """
+        with self._lock:
+            try:
+                overlap, existing, existing_single_lots = self._run_precheck(self.connection(), lot_number)
+            except psycopg.OperationalError as e:
+                # ONLY A LOST CONNECTION IS RETRIED (NOT e.g. THE statement_timeout), THE CHECKS ONLY READ
+                if self._is_open():
+                    raise
+
+                print(f"Writer connection lost during the precheck, retrying once: {e}")
+                self._discard_connection()
+                overlap, existing, existing_single_lots = self._run_precheck(self.connection(), lot_number)
+
+        if existing is not None:
+            (t_id, t_refno, t_qty, t_lotnumbersingle, t_prodcode, t_date_endorsed,
+             t_category, t_lotnumberwhole, t_endorsed_by, t_status) = existing
+
+            existing = SimpleNamespace(
+                t_id=t_id,
+                t_refno=t_refno,
+                t_qty=t_qty,
+                t_lotnumbersingle=t_lotnumbersingle,
+                endorsement_parent=SimpleNamespace(
+                    t_prodcode=t_prodcode,
+                    t_date_endorsed=t_date_endorsed,
+                    t_category=t_category,
+                    t_lotnumberwhole=t_lotnumberwhole,
+                    t_endorsed_by=t_endorsed_by,
+                    t_status=t_status,
+                )
+            )
+
+        return (tuple(overlap) if overlap else None), existing, existing_single_lots
+
+    def _run_precheck(self, connection: psycopg.Connection, lot_number: str) -> Tuple[Optional[tuple], Optional[tuple], List[Tuple[str, str]]]:
+        started = time.perf_counter()
+        overlap_cursor = None
+        single_lots_cursor = None
+
+        with connection.pipeline():
+            if "-" in lot_number:
+                lot = parse_lot_number(lot_number)
+                overlap_cursor = connection.execute(
+                    OVERLAPPING_LOT_SQL,
+                    {
+                        "lot_number": lot_number,
+                        "suffix": lot.suffix,
+                        "start_num": lot.start_num,
+                        "end_num": lot.end_num,
+                    },
+                    prepare=True
+                )
+                single_lots_cursor = connection.execute(
+                    EXISTING_SINGLE_LOTS_SQL,
+                    {"lot_numbers": lot.single_lots()},
+                    prepare=True
+                )
+
+            # A RANGE NEVER EQUALS A SINGLE LOT, ITS LOTS ARE CHECKED BY EXISTING_SINGLE_LOTS_SQL
+            existing_cursor = None if "-" in lot_number else connection.execute(EXISTING_LOT_SQL, {"lot_number": lot_number}, prepare=True)
+
+        overlap = overlap_cursor.fetchone() if overlap_cursor is not None else None
+        existing = existing_cursor.fetchone() if existing_cursor is not None else None
+        existing_single_lots = [tuple(row) for row in single_lots_cursor.fetchall()] if single_lots_cursor is not None else []
+
+        statements = [OVERLAPPING_LOT_SQL, EXISTING_SINGLE_LOTS_SQL] if "-" in lot_number else [EXISTING_LOT_SQL]
+        self._record_pipeline("precheck", statements, started)
+
+        return overlap, existing, existing_single_lots
+
+    def save(
+        self,
+        t1_row: Dict[str, Any],
+        t2_rows: List[Dict[str, Any]],
+        existing_lot: Optional[SimpleNamespace] = None,
+        existing_lot_qty: float = None
+    ) -> str:
+        """
+        Inserts the endorsement in one pipelined transaction.
+
+        Args:
+            t1_row (Dict): Columns of tbl_endorsement_t1.
+            t2_rows (List[Dict]): Columns of tbl_endorsement_t2, a row with 't_excess_amount' also
+                inserts its tbl_endorsement_lot_excess row.
+            existing_lot (SimpleNamespace, optional): Lot returned by precheck() that the user chose to add to.
+            existing_lot_qty (float, optional): Quantity added to the existing lot.
+
+        Returns:
+            str: Next reference number (e.g. "EF-124"), read in the same transaction.
+        """
+        with self._lock:
+            connection = self.connection()
+            next_refno_sql = self._next_refno_sql(connection)
+            started = time.perf_counter()
+
+            with connection.pipeline():
+                with connection.transaction():
+                    if existing_lot is not None:
+                        connection.execute(ADD_QTY_TO_PARENT_SQL, {"t_qty": existing_lot_qty, "t_refno": existing_lot.t_refno}, prepare=True)
+                        connection.execute(
+                            MARK_LOT_ENTERED_SQL,
+                            {"t_id": existing_lot.t_id, "t_date_endorsed": existing_lot.endorsement_parent.t_date_endorsed},
+                            prepare=True
+                        )
+                        connection.execute(
+                            INSERT_T2_SQL,
+                            {
+                                "t_date_endorsed": existing_lot.endorsement_parent.t_date_endorsed,
+                                "t_refno": existing_lot.t_refno,
+                                "t_lotnumbersingle": existing_lot.t_lotnumbersingle,
+                                "t_qty": existing_lot_qty,
+                                "t_bag_num": None,
+                                "is_lot_number_entered": True,
+                            },
+                            prepare=True
+                        )
+
+                    connection.execute(INSERT_T1_SQL, t1_row, prepare=True)
+
+                    for t2_row in t2_rows:
+                        statement = INSERT_T2_WITH_EXCESS_SQL if "t_excess_amount" in t2_row else INSERT_T2_SQL
+                        connection.execute(statement, {"is_lot_number_entered": False, **t2_row}, prepare=True)
+
+                    refno_cursor = connection.execute(next_refno_sql, prepare=True)
+
+            next_refno = f"EF-{refno_cursor.fetchone()[0] + 1}"
+
+            statements = [ADD_QTY_TO_PARENT_SQL, MARK_LOT_ENTERED_SQL, INSERT_T2_SQL] if existing_lot is not None else []
+            statements += [INSERT_T1_SQL, *(INSERT_T2_WITH_EXCESS_SQL if "t_excess_amount" in row else INSERT_T2_SQL for row in t2_rows)]
+            self._record_pipeline("save", statements, started)
+
+        # THE endorsement_combined MATERIALIZED VIEW IS REFRESHED A MOMENT AFTER THE LAST SAVE (DEBOUNCED)
+        from app.workers.combined_view_refresh import get_combined_view_refresher
+        get_combined_view_refresher().request_refresh()
+
+        return next_refno
+
+def endorsement_rows(endorsement) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Converts a transient EndorsementModel built by populate_endorsement_items into the rows used by save().
+
+    Returns:
+        Tuple: (t1_row, t2_rows)
+    """
+    t1_row = {
+        column: getattr(endorsement, column)
+        for column in (
+            "t_refno", "t_date_endorsed", "t_category", "t_prodcode", "t_lotnumberwhole",
+            "t_qtykg", "t_wtlot", "t_status", "t_has_excess", "t_endorsed_by",
+        )
+    }
+    # ENUM COLUMNS STORE THE ENUM NAME (SAME AS THE VALUE FOR CategoryEnum AND StatusEnum)
+    for column in ("t_category", "t_status"):
+        t1_row[column] = getattr(t1_row[column], "name", t1_row[column])
+
+    t2_rows = []
+    for item in endorsement.endorsement_t2_items:
+        t2_row = {
+            "t_date_endorsed": endorsement.t_date_endorsed,
+            "t_refno": item.t_refno,
+            "t_lotnumbersingle": item.t_lotnumbersingle,
+            "t_qty": item.t_qty,
+            "t_bag_num": item.t_bag_num,
+        }
+
+        if item.lot_excess is not None:
+            t2_row["t_excess_amount"] = item.lot_excess.t_excess_amount
+
+        t2_rows.append(t2_row)
+
+    return t1_row, t2_rows
+
+# ------------------------ SINGLETON ------------------------
+_endorsement_writer = None
+
+def get_endorsement_writer() -> EndorsementWriter:
+    global _endorsement_writer
+
+    if _endorsement_writer is None:
+        _endorsement_writer = EndorsementWriter()
+
+        # THE WRITER IS CREATED BY THE FIRST SAVE (psycopg IS NOT IMPORTED AT STARTUP), ITS CONNECTION IS CLOSED ON EXIT
+        from PyQt6.QtCore import QCoreApplication
+
+        application = QCoreApplication.instance()
+        if application is not None:
+            application.aboutToQuit.connect(_endorsement_writer.close)
+
+    return _endorsement_writer
@@ -0,0 +1,124 @@
+from sqlalchemy import func, select, text, true
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import DeclarativeMeta
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Dict, List, NamedTuple, Optional, Sequence, Type
+
+from constants.Enums import StatusEnum
+
+# ------------------------ FILTER SUMMARY (ONE GROUPING SETS QUERY) ------------------------
+# The list view shows the totals of its filter and, next to the status / category combos, how
+# many endorsements each choice would list. Everything comes from one aggregate over
+# tbl_endorsement_t1, the filtered rows are never loaded to the client:
+#
+#   SELECT t_status, t_category, GROUPING(t_status, t_category), ...
+#   FROM tbl_endorsement_t1 WHERE <filters except status and category>
+#   GROUP BY GROUPING SETS ((t_status), (t_category), ())
+#
+# The status and category filters are FILTER (WHERE ...) clauses of the aggregates instead of
+# WHERE conditions: the totals use both, the status counts only the category one (and the other
+# way around), so "FAILED 12" is what the list shows when FAILED is picked.
+
+# GROUPING(t_status, t_category) OF EACH GROUPING SET (1 = COLUMN NOT GROUPED)
+STATUS_SET, CATEGORY_SET, TOTAL_SET = 0b01, 0b10, 0b11
+
+class FilterConditions(NamedTuple):
+    """
+    Conditions of the list view filters, the status and category ones apart for the facet counts.
+
+    Args:
+        where (Sequence[ColumnElement]): Every other filter (soft delete, ref no, prod code, lot, dates).
+        status (ColumnElement, optional): Condition of the status combo, None for no condition.
+        category (ColumnElement, optional): Condition of the category combo, None for no condition.
+    """
+    where: Sequence[ColumnElement]
+    status: Optional[ColumnElement] = None
+    category: Optional[ColumnElement] = None
+
+    def all(self) -> List[ColumnElement]:
+        """Every condition, for the WHERE of the listed rows."""
+        return [*self.where, *(condition for condition in (self.status, self.category) if condition is not None)]
+
+class FilterSummary(NamedTuple):
+    total_kg: float = 0.0
+    endorsement_count: int = 0
+    lot_count: int = 0
+    passed_kg: float = 0.0
+    passed_count: int = 0
+    failed_kg: float = 0.0
+    failed_count: int = 0
+    status_counts: Dict[str, int] = {}
+    category_counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Row]) -> "FilterSummary":
+        """Reads the rows of filter_summary_statement (one per status, one per category and the total)."""
+        totals = {}
+        status_rows = {}
+        category_counts = {}
+
+        for row in rows:
+            if row.grouping_set == TOTAL_SET:
+                totals = {
+                    "total_kg": float(row.total_kg or 0),
+                    "endorsement_count": row.endorsement_count,
+                    "lot_count": int(row.lot_count or 0),
+                }
+            elif row.grouping_set == STATUS_SET:
+                status_rows[_value(row.t_status)] = row
+            elif row.grouping_set == CATEGORY_SET:
+                category_counts[_value(row.t_category)] = row.category_facet_count
+
+        passed = status_rows.get(StatusEnum.PASSED.value)
+        failed = status_rows.get(StatusEnum.FAILED.value)
+
+        return cls(
+            **totals,
+            passed_kg=float(passed.total_kg or 0) if passed else 0.0,
+            passed_count=passed.endorsement_count if passed else 0,
+            failed_kg=float(failed.total_kg or 0) if failed else 0.0,
+            failed_count=failed.endorsement_count if failed else 0,
+            status_counts={status: row.status_facet_count for status, row in status_rows.items()},
+            category_counts=category_counts,
+        )
+
+def filter_summary_statement(model: Type[DeclarativeMeta], conditions: FilterConditions) -> Select:
+    """
+    Totals and facet counts of the endorsements matching the list view filters (see FilterSummary.from_rows).
+
+    Example:
+        rows = session.execute(filter_summary_statement(EndorsementModel, conditions)).all()
+        FilterSummary.from_rows(rows)
+        -> FilterSummary(total_kg=1250.0, endorsement_count=50, lot_count=212, passed_kg=1000.0, ...,
+                         status_counts={'PASSED': 40, 'FAILED': 10, 'HOLD': 3}, category_counts={'MB': 35, 'DC': 15})
+
+    Args:
+        model (DeclarativeMeta): EndorsementModel (needs t_status, t_category, t_qtykg and the lot_*_num columns).
+        conditions (FilterConditions): Filters of the view.
+    """
+    status_condition = conditions.status if conditions.status is not None else true()
+    category_condition = conditions.category if conditions.category is not None else true()
+    listed = status_condition & category_condition
+
+    # A RANGE '1234AB-1240AB' IS 7 LOTS, A LOT NUMBER THAT DOES NOT PARSE COUNTS AS ONE
+    lots = func.coalesce(model.lot_end_num - model.lot_start_num + 1, 1)
+
+    return select(
+        model.t_status,
+        model.t_category,
+        func.grouping(model.t_status, model.t_category).label("grouping_set"),
+        func.coalesce(func.sum(model.t_qtykg).filter(listed), 0).label("total_kg"),
+        func.count().filter(listed).label("endorsement_count"),
+        func.coalesce(func.sum(lots).filter(listed), 0).label("lot_count"),
+        func.count().filter(category_condition).label("status_facet_count"),
+        func.count().filter(status_condition).label("category_facet_count"),
+    ).where(
+        *conditions.where
+    ).group_by(
+        func.grouping_sets(model.t_status, model.t_category, text("()"))
+    )
+
+def _value(enum_or_value) -> str:
+    # THE ORM RETURNS THE Enum COLUMNS AS StatusEnum / CategoryEnum MEMBERS
+    return getattr(enum_or_value, "value", enum_or_value)
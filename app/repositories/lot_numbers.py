@@ -0,0 +1,97 @@
+from sqlalchemy import and_, func
+from sqlalchemy.sql.elements import ColumnElement
+from typing import NamedTuple
+
+# ------------------------ LOT NUMBER FORMAT ------------------------
+# '1234AB' (single lot) or '1234AB-1240AB' (range). The same parts are stored in the generated
+# columns lot_start_num, lot_end_num and lot_suffix of tbl_endorsement_t1 / tbl_endorsement_t2
+# (migration 88473d29176b), so the database answers range questions with an index.
+
+class LotNumber(NamedTuple):
+    start_num: int
+    end_num: int
+    suffix: str
+    end_suffix: str
+
+    @property
+    def is_range(self) -> bool:
+        return (self.start_num, self.suffix) != (self.end_num, self.end_suffix)
+
+    def single_lots(self):
+        """Every single lot of the range, e.g. ['1234AB', '1235AB', '1236AB'] (same suffix only)."""
+        return [f"{number:04d}{self.suffix}" for number in range(self.start_num, self.end_num + 1)]
+
+def parse_lot_number(lot_number: str) -> LotNumber:
+    """
+    Splits a lot number into its numeric parts and suffixes.
+
+    Example:
+        parse_lot_number("1234AB-1240AB") -> LotNumber(start_num=1234, end_num=1240, suffix="AB", end_suffix="AB")
+        parse_lot_number("1237AB")        -> LotNumber(start_num=1237, end_num=1237, suffix="AB", end_suffix="AB")
+
+    Raises:
+        ValueError: The lot number does not start with 4 digits (on either side of the '-').
+    """
+    start, _, end = lot_number.strip().partition("-")
+    end = end or start
+
+    try:
+        return LotNumber(int(start[:4]), int(end[:4]), start[4:], end[4:])
+    except ValueError:
+        raise ValueError(f"Lot number '{lot_number}' must start with 4 digits, e.g. '1234AB' or '1234AB-1240AB'")
+
+# ------------------------ SQL PREDICATES ------------------------
+def lot_range_overlaps(model, lot: LotNumber) -> ColumnElement:
+    """Rows of model (t1 or t2) whose lots share the suffix and overlap lot (uses the (lot_suffix, lot_start_num) index)."""
+    return and_(
+        model.lot_suffix == lot.suffix,
+        model.lot_start_num <= lot.end_num,
+        model.lot_end_num >= lot.start_num,
+    )
+
+def lot_contains(model, lot_number: str) -> ColumnElement:
+    """
+    Rows of model whose lot contains the whole of lot_number: a single lot ('1237AB') or every lot of a range.
+
+    A range matches the rows that cover it from start to end, not the ones that only touch it:
+    '1230AB-1240AB' finds '1225AB-1245AB' but not '1240AB-1250AB' (see lot_range_overlaps for that).
+    The end suffix of a range is compared too ('9999AB-0001AC' after the 9999 rollover).
+
+    Example:
+        select(EndorsementModel).where(lot_contains(EndorsementModel, "1237AB"))
+        select(EndorsementModel).where(lot_contains(EndorsementModel, "1230AB-1240AB"))
+    """
+    lot = parse_lot_number(lot_number)
+
+    # (lot_suffix, lot_start_num) IS INDEXED, lot_end_num AND THE END SUFFIX FILTER THE FEW ROWS IT FINDS
+    containment = and_(
+        model.lot_suffix == lot.suffix,
+        model.lot_start_num <= lot.start_num,
+        model.lot_end_num >= lot.end_num,
+    )
+
+    if not lot.is_range:
+        return containment
+
+    return and_(containment, lot_end_suffix(model) == lot.end_suffix)
+
+def lot_end_suffix(model) -> ColumnElement:
+    """Letter suffix of the end of the lot of model ('AC' for '9999AB-0001AC', the suffix itself for a single lot)."""
+    column = model.t_lotnumberwhole if hasattr(model, "t_lotnumberwhole") else model.t_lotnumbersingle
+    end = func.coalesce(func.nullif(func.split_part(column, "-", 2), ""), column)
+
+    return func.substring(end, "^[0-9]{4}(.*)$")
+
+def lot_prefix(model, prefix: str) -> ColumnElement:
+    """
+    Rows of t1 whose whole lot number starts with prefix, e.g. what the list view shows for '1234A'.
+
+    '%', '_' and '\\' of the prefix are escaped (matched literally). The match is case sensitive, pass the
+    prefix upper-cased like the saved lot numbers: only a case sensitive LIKE 'prefix%' can use the
+    text_pattern_ops index ix_tbl_endorsement_t1_lotnumberwhole_prefix (ILIKE is a seq scan).
+
+    Example:
+        select(EndorsementModel).where(EndorsementModel.is_deleted == False, lot_prefix(EndorsementModel, "1234A"))
+    """
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return model.t_lotnumberwhole.like(f"{escaped}%", escape="\\")
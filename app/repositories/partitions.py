@@ -0,0 +1,39 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from typing import List
+
+import os
+
+# ------------------------ MONTHLY PARTITIONS OF tbl_endorsement_t2 ------------------------
+# tbl_endorsement_t2 is partitioned by month of t_date_endorsed (migration c3e91a7f5d20).
+# A lot of a month without a partition goes to tbl_endorsement_t2_default, which the planner
+# can never prune, so the partitions of the next months are created before they are needed.
+MONTHS_AHEAD = int(os.getenv("T2_PARTITION_MONTHS_AHEAD", 3))
+
+ENSURE_PARTITIONS_SQL = text("SELECT ensure_endorsement_t2_partitions(:months_ahead)")
+
+DEFAULT_PARTITION_ROWS_SQL = text("SELECT count(*) FROM tbl_endorsement_t2_default")
+
+def ensure_endorsement_partitions(engine: Engine = None, months_ahead: int = MONTHS_AHEAD) -> List[str]:
+    """
+    Creates the partitions of the current month and the next months_ahead months (existing ones are kept).
+
+    Args:
+        engine (Engine, optional): Defaults to the main engine of config.db.
+        months_ahead (int, optional): Defaults to T2_PARTITION_MONTHS_AHEAD (3).
+
+    Returns:
+        List[str]: Partition names, a month whose rows are already in the default partition is left out.
+    """
+    if engine is None:
+        from config.db import get_engine
+        engine = get_engine()
+
+    with engine.begin() as connection:
+        partitions = [name for name in connection.execute(ENSURE_PARTITIONS_SQL, {"months_ahead": months_ahead}).scalars() if name]
+        default_rows = connection.execute(DEFAULT_PARTITION_ROWS_SQL).scalar()
+
+    if default_rows:
+        print(f"WARNING: tbl_endorsement_t2_default has {default_rows} row(s), their months are not pruned")
+
+    return partitions
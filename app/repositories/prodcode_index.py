@@ -0,0 +1,158 @@
+from app.repositories.prodcode_repository import ProdCodeRepository, get_prodcode_repository
+from app.repositories.circuit_breaker import CircuitOpenError
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as LookupTimeoutError
+from typing import Dict, Iterable, Optional, Set
+
+import json
+import os
+import threading
+import time
+import traceback
+
+# SINGLE LOCATION OF THE LOCAL PRODCODE CACHE (WRITTEN BY FetchProdCode AND THE ENDORSEMENT CREATE VIEW)
+PRODCODE_CACHE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "views", "cache", "prodcode.json")
+)
+
+
+class ProdCodeIndex():
+    """
+    In-memory set of the known product codes used for save-time validation.
+
+    Membership is checked against a hashed set loaded from the local prodcode
+    cache. Only on a miss does it ask the prodcode database with a single
+    indexed exists query. Codes confirmed by the database are added to the set,
+    codes the database rejects are kept in a negative cache so that repeating
+    the same typo does not hit the database again until the entry expires.
+
+    The miss lookup runs in a worker thread and the caller (the save validator on
+    the GUI thread) waits at most lookup_timeout for it: an unreachable database
+    freezes the window for that long, not for the connect timeout, until the
+    breaker opens. A lookup that is still running finishes in the background and
+    still updates the caches and the breaker.
+
+    Args:
+        repository (ProdCodeRepository, optional): Fallback for cache misses.
+        cache_path (str): Path of the prodcode.json cache.
+        negative_ttl (float): Seconds a rejected code stays in the negative cache.
+        lookup_timeout (float): Seconds contains() waits for the database. Defaults to PRODCODE_LOOKUP_TIMEOUT (2).
+    """
+
+    def __init__(
+        self,
+        repository: Optional[ProdCodeRepository] = None,
+        cache_path: str = PRODCODE_CACHE_PATH,
+        negative_ttl: float = 600.0,
+        lookup_timeout: float = None
+    ):
+        self.repository = repository
+        self.cache_path = cache_path
+        self.negative_ttl = negative_ttl
+        self.lookup_timeout = lookup_timeout if lookup_timeout is not None else float(os.getenv("PRODCODE_LOOKUP_TIMEOUT", 2))
+
+        self._known: Optional[Set[str]] = None
+        self._negative: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _known_codes(self) -> Set[str]:
+        if self._known is None:
+            self.reload()
+
+        return self._known
+
+    def __len__(self) -> int:
+        return len(self._known_codes())
+
+    def reload(self) -> None:
+        """(Re)loads the known codes from the local prodcode cache."""
+        codes = set()
+
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, "r", encoding="utf-8") as f:
+                    codes = set(json.load(f).get("data", []))
+        except Exception:
+            traceback.print_exc()
+
+        with self._lock:
+            self._known = codes
+
+    def add_codes(self, codes: Iterable[str]) -> None:
+        """Adds codes that are known to exist (e.g. new codes fetched from the database)."""
+        known = self._known_codes()
+
+        with self._lock:
+            for code in codes:
+                known.add(code)
+                self._negative.pop(code, None)
+
+    def contains(self, code: str) -> bool:
+        """
+        Returns True if the product code exists.
+
+        If the prodcode database cannot be reached (connection error, open breaker
+        or no answer within lookup_timeout) the code is accepted, so an outage of
+        the secondary database never blocks the endorsement entry. Any other error
+        (e.g. the RuntimeError of a missing prodcode configuration) is raised.
+        """
+        if code in self._known_codes():
+            return True
+
+        expires_at = self._negative.get(code)
+
+        if expires_at is not None and expires_at > time.monotonic():
+            return False
+
+        repository = self.repository or get_prodcode_repository()
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prodcode-lookup")
+
+        lookup = self._executor.submit(self._lookup, repository, code)
+
+        try:
+            return lookup.result(timeout=self.lookup_timeout)
+        except LookupTimeoutError:
+            # NOTE: CAUGHT BEFORE THE BREAKER FAILURES, TimeoutError IS AN OSError
+            print(f"Product code lookup took more than {self.lookup_timeout:g} s, accepting '{code}'")
+
+            return True
+        except CircuitOpenError:
+            return True
+        except repository.breaker.failure_exceptions as e:
+            print(f"Product code lookup failed, accepting '{code}': {e}")
+
+            return True
+
+    def _lookup(self, repository: ProdCodeRepository, code: str) -> bool:
+        # RUNS IN THE LOOKUP THREAD, ALSO WHEN contains() HAS STOPPED WAITING FOR IT
+        found = repository.exists(code)
+        known = self._known_codes()  # OUTSIDE THE LOCK, reload() TAKES IT
+
+        with self._lock:
+            if found:
+                known.add(code)
+                self._negative.pop(code, None)
+            else:
+                self._negative[code] = time.monotonic() + self.negative_ttl
+
+        return found
+
+
+# ------------------------ SHARED INSTANCE ------------------------
+_index = None
+_index_lock = threading.Lock()
+
+def get_prodcode_index() -> ProdCodeIndex:
+    """Returns the application-wide ProdCodeIndex (created on first use)."""
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ProdCodeIndex()
+
+    return _index
@@ -0,0 +1,201 @@
+from sqlalchemy import MetaData, Table, select, exists as sql_exists
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Optional
+
+from app.repositories.circuit_breaker import CircuitBreaker
+
+import os
+import threading
+import time
+
+
+def timed_call(method):
+    """Records the duration of every call of a repository method in the instance metrics."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._record_timing(method.__name__, (time.perf_counter() - start) * 1000)
+
+    return wrapper
+
+
+def guarded_call(method):
+    """Runs the repository method through the circuit breaker (fails fast while the database is unreachable)."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.breaker.call(method, self, *args, **kwargs)
+
+    return wrapper
+
+
+class ProdCodeRepository():
+    """
+    Read-only access to the product codes stored in the prodcode database ('dbinv').
+
+    The tbl_prod01 table is reflected only once per repository and every query
+    goes through the pooled prodcode engine, so searches no longer pay for a
+    catalog round trip and a new sessionmaker on each call.
+
+    Every query goes through a circuit breaker: after PRODCODE_BREAKER_FAILURES
+    connection failures the queries raise CircuitOpenError immediately (callers
+    fall back to the local prodcode cache) until a background probe reconnects.
+
+    Args:
+        engine (Engine): Engine of the prodcode database. Defaults to config.db.get_prodcode_engine().
+        changed_at_column (str, optional): Column used by changed_since(). Defaults to the
+            PRODCODE_CHANGED_AT_COLUMN environment variable.
+    """
+
+    TABLE_NAME = "tbl_prod01"
+    PRODCODE_COLUMN = "T_PRODCODE"
+
+    def __init__(self, engine: Engine = None, changed_at_column: Optional[str] = None):
+        if engine is None:
+            from config.db import get_prodcode_engine
+            engine = get_prodcode_engine()
+
+        self.engine = engine
+        self.changed_at_column = changed_at_column or os.getenv("PRODCODE_CHANGED_AT_COLUMN")
+
+        self._table = None
+        self._table_lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+
+        # ONLY CONNECTION PROBLEMS COUNT AS FAILURES, NOT e.g. THE ValueError OF changed_since()
+        self.breaker = CircuitBreaker(
+            "prodcode",
+            probe=self.ping,
+            failure_exceptions=(DBAPIError, PoolTimeoutError, OSError)
+        )
+
+    def ping(self) -> None:
+        """Opens one connection and runs SELECT 1 (half-open probe of the breaker)."""
+        with self.engine.connect() as conn:
+            conn.execute(select(1))
+
+    # ------------------------ TABLE METADATA ------------------------
+    @property
+    def table(self) -> Table:
+        """The reflected tbl_prod01 table. Reflection only happens on the first access."""
+        if self._table is None:
+            with self._table_lock:
+                if self._table is None:
+                    self._table = Table(
+                        self.TABLE_NAME,
+                        MetaData(),
+                        autoload_with=self.engine
+                    )
+
+        return self._table
+
+    @property
+    def prodcode_col(self):
+        return self.table.columns[self.PRODCODE_COLUMN]
+
+    # ------------------------ QUERIES ------------------------
+    @guarded_call
+    @timed_call
+    def search(self, text: str, limit: int = 3000) -> List[str]:
+        """Returns the distinct product codes containing the text (case-insensitive)."""
+        prodcode_col = self.prodcode_col
+        stmt = (
+            select(prodcode_col.distinct())
+            .where(prodcode_col.ilike(f"%{text}%"))
+            .limit(limit)
+        )
+
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(stmt)]
+
+    @guarded_call
+    @timed_call
+    def all_codes(self) -> List[str]:
+        """Returns every distinct product code."""
+        stmt = select(self.prodcode_col.distinct())
+
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(stmt)]
+
+    @guarded_call
+    @timed_call
+    def exists(self, code: str) -> bool:
+        """Returns True if the exact product code exists."""
+        stmt = select(sql_exists().where(self.prodcode_col == code))
+
+        with self.engine.connect() as conn:
+            return bool(conn.execute(stmt).scalar())
+
+    @guarded_call
+    @timed_call
+    def changed_since(self, ts: datetime) -> List[str]:
+        """Returns the distinct product codes added or modified after the given timestamp."""
+        if not self.changed_at_column:
+            raise ValueError("PRODCODE_CHANGED_AT_COLUMN is not configured")
+
+        if self.changed_at_column not in self.table.columns:
+            raise ValueError(
+                f"Column '{self.changed_at_column}' does not exist in {self.TABLE_NAME}"
+            )
+
+        changed_at_col = self.table.columns[self.changed_at_column]
+        stmt = select(self.prodcode_col.distinct()).where(changed_at_col > ts)
+
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(stmt)]
+
+    # ------------------------ METRICS ------------------------
+    def _record_timing(self, name: str, elapsed_ms: float) -> None:
+        with self._metrics_lock:
+            entry = self._metrics.setdefault(
+                name, 
+                {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+            )
+            entry["calls"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["last_ms"] = elapsed_ms
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns a snapshot of the per-method timings.
+
+        Example:
+            {"search": {"calls": 3, "total_ms": 41.2, "max_ms": 20.1, "last_ms": 9.8, "avg_ms": 13.7}}
+        """
+        with self._metrics_lock:
+            snapshot = {name: dict(entry) for name, entry in self._metrics.items()}
+
+        for entry in snapshot.values():
+            entry["avg_ms"] = entry["total_ms"] / entry["calls"] if entry["calls"] else 0.0
+
+        return snapshot
+
+    def reset_metrics(self) -> None:
+        with self._metrics_lock:
+            self._metrics.clear()
+
+
+# ------------------------ SHARED INSTANCE ------------------------
+_repository = None
+_repository_lock = threading.Lock()
+
+def get_prodcode_repository() -> ProdCodeRepository:
+    """Returns the application-wide ProdCodeRepository (created on first use)."""
+    global _repository
+
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = ProdCodeRepository()
+
+    return _repository
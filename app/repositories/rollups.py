@@ -0,0 +1,109 @@
+from datetime import date
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from typing import List, Sequence
+
+from models import EndorsementDailyRollupModel
+
+# ------------------------ DAILY ROLLUP QUERIES ------------------------
+# endorsement_daily_rollup has one row per (day, prodcode, category, status), a total over
+# years sums a few hundred rows instead of scanning tbl_endorsement_t1.
+ROLLUP_DIMENSIONS = ("t_date_endorsed", "t_prodcode", "t_category", "t_status")
+
+def rollup_totals(session: Session, **kwargs) -> List[Row]:
+    """
+    Kg endorsed, excess kg and number of endorsements, grouped by any of the rollup dimensions.
+
+    Example:
+        rollup_totals(session, group_by=("t_prodcode",), date_from=date(2026, 1, 1), limit=5)
+        -> [Row(t_prodcode='PC-100', total_kg=1250.0, excess_kg=12.5, endorsement_count=50), ...]   (largest total_kg first)
+
+        rollup_totals(session, group_by=("t_date_endorsed", "t_status"), status="FAILED")
+        -> one row per day with failed endorsements (ordered by day)
+
+    The arguments are the ones of rollup_totals_statement (also used by AsyncRepository.rollup_totals).
+    """
+    return session.execute(rollup_totals_statement(**kwargs)).all()
+
+def rollup_totals_statement(
+    group_by: Sequence[str] = ("t_date_endorsed",),
+    date_from: date = None,
+    date_to: date = None,
+    prodcode: str = None,
+    category: str = None,
+    status: str = None,
+    limit: int = None
+) -> Select:
+    """
+    Select of the rollup totals (see rollup_totals).
+
+    Args:
+        group_by (Sequence[str]): Columns of ROLLUP_DIMENSIONS, empty for one grand total row.
+        date_from (date, optional): First day included.
+        date_to (date, optional): Last day included.
+        prodcode (str, optional): Exact product code.
+        category (str, optional): CategoryEnum value.
+        status (str, optional): StatusEnum value.
+        limit (int, optional): Rows returned, largest total_kg first (e.g. top prodcodes).
+
+    Raises:
+        ValueError: A group_by column is not one of ROLLUP_DIMENSIONS.
+    """
+    unknown = [column for column in group_by if column not in ROLLUP_DIMENSIONS]
+
+    if unknown:
+        raise ValueError(f"Cannot group the rollup by {', '.join(unknown)}, use {', '.join(ROLLUP_DIMENSIONS)}")
+
+    model = EndorsementDailyRollupModel
+    dimensions = [getattr(model, column) for column in group_by]
+
+    statement = select(
+        *dimensions,
+        func.coalesce(func.sum(model.total_kg), 0).label("total_kg"),
+        func.coalesce(func.sum(model.excess_kg), 0).label("excess_kg"),
+        func.coalesce(func.sum(model.endorsement_count), 0).label("endorsement_count"),
+    ).group_by(*dimensions)
+
+    filters = {
+        model.t_prodcode: prodcode,
+        model.t_category: category,
+        model.t_status: status,
+    }
+    for column, value in filters.items():
+        if value is not None:
+            statement = statement.where(column == value)
+
+    if date_from is not None:
+        statement = statement.where(model.t_date_endorsed >= date_from)
+
+    if date_to is not None:
+        statement = statement.where(model.t_date_endorsed <= date_to)
+
+    if limit is not None:
+        statement = statement.order_by(func.sum(model.total_kg).desc()).limit(limit)
+    else:
+        statement = statement.order_by(*dimensions)
+
+    return statement
+
+def rollup_version_statement() -> Select:
+    """
+    Changes whenever a trigger changes the rollup (an update moves max(updated_at), a deleted row
+    changes the count and the sums), the KPI page only runs its queries again when it changed.
+    """
+    model = EndorsementDailyRollupModel
+
+    return select(
+        func.count(),
+        func.max(model.updated_at),
+        func.coalesce(func.sum(model.total_kg), 0),
+        func.coalesce(func.sum(model.excess_kg), 0),
+    )
+
+def total_kg_between(session: Session, date_from: date, date_to: date, **filters) -> float:
+    """Kg endorsed from date_from to date_to (both included), filters are the ones of rollup_totals."""
+    (row,) = rollup_totals(session, group_by=(), date_from=date_from, date_to=date_to, **filters)
+
+    return float(row.total_kg)
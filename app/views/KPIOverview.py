@@ -0,0 +1,209 @@
+from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame
+from PyQt6.QtCore import QTimer
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.helpers import load_styles
+from app.widgets.sparkline import Sparkline
+from app.workers import run_ui_task, on_loop, gather
+from constants.Enums import StatusEnum
+
+import os
+
+# DAYS SHOWN BY THE SPARKLINES (THE DAILY SERIES ALSO COVERS THE CURRENT MONTH)
+SPARKLINE_DAYS = 30
+
+class KPIOverview(QWidget):
+    """
+    First page of the dashboard: kg endorsed today / this week / this month, passed vs failed,
+    excess kg and the top product codes of the month.
+
+    Every number comes from endorsement_daily_rollup (a few hundred rows kept by triggers),
+    the raw endorsement tables are never read. The page is built without any query; the
+    numbers are loaded on the asyncio loop once it is shown and then every refresh_interval
+    seconds while it is visible. A refresh first reads the version of the rollup (one row)
+    and only runs the KPI queries again when the rollup changed.
+
+    Args:
+        refresh_interval (float): Seconds between refreshes. Defaults to KPI_REFRESH_INTERVAL (30).
+    """
+    def __init__(self, refresh_interval: float = None, parent=None):
+        super().__init__(parent)
+        self.refresh_interval = refresh_interval or float(os.getenv("KPI_REFRESH_INTERVAL", 30))
+
+        self._version: Optional[Tuple] = None
+        self._refreshing = False
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(int(self.refresh_interval * 1000))
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        self.setup_ui()
+        self.apply_styles()
+
+    # ------------------------ UI ------------------------
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+
+        cards_layout = QHBoxLayout()
+        self.today_card = self.create_card("Today", sparkline_color="#2980b9")
+        self.week_card = self.create_card("This Week")
+        self.month_card = self.create_card("This Month")
+        self.passed_card = self.create_card("Passed vs Failed (Month)")
+        self.excess_card = self.create_card("Excess (Month)", sparkline_color="#e67e22")
+
+        for card in (self.today_card, self.week_card, self.month_card, self.passed_card, self.excess_card):
+            cards_layout.addWidget(card["frame"])
+
+        # ------------------ TOP PRODUCT CODES OF THE MONTH ------------------
+        top_frame = QFrame()
+        top_frame.setObjectName("kpi-card")
+        top_layout = QVBoxLayout(top_frame)
+
+        top_title = QLabel("Top Product Codes (Month)")
+        top_title.setObjectName("kpi-card-title")
+        top_layout.addWidget(top_title)
+
+        self.top_prodcodes_grid = QGridLayout()
+        top_layout.addLayout(self.top_prodcodes_grid)
+        top_layout.addStretch()
+
+        self.updated_label = QLabel("Loading...")
+        self.updated_label.setObjectName("kpi-updated-label")
+
+        main_layout.addLayout(cards_layout)
+        main_layout.addWidget(top_frame)
+        main_layout.addWidget(self.updated_label)
+        main_layout.addStretch()
+
+    @staticmethod
+    def create_card(title: str, sparkline_color: str = None) -> Dict[str, QWidget]:
+        frame = QFrame()
+        frame.setObjectName("kpi-card")
+        layout = QVBoxLayout(frame)
+
+        title_label = QLabel(title)
+        title_label.setObjectName("kpi-card-title")
+
+        value_label = QLabel("-")
+        value_label.setObjectName("kpi-card-value")
+
+        detail_label = QLabel("")
+        detail_label.setObjectName("kpi-card-detail")
+
+        layout.addWidget(title_label)
+        layout.addWidget(value_label)
+        layout.addWidget(detail_label)
+
+        sparkline = None
+        if sparkline_color is not None:
+            sparkline = Sparkline(color=sparkline_color)
+            layout.addWidget(sparkline)
+
+        return {"frame": frame, "value": value_label, "detail": detail_label, "sparkline": sparkline}
+
+    def apply_styles(self):
+        qss_path = os.path.join(os.path.dirname(__file__), "styles", "kpi_overview.css")
+
+        load_styles(qss_path, self)
+
+    # ------------------------ REFRESH ------------------------
+    def showEvent(self, event):
+        super().showEvent(event)
+
+        # THE FIRST NUMBERS ARE LOADED AFTER THE PAGE IS PAINTED
+        QTimer.singleShot(0, self.refresh)
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        if self._refreshing:
+            return
+
+        self._refreshing = True
+        run_ui_task(self.refresh_async(), on_error=self.on_refresh_error)
+
+    async def refresh_async(self):
+        from app.repositories import get_async_repository
+
+        repository = get_async_repository()
+
+        try:
+            # A NEW DAY CHANGES "TODAY" EVEN WITHOUT A NEW ENDORSEMENT
+            version = (date.today(), *await on_loop(repository.rollup_version()))
+
+            if version == self._version:
+                self.updated_label.setText(f"Up to date ({datetime.now().strftime('%H:%M:%S')})")
+                return
+
+            today = date.today()
+            month_start = today.replace(day=1)
+            series_start = min(month_start, today - timedelta(days=SPARKLINE_DAYS - 1))
+
+            daily_rows, status_rows, prodcode_rows = await gather(
+                repository.rollup_totals(group_by=("t_date_endorsed",), date_from=series_start, date_to=today),
+                repository.rollup_totals(group_by=("t_status",), date_from=month_start, date_to=today),
+                repository.rollup_totals(group_by=("t_prodcode",), date_from=month_start, date_to=today, limit=5),
+            )
+
+            self.update_kpis(today, daily_rows, status_rows, prodcode_rows)
+            self._version = version
+            self.updated_label.setText(f"Updated {datetime.now().strftime('%H:%M:%S')}")
+        finally:
+            self._refreshing = False
+
+    def on_refresh_error(self, error: BaseException):
+        self._refreshing = False
+        print(f"KPI refresh failed: {error}")
+        self.updated_label.setText(f"KPIs unavailable ({datetime.now().strftime('%H:%M:%S')}), retrying in {self.refresh_interval:.0f} s")
+
+    def update_kpis(self, today: date, daily_rows: List, status_rows: List, prodcode_rows: List):
+        daily = {row.t_date_endorsed: row for row in daily_rows}
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+
+        def total(field: str, start: date) -> float:
+            return sum(getattr(row, field) for day, row in daily.items() if start <= day <= today)
+
+        def count(start: date) -> int:
+            return sum(row.endorsement_count for day, row in daily.items() if start <= day <= today)
+
+        # ------------------ KG ENDORSED ------------------
+        for card, start in ((self.today_card, today), (self.week_card, week_start), (self.month_card, month_start)):
+            card["value"].setText(f"{total('total_kg', start):,.2f} kg")
+            card["detail"].setText(f"{count(start)} endorsement(s)")
+
+        # ONE POINT PER DAY, THE LAST ONE IS TODAY
+        spark_days = [today - timedelta(days=offset) for offset in range(SPARKLINE_DAYS - 1, -1, -1)]
+        self.today_card["sparkline"].set_values([daily[day].total_kg if day in daily else 0 for day in spark_days])
+
+        # ------------------ PASSED VS FAILED ------------------
+        by_status = {row.t_status: row.total_kg for row in status_rows}
+        passed = by_status.get(StatusEnum.PASSED.value, 0)
+        failed = by_status.get(StatusEnum.FAILED.value, 0)
+
+        if passed + failed:
+            self.passed_card["value"].setText(f"{passed / (passed + failed):.1%} passed")
+        else:
+            self.passed_card["value"].setText("-")
+        self.passed_card["detail"].setText(f"{passed:,.2f} kg passed / {failed:,.2f} kg failed")
+
+        # ------------------ EXCESS ------------------
+        self.excess_card["value"].setText(f"{total('excess_kg', month_start):,.2f} kg")
+        self.excess_card["detail"].setText(f"{total('excess_kg', today):,.2f} kg today")
+        self.excess_card["sparkline"].set_values([daily[day].excess_kg if day in daily else 0 for day in spark_days])
+
+        # ------------------ TOP PRODUCT CODES ------------------
+        while self.top_prodcodes_grid.count():
+            self.top_prodcodes_grid.takeAt(0).widget().deleteLater()
+
+        if not prodcode_rows:
+            self.top_prodcodes_grid.addWidget(QLabel("No endorsement this month"), 0, 0)
+
+        for row_index, row in enumerate(prodcode_rows):
+            self.top_prodcodes_grid.addWidget(QLabel(f"{row_index + 1}. {row.t_prodcode}"), row_index, 0)
+            self.top_prodcodes_grid.addWidget(QLabel(f"{row.total_kg:,.2f} kg"), row_index, 1)
+            self.top_prodcodes_grid.addWidget(QLabel(f"{row.endorsement_count} endorsement(s)"), row_index, 2)
@@ -1,12 +1,25 @@
-# incoming
-# from app.views.Endorsement import EndorsementMainView
-from app.views.QCFailedToPassed import QCFailedToPassed
-from app.views.QCLabExcess import QCLabExcess
-from app.views.ReceivingReport import ReceivingReport
-
-# outgoing
-from app.views.DeliveryReceipt import DeliveryReceipt
-from app.views.ReturnReplacement import ReturnReplacement
-from app.views.OutgoingRecord import OutgoingRecord
-from app.views.RequisitionLogbook import RequisitionLogbook
-from app.views.QCFailedEndorsement import QCFailedEndorsement
\ No newline at end of file
+# NOTE: The view modules are imported on first attribute access (PEP 562) so that importing
+# app.views does not load every form before the login window is shown.
+from app.lazy_imports import lazy_module_getattr
+
+_LAZY_VIEWS = {
+    # overview
+    "KPIOverview": "app.views.KPIOverview",
+
+    # incoming
+    # "EndorsementMainView": "app.views.endorsement",
+    "QCFailedToPassed": "app.views.QCFailedToPassed",
+    "QCLabExcess": "app.views.QCLabExcess",
+    "ReceivingReport": "app.views.ReceivingReport",
+
+    # outgoing
+    "DeliveryReceipt": "app.views.DeliveryReceipt",
+    "ReturnReplacement": "app.views.ReturnReplacement",
+    "OutgoingRecord": "app.views.OutgoingRecord",
+    "RequisitionLogbook": "app.views.RequisitionLogbook",
+    "QCFailedEndorsement": "app.views.QCFailedEndorsement",
+}
+
+__all__ = list(_LAZY_VIEWS)
+
+__getattr__ = lazy_module_getattr(__name__, _LAZY_VIEWS)
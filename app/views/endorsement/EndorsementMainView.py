@@ -32,10 +32,12 @@ class EndorsementMainView(QWidget):
     def __init__(
         self, 
         session_factory: Callable[..., Session], 
+        warmup=None,
         parent=None
     ):
         super().__init__(parent)
         self.Session = session_factory
+        self.warmup = warmup
         self.setup_ui()
         self.apply_styles()
         
@@ -61,6 +63,8 @@ class EndorsementMainView(QWidget):
         self.stacked_widget = QStackedWidget()
         
         # --------------- Create views -----------------------
+        # NOTE: Only the create view is built up front. The list view (runs load_data) and the
+        # how-to-use view are built the first time their button is clicked.
         self.create_view = EndorsementCreateView(
             session_factory=self.Session,
             endorsement_t1=EndorsementModel,
@@ -68,25 +72,19 @@ class EndorsementMainView(QWidget):
             endorsement_combined_view=EndorsementCombinedView,
             endorsement_lot_excess=EndorsementLotExcessModel,
             endorsement_form_schema=EndorsementFormSchema,
-            user_model=User           
+            user_model=User,
+            warmup=self.warmup
         )
-        self.list_view = EndorsementListView(
-            session_factory=self.Session,
-            endorsement=EndorsementModel,
-            endorsement_t2=EndorsementModelT2,
-            endorsemnt_excess=EndorsementLotExcessModel
-        )
-        self.how_to_use_view = HowToUseView()
+        self.list_view = None
+        self.how_to_use_view = None
         
         # ---------------- Add to stack --------------------
         self.stacked_widget.addWidget(self.create_view)
-        self.stacked_widget.addWidget(self.list_view)
-        self.stacked_widget.addWidget(self.how_to_use_view)
 
         # --------------------- Connect signals -----------------------
         self.create_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.create_view))
         self.list_btn.clicked.connect(self.update_table_on_click)
-        self.how_to_use_btn.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.how_to_use_view))
+        self.how_to_use_btn.clicked.connect(self.show_how_to_use_view)
         
         # ----------------------- When a record is selected in list view for editing -------------------------------
         # self.list_view.table.double_clicked.connect(self.show_update_view)
@@ -107,8 +105,27 @@ class EndorsementMainView(QWidget):
         load_styles(qss_path, self)
 
     def update_table_on_click(self):
+        if self.list_view is None:
+            # ----------- THE TABLE LOADS ITS FIRST PAGE WHEN IT IS CREATED -----------
+            self.list_view = EndorsementListView(
+                session_factory=self.Session,
+                endorsement=EndorsementModel,
+                endorsement_t2=EndorsementModelT2,
+                endorsemnt_excess=EndorsementLotExcessModel
+            )
+            self.stacked_widget.addWidget(self.list_view)
+        else:
+            # ----------- AN ACTIVE FILTER IS RE-RUN (ROWS, PAGE BUTTONS AND SUMMARY STAY IN SYNC) -----------
+            self.list_view.refresh_results()
+
         self.stacked_widget.setCurrentWidget(self.list_view)
-        self.list_view.table.load_data()
+
+    def show_how_to_use_view(self):
+        if self.how_to_use_view is None:
+            self.how_to_use_view = HowToUseView()
+            self.stacked_widget.addWidget(self.how_to_use_view)
+
+        self.stacked_widget.setCurrentWidget(self.how_to_use_view)
 
     def show_update_view(self, ref_no):
         """Load data for editing and switch to update view"""
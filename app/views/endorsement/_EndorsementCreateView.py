@@ -12,11 +12,9 @@ from PyQt6.QtWidgets import (
     QCheckBox
 )
 from app.helpers import (
-    fetch_current_t_refno_in_endorsement,
     populate_endorsement_items,
     load_styles,
     button_cursor_pointer,
-    create_session
 )
 
 from app.widgets import (
@@ -36,8 +34,6 @@ from constants.Enums import CategoryEnum, StatusEnum, RemarksEnum
 from constants.mapped_user import mapped_user_to_display
 
 from sqlalchemy.orm import Session, DeclarativeMeta
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import MetaData, Table, select
 from pydantic import BaseModel, ValidationError
 from datetime import datetime
 
@@ -46,8 +42,11 @@ import math
 import traceback
 import os
 
-# IMPORT THE DATABASE HERE FOR THE 'dbinv' in postgres passed as an instance agurment
-from config.db import prodcode_engine
+# REPOSITORY FOR THE 'dbinv' DATABASE IN POSTGRES (PRODUCT CODES)
+from app.repositories import get_prodcode_repository, get_prodcode_index, PRODCODE_CACHE_PATH, CircuitOpenError, parse_lot_number
+from app.workers.db_heartbeat import get_database_heartbeat, DOWN
+from app.workers.async_bridge import run_ui_task, gather
+from app.instrumentation import instrumented_action, timed_slot
 
 
 class EndorsementCreateView(QWidget):
@@ -60,6 +59,7 @@ class EndorsementCreateView(QWidget):
         endorsement_lot_excess: Type[DeclarativeMeta],
         endorsement_form_schema: Type[BaseModel],
         user_model: Type[DeclarativeMeta],
+        warmup=None,
         parent=None
     ):
         super().__init__(parent)
@@ -74,15 +74,23 @@ class EndorsementCreateView(QWidget):
         self.endorsement_form_schema = endorsement_form_schema
         self.user_model = user_model
 
+        # NOTE: app.workers.StartupWarmup, its results replace the first queries of this view
+        self.warmup = warmup
+
         # -------------------- THIS IS FOR THE TIMER IN PRODCODE EXECUTION ------------------
         self.db_fetch_timer = QTimer()
         self.db_fetch_timer.setSingleShot(True)
         self.db_fetch_timer.timeout.connect(self._fetch_codes_from_database)
+
+        # -------------------- PAUSE THE PRODCODE DB FETCH WHILE THE DATABASE IS DOWN ------------------
+        self.db_heartbeat = get_database_heartbeat()
+        self.db_heartbeat.state_changed.connect(self.on_db_state_changed)
         self.pending_db_text = ""
 
-        self.table_widget = self.show_table()
+        # NOTE: THE TABLE WIDGET IS CREATED IN init_ui()
         self.init_ui()
         self.apply_styles()
+        run_ui_task(self.load_initial_data())
     
     @staticmethod
     def create_input_row(
@@ -154,9 +162,7 @@ class EndorsementCreateView(QWidget):
     @staticmethod
     def load_codes_from_cache() -> list:
         try:
-            current_dir = os.path.dirname(__file__)
-            # path = os.path.join(current_dir, "views", "cache", "prodcode.json")
-            path = os.path.join(current_dir, "..", "cache", "prodcode.json")
+            path = PRODCODE_CACHE_PATH
             
             if os.path.exists(path):
 
@@ -176,8 +182,7 @@ class EndorsementCreateView(QWidget):
                 "data": codes,
                 "total_length": len(codes)
             }
-            # cache_path = os.path.join(BASE_DIR, "views", "cache", "prodcode.json")
-            cache_path = os.path.join(os.path.dirname(__file__), "..", "views", "cache", "prodcode.json")
+            cache_path = PRODCODE_CACHE_PATH
             os.makedirs(os.path.dirname(cache_path), exist_ok=True)
 
             with open(cache_path, "w", encoding="utf-8") as f:
@@ -250,6 +255,9 @@ class EndorsementCreateView(QWidget):
         self.t_wtlot_input.valueChanged.connect(self.validate_lot_quantity)
         self.has_excess_checkbox.stateChanged.connect(self.validate_lot_quantity)
 
+    def _warmup_result(self, name: str):
+        return self.warmup.result(name) if self.warmup else None
+
     def show_table(self):
         table = TableWidget(
             session_factory=self.Session, 
@@ -257,6 +265,7 @@ class EndorsementCreateView(QWidget):
             db_model=self.endorsement_t1,
             view_type="endorsement-create", 
             parent=self,
+            prefetched_page=self._warmup_result("first_list_page")
         )
         table.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
 
@@ -287,10 +296,8 @@ class EndorsementCreateView(QWidget):
                 
             if "-" in lot_text:
                 try:
-                    start, end = lot_text.split("-")
-                    start_num = int(start[:4])
-                    end_num = int(end[:4])
-                    num_lots = (end_num - start_num) + 1
+                    lot = parse_lot_number(lot_text)
+                    num_lots = (lot.end_num - lot.start_num) + 1
                     expected_full = num_lots * wtlot
                     
                     # ---------- New strict validation -------------
@@ -383,6 +390,8 @@ class EndorsementCreateView(QWidget):
         self.t_qtykg_input.setStyleSheet("")
         self.has_excess_checkbox.setStyleSheet("")
             
+    @timed_slot
+    @instrumented_action()
     def refresh_table(self):
         """Refresh table data."""
         try:
@@ -496,21 +505,20 @@ class EndorsementCreateView(QWidget):
         self.t_refno_input.setObjectName("endorsement-refno-input")
         self.t_refno_input.setDisabled(True)
 
-        try:
-            session = self.Session()
-            reference_num = fetch_current_t_refno_in_endorsement(session, self.endorsement_t1)
-            
+        # NOTE: WITHOUT A WARM-UP RESULT THE NUMBER IS FILLED IN BY load_initial_data()
+        reference_num = self._warmup_result("next_refno")
+
+        if reference_num is not None:
             self.t_refno_input.setText(reference_num)
-            create_input_row(
-                "Reference Number:", 
-                # refno_container, 
-                self.t_refno_input,
-                "t_refno", 
-                "t_refno_error",
-                parent=self
-            )   
-        finally:
-            session.close()
+
+        create_input_row(
+            "Reference Number:", 
+            # refno_container, 
+            self.t_refno_input,
+            "t_refno", 
+            "t_refno_error",
+            parent=self
+        )   
     
     def create_category_row(
         self, 
@@ -642,26 +650,52 @@ class EndorsementCreateView(QWidget):
         create_input_row: Callable[[str, Union[QWidget, QLineEdit], str, str, QWidget], None]
     ) -> None:
         self.t_endorsed_by_input = ModifiedComboBox()
-        session = self.Session()
 
-        try:
-            # fetch all the user by username
-            users = session.query(self.user_model).all()
+        # NOTE: WITHOUT A WARM-UP RESULT THE USERS ARE FILLED IN BY load_initial_data()
+        usernames = self._warmup_result("user_directory")
 
-            for user  in users:
-                displayed_user_text = mapped_user_to_display(user.username)
+        if usernames is not None:
+            self.populate_endorsed_by(usernames)
 
-                self.t_endorsed_by_input.addItem(displayed_user_text)
+        create_input_row(
+            "Endorsed By:", 
+            self.t_endorsed_by_input, 
+            "t_endorsed_by", 
+            "t_endorsed_by_error",
+            parent=self
+        )
 
-            create_input_row(
-                "Endorsed By:", 
-                self.t_endorsed_by_input, 
-                "t_endorsed_by", 
-                "t_endorsed_by_error",
-                parent=self
-            )
-        finally:
-            session.close()
+    def populate_endorsed_by(self, usernames: List[str]) -> None:
+        for username in usernames:
+            displayed_user_text = mapped_user_to_display(username)
+
+            self.t_endorsed_by_input.addItem(displayed_user_text)
+
+    async def load_initial_data(self):
+        """
+        Loads what the warm-up did not provide (reference number and users) without blocking the form.
+
+        Both queries are independent, so they run concurrently on the asyncio loop.
+        """
+        from app.repositories import get_async_repository
+
+        repository = get_async_repository()
+        needs_refno = not self.t_refno_input.text()
+        needs_users = self.t_endorsed_by_input.count() == 0
+
+        if not (needs_refno or needs_users):
+            return
+
+        reference_num, usernames = await gather(
+            repository.next_refno(),
+            repository.list_usernames()
+        )
+
+        if needs_refno and not self.t_refno_input.text():
+            self.t_refno_input.setText(reference_num)
+
+        if needs_users and self.t_endorsed_by_input.count() == 0:
+            self.populate_endorsed_by(usernames)
     
     def create_remarks_input_row(
         self,
@@ -712,8 +746,27 @@ class EndorsementCreateView(QWidget):
 
         # Delayed DB fetch only if cache has no match
         self.pending_db_text = text
+
+        # THE FETCH IS RESUMED BY on_db_state_changed ONCE THE PRODCODE DATABASE IS BACK
+        if self.db_heartbeat.is_down("prodcode"):
+            return
+
         self.db_fetch_timer.start(10000)
+
+    def on_db_state_changed(self, name: str, state: str) -> None:
+        if name != "prodcode":
+            return
+
+        if state == DOWN:
+            self.db_fetch_timer.stop()
+
+            # THE HEARTBEAT ALREADY SAW THE OUTAGE, THE LOOKUPS SKIP THE CONNECT TIMEOUTS THAT WOULD OPEN THE BREAKER
+            get_prodcode_repository().breaker.record_failure(RuntimeError("prodcode heartbeat is down"), trip=True)
+        elif getattr(self, "pending_db_text", None) and not self.db_fetch_timer.isActive():
+            self.db_fetch_timer.start(0)
     
+    @timed_slot
+    @instrumented_action()
     def _fetch_codes_from_database(self):
         """
         THIS WILL HAPPEN IF THE USER TYPES A ENTRY ON THE PRODCODE AND 
@@ -726,21 +779,7 @@ class EndorsementCreateView(QWidget):
             return
 
         try:
-            session_factory_prodcode = create_session(prodcode_engine)
-            session = session_factory_prodcode()
-
-            metadata = MetaData()
-            product_code_table = Table("tbl_prod01", metadata, autoload_with=prodcode_engine)
-            prodcode_col = product_code_table.columns["T_PRODCODE"]
-
-            stmt = (
-                select(prodcode_col.distinct())
-                .where(prodcode_col.ilike(f"%{text}%"))
-                .limit(3000)
-            )
-
-            results = session.execute(stmt).fetchall()
-            db_codes = [row[0] for row in results]
+            db_codes = get_prodcode_repository().search(text, limit=3000)
 
             if not db_codes:
                 return  # Nothing found even in DB, don't update dropdown or cache
@@ -755,16 +794,19 @@ class EndorsementCreateView(QWidget):
                 # Merge and save back to JSON
                 updated_codes = sorted(cached_codes.union(new_codes))
                 self.save_codes_to_cache(updated_codes)
+                get_prodcode_index().add_codes(new_codes)
 
             # Proceed to update dropdown regardless
             self._update_combobox(text, db_codes)
             QTimer.singleShot(100, lambda: self.t_prodcode_input.showPopup())
 
+        except CircuitOpenError:
+            # PRODCODE DATABASE IS DOWN: THE DROPDOWN KEEPS THE CACHED CODES, NO CONNECT TIMEOUT ON THE GUI THREAD
+            return
+
         except Exception as e:
             print(f"Error fetching product codes from DB: {e}")
             traceback.print_exc()
-        finally:
-            session.close()
 
     
 
@@ -854,31 +896,79 @@ class EndorsementCreateView(QWidget):
 
         return message
 
+    @timed_slot
+    @instrumented_action()
     def save_endorsement(self):
         """Collects form data, validates it using Pydantic, and handles the result."""
         # ----------------- Clear all errors before re-validation -------------------
         self.clear_error_messages() 
         form_data = self.get_form_data()
+
+        # IMPORTED HERE, psycopg IS ONLY LOADED ONCE SOMETHING IS SAVED
+        from app.repositories.endorsement_writer import get_endorsement_writer, endorsement_rows
+        from psycopg import IntegrityError
+        from psycopg.errors import QueryCanceled
+
+        # NOTE: THE SAVE USES psycopg 3 PIPELINE MODE (see EndorsementWriter), THE CHECKS TAKE ONE ROUND TRIP
+        # AND THE WHOLE WRITE TRANSACTION ANOTHER ONE
+        writer = get_endorsement_writer()
         
         try:
-            # start the session here
-            session = self.Session()
-
             # ---------- Validate the data using your Pydantic schema --------------
+            # NOTE: NO SESSION, THE OVERLAPPING LOT CHECK OF THE SCHEMA IS DONE BY writer.precheck() 
             validated_data = self.endorsement_form_schema.validate_with_session(
                 form_data, 
-                session,
+                None,
                 endorsement_model_t1=self.endorsement_t1,
-                endorsement_model_t2=self.endorsement_t2
+                endorsement_model_t2=self.endorsement_t2,
+                prodcode_index=get_prodcode_index()
             )
 
             # --------------------------------------------------------------------------
             # before passing the validated form in the endorsement model check first if the data is already existing on the database
             
             # NOTE: IS_LOT_EXISTING_T2 HANDLES THE PART IF THE LOT NUMBER WAS PREVIOUSLY ENTERED AS A WHOLE LOT NUMBER
-            is_lot_existing_t2 = session.query(self.endorsement_t2).filter(
-                self.endorsement_t2.t_lotnumbersingle == validated_data.t_lotnumberwhole
-            ).first()
+            # NOTE: EXISTING_SINGLE_LOTS ARE THE LOTS OF A NEW RANGE THAT WERE ALREADY SAVED (ONE INDEXED QUERY FOR THE WHOLE RANGE)
+            overlapping_lot, is_lot_existing_t2, existing_single_lots = writer.precheck(validated_data.t_lotnumberwhole)
+
+            if overlapping_lot:
+                existing_lot, existing_prodcode = overlapping_lot
+
+                self.form_fields["t_lotnumberwhole_error"].setText(
+                    f"Lot range {validated_data.t_lotnumberwhole} conflicts with existing lot {existing_lot} "
+                    f"(Product Code: {existing_prodcode}). Ranged lot numbers must not overlap."
+                )
+                self.form_fields["t_lotnumberwhole"].setStyleSheet("border: 1px solid red;")
+
+                return
+
+            if existing_single_lots:
+                lot_list = "<br>".join(
+                    f"<b>{lot_number}</b> (Reference Number: {t_refno})"
+                    for lot_number, t_refno in existing_single_lots[:20]
+                )
+
+                if len(existing_single_lots) > 20:
+                    lot_list += f"<br>... and {len(existing_single_lots) - 20} more"
+
+                ans_res = StyledMessageBox.question(
+                    self,
+                    "Lot numbers are already existing",
+                    f"{len(existing_single_lots)} lot(s) of {validated_data.t_lotnumberwhole} already exist in the database:"
+                    f"<br><br>{lot_list}<br><br>Are you sure you want to continue?",
+                    setTextFormat=True
+                )
+
+                if ans_res != StyledMessageBox.StandardButton.Yes:
+                    StyledMessageBox.information(
+                        self,
+                        "Transaction Cancelled",
+                        "Transaction has been cancelled"
+                    )
+
+                    return
+
+            existing_lot_to_update = None
 
             if is_lot_existing_t2:
                 string_representation = self.set_message_existing_record(is_lot_existing_t2)
@@ -891,29 +981,10 @@ class EndorsementCreateView(QWidget):
                 )
 
                 if ans_res == StyledMessageBox.StandardButton.Yes:
-                    # ------------ Fetch the endorsement parent related to the result --------------
-                    endorsement_parent = is_lot_existing_t2.endorsement_parent
-
-                    # ------------ UPDATE THE VALUE HERE OF THE QTY IN THE MAIN ENDORSEMENT TABLE 1 ---------
-                    # ------------- INCREMENT THE VALUE HERE -------------
-                    endorsement_parent.t_qtykg += validated_data.t_qtykg
-
-                    # ---------------- SPECIFY ON THE is_lot_existing_t2 on the is_lot_number_entered column and set it to true --------------------
-                    is_lot_existing_t2.is_lot_number_entered = True
-
-                    t2_new_instance = self.endorsement_t2(
-                        t_refno=is_lot_existing_t2.t_refno,
-                        t_lotnumbersingle=validated_data.t_lotnumberwhole,
-                        t_qty=validated_data.t_qtykg,
-                        is_lot_number_entered=True
-                    )
-
-                    # endorsement_t2_items from endorsement t1 is a collection of related reference number
-                    endorsement_parent.endorsement_t2_items.append(t2_new_instance)
-                    session.add(t2_new_instance)
+                    # ------------ THE QTY OF THE PARENT IS INCREMENTED, THE EXISTING LOT IS FLAGGED AS ENTERED ---------
+                    # ------------ AND A NEW T2 ROW IS ADDED TO THE PARENT (ALL IN THE SAME TRANSACTION AS THE SAVE) ---------
+                    existing_lot_to_update = is_lot_existing_t2
                 elif ans_res == StyledMessageBox.StandardButton.No:
-                    session.rollback()
-
                     StyledMessageBox.information(
                         self,
                         "Transaction Cancelled",
@@ -935,21 +1006,25 @@ class EndorsementCreateView(QWidget):
                 has_excess=self.has_excess_checkbox.isChecked()
             )
 
-            session.add(endorsement)
-
-            # ---------------- commit the changes if all transaction in the try block is valid ----------------
-            session.commit()
+            # ---------------- one pipelined transaction, returns the next reference number ----------------
+            t1_row, t2_rows = endorsement_rows(endorsement)
+            reference_number = writer.save(
+                t1_row,
+                t2_rows,
+                existing_lot=existing_lot_to_update,
+                existing_lot_qty=validated_data.t_qtykg
+            )
         except ValueError as e:
             # THIS VALUE ERROR MESSAGE SHOULD MATCH THE ALIGNMENT ON THE ENDORSEMENT FORM SCHEMA
             error_instance = e.errors()[0]["msg"]
 
-            if "Production code must be GTE 16" in str(e):
+            # NOTE: BOTH THE LENGTH AND THE EXISTENCE CHECK MESSAGES START WITH 'Production code'
+            if "Production code" in str(e):
                 self.form_fields["t_prodcode_error"].setText(error_instance)
                 self.form_fields["t_prodcode"].setStyleSheet("border: 1px solid red;")
             else:
                 self.form_fields["t_lotnumberwhole_error"].setText(error_instance)
                 self.form_fields["t_lotnumberwhole"].setStyleSheet("border: 1px solid red;")
-            session.rollback()
         except ValidationError as e:            
             self.display_errors(e.errors())
             
@@ -958,15 +1033,20 @@ class EndorsementCreateView(QWidget):
                 "Validation Error",
                 "Please correct the errors in the form"
             )
-
-            session.rollback()
         except IntegrityError as e:
             StyledMessageBox.critical(
                 self,
                 "Error",
                 f"Item is already existing on the database. Please add another item: {e}"
             ) 
-            session.rollback()
+
+        except QueryCanceled:
+            # statement_timeout OF THE CREATE VIEW (STATEMENT_TIMEOUT_MS_ENDORSEMENT_CREATE), NOTHING WAS SAVED
+            StyledMessageBox.warning(
+                self,
+                "Save Took Too Long",
+                "The database did not finish saving in time, nothing was saved. Please try again in a moment."
+            )
 
         except Exception as e:
             print(e)
@@ -976,7 +1056,6 @@ class EndorsementCreateView(QWidget):
                 f"An unexpected error occurred: {e}"
             )
             traceback.print_exc()
-            session.rollback()
         else:
             StyledMessageBox.information(
                 self,
@@ -987,12 +1066,9 @@ class EndorsementCreateView(QWidget):
             # -------------- Optionally clear the form after successful submission -------------
             self.clear_form()
             
-            # --------------- ALSO FETCH THE REF_NO AGAIN. To be displayed ----------------------
-            reference_number = fetch_current_t_refno_in_endorsement(session, self.endorsement_t1)
+            # --------------- ALSO DISPLAY THE NEXT REF_NO (READ IN THE SAVE TRANSACTION) ----------------------
             self.t_refno_input.setText(reference_number)
             self.refresh_table()
-        finally:
-            session.close()
 
     def clear_form(self):
         """Resets the input fields to their initial state."""
@@ -11,12 +11,25 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QDate
 
 from app.helpers import load_styles, button_cursor_pointer
+from app.StyledMessage import StyledMessageBox
 from app.widgets import ModifiedComboBox, ModifiedDateEdit, TableWidget
-from constants.Enums import CategoryEnum, StatusEnum
+from constants.Enums import CategoryEnum, StatusEnum, PageEnum
 from typing import Callable, Type, Union
+from sqlalchemy import select
 from sqlalchemy.orm import Session, DeclarativeMeta
+from sqlalchemy.sql import Select
+from app.workers.async_bridge import run_ui_task, on_loop, gather
+from app.instrumentation import instrumented_action, timed_slot
+from config.timeouts import statement_timeout_ms, is_query_canceled
+from app.repositories.lot_numbers import lot_contains, lot_prefix
+from app.repositories.filter_summary import FilterConditions, FilterSummary, filter_summary_statement
 
 import os
+import re
+import traceback
+
+# SINGLE LOT OR RANGE, SAME FORMAT AS EndorsementFormSchema.validate_lot_number
+LOT_NUMBER_PATTERN = re.compile(r"^\d{4}[A-Z]{2}(-\d{4}[A-Z]{2})?$")
 
 class EndorsementListView(QWidget):
     """View with filters and table"""
@@ -34,13 +47,16 @@ class EndorsementListView(QWidget):
         self.endorsement = endorsement
         self.endorsement_t2 = endorsement_t2
         self.endorsement_excess = endorsemnt_excess
+        self.active_filter: FilterConditions = None # filter of the last search, its pages are loaded on the server
+        self.summary = FilterSummary()
         self.setup_ui()
         self.apply_styles()
 
     @staticmethod
     def create_filter_group(
         label: Type[QLabel], 
-        widget: Union[QLineEdit, ModifiedComboBox]
+        widget: Union[QLineEdit, ModifiedComboBox],
+        facet_label: QLabel = None
     ):
         group = QWidget()
         layout = QVBoxLayout(group)
@@ -48,6 +64,10 @@ class EndorsementListView(QWidget):
         layout.setSpacing(2)
         layout.addWidget(label)
         layout.addWidget(widget)
+
+        # ------------- COUNTS OF EACH CHOICE FOR THE CURRENT SEARCH (see update_summary) -------------
+        if facet_label is not None:
+            layout.addWidget(facet_label)
             
         return group
 
@@ -64,11 +84,16 @@ class EndorsementListView(QWidget):
         view_btn_layout = self.create_view_other_table_layout()
         self.table = self.show_table()
 
+        # ------------- SUMMARY OF THE SEARCH (ALL PAGES) UNDER THE TABLE ----------------
+        self.summary_label = QLabel("")
+        self.summary_label.setObjectName("endorsementList-summary-label")
+
         # ------------- Add all to main layout ----------------
         layout.addLayout(top_filter_layout)
         layout.addLayout(bottom_filter_layout)
         layout.addLayout(view_btn_layout)
         layout.addWidget(self.table)
+        layout.addWidget(self.summary_label)
         layout.setStretch(2, 1)
 
         self.create_category_menu()
@@ -78,10 +103,12 @@ class EndorsementListView(QWidget):
         # ---------------- connect the button to filter function ---------------------
         self.search_button.clicked.connect(self.filter_function)
         self.list_reset_btn.clicked.connect(self.list_reset_callback)
+        self.table.reloaded.connect(self.clear_summary)
         
         # Connect returnPressed signals for quick filtering
         self.ref_no_input.returnPressed.connect(self.filter_function)
         self.prod_code_input.returnPressed.connect(self.filter_function)
+        self.lot_no_input.returnPressed.connect(self.filter_function)
 
     def apply_styles(self):
         current_dir = os.path.dirname(__file__)
@@ -101,8 +128,8 @@ class EndorsementListView(QWidget):
             view_type="endorsement-list"
         )
        
+        # NOTE: TableWidget already loads the first page in its constructor
         self.set_table_policy(table=table)
-        table.load_data()
         
         return table
 
@@ -115,7 +142,6 @@ class EndorsementListView(QWidget):
         )
 
         self.set_table_policy(table=table)
-        table.load_data()
 
         return table
 
@@ -142,9 +168,17 @@ class EndorsementListView(QWidget):
         self.status_filter = ModifiedComboBox()
         self.prod_code_input = QLineEdit()
         self.ref_no_input = QLineEdit()
+        self.lot_no_input = QLineEdit()
 
         self.prod_code_input.setPlaceholderText("Filter by production code")
         self.ref_no_input.setPlaceholderText("Filter by reference number")
+        self.lot_no_input.setPlaceholderText("Lot number or range, e.g. 1237AB or 1232AB-1236AB")
+
+        # ------------ FACET COUNTS (FILLED AFTER A SEARCH) ----------------
+        self.category_facets = QLabel("")
+        self.status_facets = QLabel("")
+        self.category_facets.setObjectName("endorsementList-facet-label")
+        self.status_facets.setObjectName("endorsementList-facet-label")
 
         # ------------ RESET BTN ----------------
         self.list_reset_btn = QPushButton("Reset")
@@ -155,6 +189,7 @@ class EndorsementListView(QWidget):
         status_label = QLabel("Status:")
         prod_code_label = QLabel("Prod Code:")
         ref_no_label = QLabel("Ref No:")
+        lot_no_label = QLabel("Lot No:")
         from_label = QLabel("From:")
         to_label = QLabel("To:")
 
@@ -182,14 +217,16 @@ class EndorsementListView(QWidget):
         status_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         prod_code_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         ref_no_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        lot_no_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         from_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         to_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
 
         # --- Top row add widget (1) ---
-        top_filter_layout.addWidget(create_filter_group(category_label, self.category_filter), stretch=1)
-        top_filter_layout.addWidget(create_filter_group(status_label, self.status_filter), stretch=1)
+        top_filter_layout.addWidget(create_filter_group(category_label, self.category_filter, self.category_facets), stretch=1)
+        top_filter_layout.addWidget(create_filter_group(status_label, self.status_filter, self.status_facets), stretch=1)
         top_filter_layout.addWidget(create_filter_group(prod_code_label, self.prod_code_input), stretch=1)
         top_filter_layout.addWidget(create_filter_group(ref_no_label, self.ref_no_input), stretch=1)
+        top_filter_layout.addWidget(create_filter_group(lot_no_label, self.lot_no_input), stretch=1)
 
         # --- Bottom row filter layout (2) ---
         bottom_filter_layout.addWidget(from_label)
@@ -222,65 +259,187 @@ class EndorsementListView(QWidget):
 
         return view_layout
 
+    @timed_slot
+    @instrumented_action()
     def filter_function(self):
-        session = self.Session()
+        self.active_filter = self.build_filter_conditions()
 
-        try:
-            ref_no_filter = self.ref_no_input.text().strip()
-            prod_code_filter = self.prod_code_input.text().strip()
-            status_code_filter = self.status_filter.currentText().strip().upper()
-            category_filter = self.category_filter.currentText().strip().upper()
+        # A NEW SEARCH STARTS AT THE FIRST PAGE, THE PAGE BUTTONS OF THE TABLE THEN LOAD THE PAGES OF THIS FILTER
+        self.table.current_page = PageEnum.DEFAULT_CURRENT_PAGE.value
+        self.table.page_loader = self.load_filtered_page
 
-            query = session.query(self.endorsement)
-            
-            # ---------------- FILTER LOGIC FOR REFERENCE NUMBER -----------------
-            if ref_no_filter:
-                query = query.filter(self.endorsement.t_refno.ilike(f"%{ref_no_filter}%"))
-            
-            # --------------- FILTER LOGIC FOR PRODUCTION CODE -------------------
-            if prod_code_filter:
-                query = query.filter(self.endorsement.t_prodcode.ilike(f"%{prod_code_filter}%"))
-
-            # -------------- FILTER LOGIC FOR THE STATUS ------------------------
-            if status_code_filter != "ALL":
-                query = query.filter(
-                    self.endorsement.t_status == status_code_filter
-                )
-            
-            if status_code_filter == "ALL":
-                query = query.filter(
-                    self.endorsement.t_status.in_([StatusEnum.PASSED.value, StatusEnum.FAILED.value])
-                )
+        # THE QUERIES RUN ON THE ASYNCIO LOOP, THE TABLE IS UPDATED WHEN THE RESULTS COME BACK
+        self.search_button.setDisabled(True)
+        run_ui_task(self.filter_async(self.active_filter, with_summary=True), on_error=self.on_filter_error)
 
-            # -------------------  FILTER LOGIC FOR THE CATEGORY ----------------------
-            if category_filter != "ALL":
-                selected_category = self.category_filter.currentData()
+    def load_filtered_page(self):
+        # PREVIOUS / NEXT / ITEMS PER PAGE: ONLY THE PAGE QUERY, THE SUMMARY OF THE FILTER DID NOT CHANGE
+        run_ui_task(self.filter_async(self.active_filter, with_summary=False), on_error=self.on_filter_error)
 
-                if selected_category:  # Ensure we have valid category data
-                    query = query.filter(self.endorsement.t_category == selected_category.value)
+    def refresh_results(self):
+        """
+        Reloads what the table shows when the view is opened again: the current page of the active
+        filter with its summary (the other views may have changed the rows), or the unfiltered page.
+        """
+        if self.table.page_loader is None:
+            self.table.load_data()
+            return
 
-            if category_filter == "ALL":
-                query = query.filter(
-                    self.endorsement.t_category.in_([CategoryEnum.MB.value, CategoryEnum.DC.value])
-                )
+        self.search_button.setDisabled(True)
+        run_ui_task(self.filter_async(self.active_filter, with_summary=True), on_error=self.on_filter_error)
 
-            # --------------------  FILTER LOGIC FOR THE DATES -----------------------
-            if self.date_from.date() <= self.date_to.date():
-                query = query.filter(
-                    self.endorsement.t_date_endorsed >= self.date_from.date().toPyDate(),
-                    self.endorsement.t_date_endorsed <= self.date_to.date().toPyDate()
+    async def filter_async(self, conditions: FilterConditions, with_summary: bool = True):
+        """
+        Loads the current page of the table for the filter and, for a new search, its summary.
+
+        The page (OFFSET / LIMIT) and the summary (one GROUPING SETS aggregate, see
+        app.repositories.filter_summary) run concurrently on two connections, the rows of
+        the other pages are never loaded.
+        """
+        from app.repositories import get_async_repository, QueryHandle
+
+        repository = get_async_repository()
+        timeout_ms = statement_timeout_ms("endorsement-list")
+
+        offset = (self.table.current_page - 1) * self.table.items_per_page
+        page_statement = self.build_filter_statement(conditions).offset(offset).limit(self.table.items_per_page)
+
+        # THE CANCEL BUTTON OF THE TABLE STOPS THE QUERIES ON THE SERVER (pg_cancel_backend)
+        handle = QueryHandle()
+        self.table.begin_running_query(handle)
+
+        try:
+            if with_summary:
+                records, summary = await gather(
+                    repository.filter_endorsements(page_statement, timeout_ms=timeout_ms, handle=handle),
+                    repository.filter_summary(filter_summary_statement(self.endorsement, conditions), timeout_ms=timeout_ms, handle=handle),
                 )
-            
-            # UPDATES THE TABLE BY CALLING THE .update_table_with_results in the TableWidget class
-            results = query.order_by(self.endorsement.t_date_endorsed.desc()).all()
-            self.table.update_table_with_results(results, apply_pagination=True)
+                self.update_summary(summary)
+            else:
+                records = await on_loop(repository.filter_endorsements(page_statement, timeout_ms=timeout_ms, handle=handle))
+
+            self.table.show_filtered_page(records, self.summary.endorsement_count)
+        except Exception as e:
+            if not is_query_canceled(e):
+                raise
+
+            # TIMEOUT OR CANCEL BUTTON: KEEP THE PREVIOUS RESULTS AND TELL THE USER WHAT TO DO
+            self.table.show_query_canceled_message(canceled_by_user=handle.cancel_requested)
         finally:
-            session.close()
+            self.table.end_running_query()
+            self.search_button.setDisabled(False)
+
+    def on_filter_error(self, error: Exception):
+        # NOTE: filter_async HAS ALREADY RE-ENABLED THE SEARCH BUTTON AND HIDDEN THE CANCEL BUTTON (finally)
+        print(f"Search failed with {type(error).__name__}: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+        StyledMessageBox.critical(
+            self,
+            "Search Error",
+            f"The search could not be completed ({type(error).__name__}): {error}\n\n"
+            "The table still shows the previous results."
+        )
+
+    def build_filter_conditions(self) -> FilterConditions:
+        ref_no_filter = self.ref_no_input.text().strip()
+        prod_code_filter = self.prod_code_input.text().strip()
+        lot_no_filter = self.lot_no_input.text().strip().upper()
+        status_code_filter = self.status_filter.currentText().strip().upper()
+        category_filter = self.category_filter.currentText().strip().upper()
+
+        # SOFT DELETED ENDORSEMENTS ARE NEVER LISTED (ALSO LETS POSTGRES USE THE is_deleted = false PARTIAL INDEXES)
+        where = [self.endorsement.is_deleted == False]
+        
+        # ---------------- FILTER LOGIC FOR REFERENCE NUMBER -----------------
+        if ref_no_filter:
+            where.append(self.endorsement.t_refno.ilike(f"%{ref_no_filter}%"))
+        
+        # --------------- FILTER LOGIC FOR PRODUCTION CODE -------------------
+        if prod_code_filter:
+            where.append(self.endorsement.t_prodcode.ilike(f"%{prod_code_filter}%"))
+
+        # --------------- FILTER LOGIC FOR THE LOT NUMBER -------------------
+        # A COMPLETE LOT ('1237AB') OR RANGE ('1232AB-1236AB') ALSO FINDS THE RANGE THAT CONTAINS ALL OF IT
+        # ('1230AB-1240AB') THROUGH THE (lot_suffix, lot_start_num, lot_end_num) INDEX OF t1, A PARTIAL ONE IS A PREFIX SEARCH
+        if lot_no_filter:
+            if LOT_NUMBER_PATTERN.match(lot_no_filter):
+                where.append(lot_contains(self.endorsement, lot_no_filter))
+            else:
+                # NOTE: lot_no_filter IS UPPER-CASED LIKE THE SAVED LOT NUMBERS (see EndorsementFormSchema), THE
+                # CASE SENSITIVE PREFIX USES THE text_pattern_ops INDEX OF t_lotnumberwhole
+                where.append(lot_prefix(self.endorsement, lot_no_filter))
+
+        # -------------- FILTER LOGIC FOR THE STATUS ------------------------
+        # NOTE: KEPT APART FROM where, THE STATUS COUNTS OF THE SUMMARY IGNORE IT (see app.repositories.filter_summary)
+        if status_code_filter != "ALL":
+            status_condition = self.endorsement.t_status == status_code_filter
+        
+        if status_code_filter == "ALL":
+            status_condition = self.endorsement.t_status.in_([StatusEnum.PASSED.value, StatusEnum.FAILED.value])
+
+        # -------------------  FILTER LOGIC FOR THE CATEGORY ----------------------
+        category_condition = None
+
+        if category_filter != "ALL":
+            selected_category = self.category_filter.currentData()
+
+            if selected_category:  # Ensure we have valid category data
+                category_condition = self.endorsement.t_category == selected_category.value
+
+        if category_filter == "ALL":
+            category_condition = self.endorsement.t_category.in_([CategoryEnum.MB.value, CategoryEnum.DC.value])
+
+        # --------------------  FILTER LOGIC FOR THE DATES -----------------------
+        if self.date_from.date() <= self.date_to.date():
+            where.extend([
+                self.endorsement.t_date_endorsed >= self.date_from.date().toPyDate(),
+                self.endorsement.t_date_endorsed <= self.date_to.date().toPyDate()
+            ])
+
+        return FilterConditions(where=where, status=status_condition, category=category_condition)
+
+    def build_filter_statement(self, conditions: FilterConditions = None) -> Select:
+        """Select of the endorsements matching the filters (all pages), newest first."""
+        conditions = conditions or self.build_filter_conditions()
+
+        # t_id KEEPS THE ORDER OF THE ENDORSEMENTS OF ONE DAY THE SAME ON EVERY PAGE
+        return select(self.endorsement).where(*conditions.all()).order_by(
+            self.endorsement.t_date_endorsed.desc(),
+            self.endorsement.t_id.desc()
+        )
+
+    # ------------------------ SUMMARY FOOTER AND FACET COUNTS ------------------------
+    def update_summary(self, summary: FilterSummary):
+        self.summary = summary
+
+        self.summary_label.setText(
+            f"Total: {summary.total_kg:,.2f} kg | {summary.lot_count:,} lot(s) | {summary.endorsement_count:,} endorsement(s) | "
+            f"Passed: {summary.passed_count:,} ({summary.passed_kg:,.2f} kg) | "
+            f"Failed: {summary.failed_count:,} ({summary.failed_kg:,.2f} kg)"
+        )
+
+        # WHAT THE LIST SHOWS FOR EACH CHOICE OF THE COMBO, THE OTHER FILTERS UNCHANGED
+        self.status_facets.setText("  ".join(
+            f"{status.value} {summary.status_counts.get(status.value, 0):,}" for status in StatusEnum
+        ))
+        self.category_facets.setText("  ".join(
+            f"{category.value} {summary.category_counts.get(category.value, 0):,}" for category in CategoryEnum
+        ))
+
+    def clear_summary(self):
+        # THE TABLE WAS RELOADED WITHOUT THE FILTER (RESET / REFRESH)
+        self.active_filter = None
+        self.summary = FilterSummary()
+
+        for label in (self.summary_label, self.status_facets, self.category_facets):
+            label.setText("")
 
     def list_reset_callback(self):
         filter_objects = (
             self.prod_code_input,
-            self.ref_no_input
+            self.ref_no_input,
+            self.lot_no_input
         )
         
         for input_widget in filter_objects:
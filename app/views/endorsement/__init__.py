@@ -1 +1,10 @@
-from app.views.endorsement.EndorsementMainView import EndorsementMainView
\ No newline at end of file
+# NOTE: Imported on first attribute access (PEP 562), see app/views/__init__.py
+from app.lazy_imports import lazy_module_getattr
+
+_LAZY_VIEWS = {
+    "EndorsementMainView": "app.views.endorsement.EndorsementMainView",
+}
+
+__all__ = list(_LAZY_VIEWS)
+
+__getattr__ = lazy_module_getattr(__name__, _LAZY_VIEWS)
@@ -1,9 +1,10 @@
 from constants.Enums import StatusEnum, CategoryEnum
 from datetime import date
 from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Optional, Type, TypedDict
+from typing import ClassVar, Optional, Type, TypedDict
 from sqlalchemy.orm import Session, DeclarativeMeta
 from constants.Enums import CategoryEnum, StatusEnum
+from app.repositories.lot_numbers import parse_lot_number, lot_range_overlaps
 import re
 import math
 
@@ -99,6 +100,9 @@ class EndorsementFormSchema(BaseModel):
     _endorsement_model_t1 = None
     _endorsement_model_t2 = None
 
+    # ClassVar so pydantic keeps it as a plain class attribute (read by the classmethod validators)
+    _prodcode_index: ClassVar[Optional[object]] = None
+
     @classmethod
     def set_db_session(cls, session: Type[Session]):
         cls._db_session = session
@@ -111,15 +115,24 @@ class EndorsementFormSchema(BaseModel):
     def set_model_t2(cls, model: Type[DeclarativeMeta]):
         cls._endorsement_model_t2 = model
     
+    @classmethod
+    def set_prodcode_index(cls, prodcode_index):
+        cls._prodcode_index = prodcode_index
+    
     @classmethod
     def validate_with_session(
         cls, 
         data: FormData,  # data of the inputs of pyqt6
         session: Type[Session],
         endorsement_model_t1: Type[DeclarativeMeta] = None,
-        endorsement_model_t2: Type[DeclarativeMeta] = None
+        endorsement_model_t2: Type[DeclarativeMeta] = None,
+        prodcode_index = None
     ):
-        """Helper method to validate with a database session"""
+        """
+        Helper method to validate with a database session
+
+        NOTE: prodcode_index (app.repositories.ProdCodeIndex) enables the product code existence check
+        """
         try:
             if endorsement_model_t1:
                 cls.set_model_t1(endorsement_model_t1)
@@ -128,10 +141,12 @@ class EndorsementFormSchema(BaseModel):
                 cls.set_model_t2(endorsement_model_t2)
             
             cls.set_db_session(session)
+            cls.set_prodcode_index(prodcode_index)
 
             return cls(**data)
         finally:
             cls.set_db_session(None)
+            cls.set_prodcode_index(None)
 
     ### VALIDATORS ###
     #####################################################################
@@ -151,6 +166,10 @@ class EndorsementFormSchema(BaseModel):
         if not len(value) >= valid_length_for_prod:
             raise ValueError("Production code must be GTE 16")
         
+        # ----- O(1) SET LOOKUP FIRST, THE PRODCODE DATABASE IS ONLY ASKED ON A MISS -----
+        if cls._prodcode_index is not None and not cls._prodcode_index.contains(value):
+            raise ValueError(f"Production code '{value}' does not exist")
+        
         return value
     
     @field_validator("t_bag_num", mode="before")
@@ -181,12 +200,11 @@ class EndorsementFormSchema(BaseModel):
             return value
 
         elif re.match(range_lot_pattern, value):
-            start, end = value.split("-")
-            first_num, first_code = start[:4], start[-2:]
-            second_num, second_code = end[:4], end[-2:]
+            lot = parse_lot_number(value)
+            first_code, second_code = lot.suffix, lot.end_suffix
 
-            first_int = int(first_num)
-            second_int = int(second_num)
+            first_int = lot.start_num
+            second_int = lot.end_num
 
             fl1 = alphabet_list.index(first_code[0].lower())
             fl2 = alphabet_list.index(first_code[1].lower())
@@ -220,12 +238,10 @@ class EndorsementFormSchema(BaseModel):
     def validate_lot_quantity_proportion(self):
         if "-" in self.t_lotnumberwhole:
             # For range lot numbers
-            start, end = self.t_lotnumberwhole.split("-")
-            start_num = int(start[:4])
-            end_num = int(end[:4])
+            lot = parse_lot_number(self.t_lotnumberwhole)
             
             # Calculate number of lots
-            num_lots = (end_num - start_num) + 1
+            num_lots = (lot.end_num - lot.start_num) + 1
             
             # Calculate expected quantity
             expected_full_quantity = num_lots * self.t_wtlot
@@ -262,10 +278,8 @@ class EndorsementFormSchema(BaseModel):
         
         # Check if has_excess should be checked based on quantity
         if "-" in self.t_lotnumberwhole and not self.t_has_excess:
-            start, end = self.t_lotnumberwhole.split("-")
-            start_num = int(start[:4])
-            end_num = int(end[:4])
-            num_lots = (end_num - start_num) + 1
+            lot = parse_lot_number(self.t_lotnumberwhole)
+            num_lots = (lot.end_num - lot.start_num) + 1
             expected_full_quantity = num_lots * self.t_wtlot
             
             if not math.isclose(self.t_qtykg, expected_full_quantity, rel_tol=1e-5, abs_tol=1e-5):
@@ -348,41 +362,27 @@ class EndorsementFormSchema(BaseModel):
         if "-" not in self.t_lotnumberwhole:
             return self
 
-        # Only check for overlapping ranges if input is a range
-        new_start, new_end = self.t_lotnumberwhole.split("-")
-        new_start_num = int(new_start[:4])
-        new_start_suffix = new_start[4:]
-        new_end_num = int(new_end[:4])
-        new_end_suffix = new_end[4:]
+        # Only check for overlapping ranges if input is a range.
+        # THE OVERLAP IS AN INDEXED PREDICATE ON THE GENERATED lot_suffix / lot_start_num / lot_end_num COLUMNS
+        new_lot = parse_lot_number(self.t_lotnumberwhole)
 
-        # Get all existing RANGED lots (not single lots)
-        existing_ranged_lots = self._db_session.query(
+        overlapping_lot = self._db_session.query(
             model.t_lotnumberwhole,
             model.t_prodcode
         ).filter(
             model.is_deleted == False,
             model.t_lotnumberwhole != self.t_lotnumberwhole,  # Exclude self for updates
-            model.t_lotnumberwhole.contains("-")  # Only check ranged lots
-        ).all()
-
-        for existing_lot, existing_prodcode in existing_ranged_lots:
-            # Parse existing lot range
-            existing_start, existing_end = existing_lot.split("-")
-            existing_start_num = int(existing_start[:4])
-            existing_start_suffix = existing_start[4:]
-            existing_end_num = int(existing_end[:4])
-            existing_end_suffix = existing_end[4:]
-
-            # Check if suffixes match (optional)
-            if new_start_suffix != existing_start_suffix:
-                continue
-
-            # Check for numeric overlap
-            if (new_start_num <= existing_end_num) and (new_end_num >= existing_start_num):
-                raise ValueError(
-                    f"Lot range {self.t_lotnumberwhole} conflicts with existing lot {existing_lot} "
-                    f"(Product Code: {existing_prodcode}). Ranged lot numbers must not overlap."
-                )
+            model.t_lotnumberwhole.contains("-"),  # Only check ranged lots
+            lot_range_overlaps(model, new_lot)
+        ).first()
+
+        if overlapping_lot is not None:
+            existing_lot, existing_prodcode = overlapping_lot
+
+            raise ValueError(
+                f"Lot range {self.t_lotnumberwhole} conflicts with existing lot {existing_lot} "
+                f"(Product Code: {existing_prodcode}). Ranged lot numbers must not overlap."
+            )
 
         return self
     ###################################################################
\ No newline at end of file
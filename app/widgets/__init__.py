@@ -1,8 +1,18 @@
-from app.widgets.combobox import ModifiedComboBox
-from app.widgets.lineedits import LotNumberLineEdit
-from app.widgets.tablewidget import TableWidget
-from app.widgets.dateedit import ModifiedDateEdit
-from app.widgets.doubleSpinBox import ModifiedDoubleSpinBox
-from app.widgets.checkbox import ModifiedCheckbox
-from app.widgets.spinbox import ModifiedSpinBox
-# from app.widgets.scrollableTableWidget import ScrollableTableWidget
\ No newline at end of file
+# NOTE: The widget modules are imported on first attribute access (PEP 562), see app/views/__init__.py
+from app.lazy_imports import lazy_module_getattr
+
+_LAZY_WIDGETS = {
+    "ModifiedComboBox": "app.widgets.combobox",
+    "LotNumberLineEdit": "app.widgets.lineedits",
+    "TableWidget": "app.widgets.tablewidget",
+    "ModifiedDateEdit": "app.widgets.dateedit",
+    "ModifiedDoubleSpinBox": "app.widgets.doubleSpinBox",
+    "ModifiedCheckbox": "app.widgets.checkbox",
+    "ModifiedSpinBox": "app.widgets.spinbox",
+    "Sparkline": "app.widgets.sparkline",
+    # "ScrollableTableWidget": "app.widgets.scrollableTableWidget",
+}
+
+__all__ = list(_LAZY_WIDGETS)
+
+__getattr__ = lazy_module_getattr(__name__, _LAZY_WIDGETS)
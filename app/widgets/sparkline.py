@@ -0,0 +1,72 @@
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtGui import QPainter, QPen, QColor, QPainterPath, QBrush
+from PyQt6.QtCore import Qt, QPointF, QSize
+from typing import List, Sequence
+
+class Sparkline(QWidget):
+    """
+    Small line chart without axes drawn with QPainter (no chart library to load).
+
+    Example:
+        sparkline = Sparkline(color="#2980b9")
+        sparkline.set_values([120.0, 95.5, 140.0, 0.0, 210.25])
+
+    Args:
+        color (str): Line color, the area under the line uses the same color, transparent.
+    """
+    def __init__(self, color: str = "#2980b9", parent=None):
+        super().__init__(parent)
+        self.values: List[float] = []
+        self.color = QColor(color)
+
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setMinimumHeight(40)
+
+    def sizeHint(self) -> QSize:
+        return QSize(200, 40)
+
+    def set_values(self, values: Sequence[float]):
+        self.values = [float(value or 0) for value in values]
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.values) < 2:
+            return
+
+        margin = 3
+        width = self.width() - 2 * margin
+        height = self.height() - 2 * margin
+        low, high = min(self.values), max(self.values)
+        span = (high - low) or 1.0
+        step = width / (len(self.values) - 1)
+
+        points = [
+            QPointF(margin + index * step, margin + height - (value - low) / span * height)
+            for index, value in enumerate(self.values)
+        ]
+
+        line = QPainterPath(points[0])
+        for point in points[1:]:
+            line.lineTo(point)
+
+        area = QPainterPath(line)
+        area.lineTo(points[-1].x(), margin + height)
+        area.lineTo(points[0].x(), margin + height)
+        area.closeSubpath()
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        fill = QColor(self.color)
+        fill.setAlpha(40)
+        painter.fillPath(area, QBrush(fill))
+
+        painter.setPen(QPen(self.color, 1.5))
+        painter.drawPath(line)
+
+        # LAST VALUE (TODAY) AS A DOT
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(self.color))
+        painter.drawEllipse(points[-1], 2.5, 2.5)
+
+        painter.end()
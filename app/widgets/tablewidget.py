@@ -7,6 +7,7 @@ from PyQt6.QtWidgets import (
 )
 
 from PyQt6.QtCore import Qt, pyqtSignal
+from app.instrumentation import instrumented_action, timed_slot
 from PyQt6.QtGui import QColor
 
 from typing import Union, Callable, Type, Literal
@@ -15,13 +16,14 @@ from app.helpers import button_cursor_pointer, load_styles
 from app.StyledMessage import StyledMessageBox
 from constants.Enums import TableHeader
 from constants.Enums import PageEnum
+from config.timeouts import statement_timeout_ms, statement_timeout_clause, is_query_canceled
 
 from .scrollableTableWidget import ScrollableTableWidget
-import pandas as pd
 import os
 
 class TableWidget(QWidget):
     double_clicked = pyqtSignal(str)
+    reloaded = pyqtSignal() # reload_table dropped the filter of the view (refresh / reset)
 
     def __init__(
         self,
@@ -35,7 +37,8 @@ class TableWidget(QWidget):
             None
         ] = None,
         parent=None,
-        items_per_page = PageEnum.ITEMS_PER_PAGE.value # New: items per page for pagination
+        items_per_page = PageEnum.ITEMS_PER_PAGE.value, # New: items per page for pagination
+        prefetched_page: tuple = None # (total_items, records) of the first page, e.g. from the startup warm-up
     ):
         super().__init__(parent)
 
@@ -70,6 +73,9 @@ class TableWidget(QWidget):
         self.current_page = PageEnum.DEFAULT_CURRENT_PAGE.value # Initialize current page
         self.total_pages = PageEnum.DEFAULT_TOTAL_PAGES.value # Initialize total pages
         self.filtered_results = None
+        self.prefetched_page = prefetched_page
+        self.running_query = None # QueryHandle of the query that the cancel button stops
+        self.page_loader = None # set by a view that pages its filter on the server (see show_filtered_page)
 
         self.init_ui()
         self.load_data()
@@ -156,6 +162,12 @@ class TableWidget(QWidget):
         self.refresh_btn.setObjectName("tablewidget-refresh-btn")
         self.refresh_btn.clicked.connect(self.reload_table)
 
+        # --------------- CANCEL BUTTON (ONLY SHOWN WHILE A QUERY IS RUNNING) ---------------------
+        self.cancel_query_btn = QPushButton("Cancel Query")
+        self.cancel_query_btn.setObjectName("tablewidget-cancel-query-btn")
+        self.cancel_query_btn.clicked.connect(self.cancel_running_query)
+        self.cancel_query_btn.hide()
+
         self.items_per_page_label = QLabel("Items per page:")
         self.items_per_page_label.setObjectName("table-widget-items-per-page-label")
 
@@ -165,6 +177,7 @@ class TableWidget(QWidget):
         self.pagination_layout.addWidget(self.items_per_page_label)
         self.pagination_layout.addWidget(self.items_per_page_combo)
         self.pagination_layout.addWidget(self.refresh_btn)
+        self.pagination_layout.addWidget(self.cancel_query_btn)
         
         # STRETCH IN THE FAR RIGHT OF THE SCREEN
         self.pagination_layout.addStretch()
@@ -191,12 +204,52 @@ class TableWidget(QWidget):
             
             self.matches_found.setText(match_string)
 
-            # ----------- INSERT THE MATCHES FOUND AFTER THE REFRESH BUTTON --------------
-            self.pagination_layout.insertWidget(3, self.matches_found)
+            # ----------- INSERT THE MATCHES FOUND AFTER THE REFRESH AND CANCEL BUTTONS --------------
+            self.pagination_layout.insertWidget(4, self.matches_found)
+
+    # ------------------------ RUNNING QUERY ------------------------
+    def begin_running_query(self, handle):
+        """Shows the cancel button for a query started by the view (app.repositories.QueryHandle)."""
+        self.running_query = handle
+        self.cancel_query_btn.setText("Cancel Query")
+        self.cancel_query_btn.setDisabled(False)
+        self.cancel_query_btn.show()
+
+    def end_running_query(self):
+        self.running_query = None
+        self.cancel_query_btn.hide()
+
+    def cancel_running_query(self):
+        if self.running_query is None:
+            return
+
+        # THE SERVER STOPS THE QUERY, THE VIEW GETS THE query_canceled ERROR (SEE show_query_canceled_message)
+        self.running_query.cancel()
+        self.cancel_query_btn.setText("Canceling...")
+        self.cancel_query_btn.setDisabled(True)
+
+    def show_query_canceled_message(self, canceled_by_user: bool = False):
+        if canceled_by_user:
+            StyledMessageBox.information(
+                self,
+                "Query Canceled",
+                "The search was canceled. The table still shows the previous results."
+            )
+            return
+
+        StyledMessageBox.warning(
+            self,
+            "Search Took Too Long",
+            f"The search was stopped after {statement_timeout_ms(self.view_type) / 1000:g} seconds.\n\n"
+            "Try narrowing the filter: use a shorter date range, pick a category or status, "
+            "or type a longer part of the reference number or production code."
+        )
 
     def reload_table(self):
         self.matches_found.setText("")
+        self.page_loader = None
         self.load_data()
+        self.reloaded.emit()
 
     def apply_styles(self):
         qss_path = os.path.join(os.path.dirname(__file__), "styles", "table.css")
@@ -205,6 +258,7 @@ class TableWidget(QWidget):
         button_cursor_pointer(self.next_btn)
         button_cursor_pointer(self.refresh_btn)
         button_cursor_pointer(self.finalize_btn)
+        button_cursor_pointer(self.cancel_query_btn)
 
         # -------------- Always show vertical scrollbar (existing) ----------------
         self.table.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
@@ -260,6 +314,9 @@ class TableWidget(QWidget):
                 for i in range(self.table.columnCount())
             ]
 
+            # NOTE: pandas (and openpyxl through to_excel) is only needed here, import on first export
+            import pandas as pd
+
             df = pd.DataFrame(data, columns=headers)
 
             # Export using pandas
@@ -299,14 +356,53 @@ class TableWidget(QWidget):
 
             self._set_color_for_failed_items(row_idx, record)
 
+    def _take_prefetched_page(self):
+        """Returns the prefetched first page once (later loads always query the database)"""
+        prefetched_page, self.prefetched_page = self.prefetched_page, None
+
+        if prefetched_page is None or self.current_page != PageEnum.DEFAULT_CURRENT_PAGE.value:
+            return None
+
+        total_items, records = prefetched_page
+
+        if len(records) > self.items_per_page:
+            return None
+
+        return total_items, records
+
+    @timed_slot
+    @instrumented_action()
     def load_data(self):
         """Load data from the endorsement_combined view with pagination."""
+        prefetched_page = self._take_prefetched_page()
+
+        if prefetched_page is not None and self.db_model.__tablename__ == "tbl_endorsement_t1":
+            total_items, results = prefetched_page
+            self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
+
+            self.table.setRowCount(len(results))
+            self.initiate_table_records(queryset=results)
+            self.update_pagination_controls()
+
+            return
+
         try:
             session = self.Session()
             model = self.db_model
 
+            # STOPS THE PAGE QUERIES OF THIS VIEW AFTER STATEMENT_TIMEOUT_MS_<VIEW> (UNTIL session.close())
+            timeout_ms = statement_timeout_ms(self.view_type)
+            if timeout_ms:
+                session.execute(statement_timeout_clause(timeout_ms))
+
+            query = session.query(model)
+
+            # SOFT DELETED ROWS ARE NEVER LISTED (SAME FILTER AS build_filter_statement, MATCHES THE PARTIAL INDEXES)
+            if hasattr(model, "is_deleted"):
+                query = query.filter(model.is_deleted == False)
+
             # Debug: Verify total count
-            total_items = session.query(model).count()
+            total_items = query.count()
             # print(f"Total items in view: {total_items}")  # Should match pgAdmin
             
             self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
@@ -319,7 +415,7 @@ class TableWidget(QWidget):
             # if model.__tablename__ == "endorsement_combined":
             if model.__tablename__ == "tbl_endorsement_t1":
                 # Get fresh results with explicit ordering
-                results = session.query(model)\
+                results = query\
                     .order_by(model.created_at.asc())\
                     .offset(offset).limit(limit).all()
 
@@ -333,6 +429,11 @@ class TableWidget(QWidget):
         
                 self.update_pagination_controls()
         except Exception as e:
+            if is_query_canceled(e):
+                print(f"Loading data timed out: {str(e)}")
+                self.show_query_canceled_message()
+                return
+
             print(f"Error loading data: {str(e)}")
             raise
         finally:
@@ -365,6 +466,24 @@ class TableWidget(QWidget):
         self.update_pagination_controls()
         self._add_matches_found(len(results))
 
+    def show_filtered_page(self, records, total_items: int):
+        """
+        Shows one page of a filter paged on the server by the view.
+
+        The view sets page_loader to a callable that loads self.current_page (offset/limit query)
+        and calls this method with the records and the total count of its filter, the other pages
+        are never loaded.
+        """
+        self.filtered_results = None
+        self.total_pages = max(1, (total_items + self.items_per_page - 1) // self.items_per_page)
+        self.current_page = min(self.current_page, self.total_pages)
+
+        self.table.setRowCount(len(records))
+        self.initiate_table_records(queryset=records)
+
+        self.update_pagination_controls()
+        self._add_matches_found(total_items)
+
     def _set_color_for_failed_items(self, row: int, record: Type[DeclarativeMeta]):
         if record.t_status and str(record.t_status).lower() == "failed":
             failed_text_color = QColor(255, 102, 102)
@@ -434,15 +553,22 @@ class TableWidget(QWidget):
             if warehouse_password == "test":
                 pass
 
+    def load_page(self):
+        # A FILTERED VIEW LOADS THE PAGE OF ITS FILTER, OTHERWISE THE WHOLE TABLE IS PAGED
+        if self.page_loader is not None:
+            self.page_loader()
+        else:
+            self.load_data()
+
     def prev_page(self):
         if self.current_page > 1:
             self.current_page -= 1
-            self.load_data()
+            self.load_page()
 
     def next_page(self):
         if self.current_page < self.total_pages:
             self.current_page += 1
-            self.load_data()
+            self.load_page()
 
     def update_pagination_controls(self):
         self.page_label.setText(f"Page {self.current_page} of {self.total_pages}")
@@ -452,4 +578,4 @@ class TableWidget(QWidget):
     def update_items_per_page(self):
         self.items_per_page = int(self.items_per_page_combo.currentText())
         self.current_page = PageEnum.DEFAULT_CURRENT_PAGE.value # Reset to first page when items per page changes
-        self.load_data()
\ No newline at end of file
+        self.load_page()
\ No newline at end of file
@@ -0,0 +1,6 @@
+from app.workers.connection_probe import ConnectionProbeThread
+from app.workers.startup_warmup import StartupWarmup
+from app.workers.db_heartbeat import DatabaseHeartbeat, get_database_heartbeat
+from app.workers.async_bridge import run_ui_task, on_loop, gather, get_async_loop
+from app.workers.combined_view_refresh import CombinedViewRefresher, get_combined_view_refresher
+from app.workers.deleted_rows_archiver import DeletedRowsArchiver, get_deleted_rows_archiver
@@ -0,0 +1,170 @@
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+
+import asyncio
+import contextvars
+import threading
+import traceback
+
+class AsyncLoopThread():
+    """
+    Runs one asyncio event loop in a daemon thread for the whole application.
+
+    Every AsyncEngine / AsyncSession is used on this loop only, the GUI thread
+    never runs asyncio code itself (see run_ui_task).
+    """
+    def __init__(self):
+        # psycopg 3 CANNOT RUN ON THE DEFAULT ProactorEventLoop OF WINDOWS
+        self.loop = asyncio.SelectorEventLoop()
+        self._thread = threading.Thread(target=self._run, name="asyncio-db-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine, context: contextvars.Context = None) -> Future:
+        """Schedules a coroutine on the loop, it runs with a copy of the caller context (e.g. the query tags)."""
+        context = context or contextvars.copy_context()
+        future = Future()
+
+        def start_task():
+            task = self.loop.create_task(coro, context=context)
+
+            def copy_result(done_task: asyncio.Task):
+                if done_task.cancelled():
+                    future.cancel()
+                elif done_task.exception() is not None:
+                    future.set_exception(done_task.exception())
+                else:
+                    future.set_result(done_task.result())
+
+            task.add_done_callback(copy_result)
+
+        self.loop.call_soon_threadsafe(start_task)
+
+        return future
+
+_loop_thread: Optional[AsyncLoopThread] = None
+_loop_lock = threading.Lock()
+
+def get_async_loop() -> AsyncLoopThread:
+    global _loop_thread
+
+    if _loop_thread is None:
+        with _loop_lock:
+            if _loop_thread is None:
+                _loop_thread = AsyncLoopThread()
+
+    return _loop_thread
+
+# ------------------------ AWAITABLES FOR THE GUI COROUTINES ------------------------
+class _OnLoop():
+    """Awaitable handed to run_ui_task: the wrapped coroutine runs on the asyncio loop thread."""
+    def __init__(self, coro: Coroutine):
+        self.coro = coro
+
+    def __await__(self):
+        result = yield self
+        return result
+
+def on_loop(coro: Coroutine) -> Awaitable:
+    """
+    Awaits a coroutine of the async data layer from a coroutine started with run_ui_task.
+
+    Example:
+        usernames = await on_loop(repository.list_usernames())
+    """
+    return _OnLoop(coro)
+
+def gather(*coros: Coroutine) -> Awaitable:
+    """Runs independent queries concurrently on the loop (each one should use its own session)."""
+    async def gather_on_loop():
+        return await asyncio.gather(*coros)
+
+    return _OnLoop(gather_on_loop())
+
+# ------------------------ GUI SIDE ------------------------
+class _UiTask():
+    def __init__(self, coro: Coroutine, on_error: Optional[Callable[[BaseException], None]]):
+        self.coro = coro
+        self.on_error = on_error
+        # THE CONTEXT (e.g. THE QUERY TAG OF instrumented_action) IS KEPT FOR EVERY STEP OF THE COROUTINE
+        self.context = contextvars.copy_context()
+
+class _UiDispatcher(QObject):
+    # EMITTED FROM THE LOOP THREAD, DELIVERED ON THE GUI THREAD
+    resume = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        # ALWAYS QUEUED, ALSO WHEN THE FUTURE IS ALREADY DONE AND THE CALLBACK RUNS ON THE GUI THREAD
+        self.resume.connect(self._on_resume, Qt.ConnectionType.QueuedConnection)
+
+    def _on_resume(self, ui_task: _UiTask, future: Future):
+        # NOTE: future.exception() RAISES CancelledError FOR A CANCELED FUTURE, AN EXCEPTION ESCAPING A SLOT ABORTS PyQt6.
+        # THE COROUTINE GETS A QueryCanceledError INSTEAD (SQLSTATE 57014, is_query_canceled() IS TRUE FOR IT)
+        if future.cancelled():
+            from app.repositories.async_repository import QueryCanceledError
+
+            ui_task.context.run(_step, ui_task, None, QueryCanceledError("The query was canceled on the asyncio loop"))
+            return
+
+        exception = future.exception()
+
+        if exception is not None:
+            ui_task.context.run(_step, ui_task, None, exception)
+        else:
+            ui_task.context.run(_step, ui_task, future.result(), None)
+
+_dispatcher: Optional[_UiDispatcher] = None
+
+def _step(ui_task: _UiTask, value: Any, exception: Optional[BaseException]) -> None:
+    try:
+        if exception is not None:
+            awaited = ui_task.coro.throw(exception)
+        else:
+            awaited = ui_task.coro.send(value)
+    except StopIteration:
+        return
+    except (Exception, asyncio.CancelledError) as e:
+        # CancelledError IS A BaseException, IT MUST NOT ESCAPE THE SLOT EITHER
+        if ui_task.on_error is not None:
+            ui_task.on_error(e)
+        else:
+            print(f"Error in UI task: {e}")
+            traceback.print_exc()
+        return
+
+    if not isinstance(awaited, _OnLoop):
+        _step(ui_task, None, TypeError(f"run_ui_task can only await on_loop()/gather(), got {awaited!r}"))
+        return
+
+    future = get_async_loop().submit(awaited.coro)
+    future.add_done_callback(lambda done: _dispatcher.resume.emit(ui_task, done))
+
+def run_ui_task(
+    coro: Coroutine,
+    on_error: Optional[Callable[[BaseException], None]] = None
+) -> None:
+    """
+    Runs a coroutine on the GUI thread (qasync-style) without blocking the event loop.
+
+    The code between two awaits runs on the GUI thread, so it may update the widgets.
+    Every `await on_loop(...)` / `await gather(...)` runs on the asyncio loop thread and
+    the coroutine resumes on the GUI thread once the result is ready.
+
+    Args:
+        coro (Coroutine): Coroutine of the view (e.g. self.load_user_directory()).
+        on_error (Callable, optional): Called on the GUI thread with an unhandled exception.
+            Defaults to printing the traceback.
+    """
+    global _dispatcher
+
+    # CREATED ON THE FIRST CALL, WHICH IS ALWAYS ON THE GUI THREAD
+    if _dispatcher is None:
+        _dispatcher = _UiDispatcher()
+
+    ui_task = _UiTask(coro, on_error)
+    ui_task.context.run(_step, ui_task, None, None)
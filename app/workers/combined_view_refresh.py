@@ -0,0 +1,116 @@
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from config.db import get_engine
+
+import os
+import threading
+import time
+import traceback
+
+# TABLES WHOSE CHANGES ARE VISIBLE IN THE endorsement_combined MATERIALIZED VIEW
+SOURCE_TABLES = ("tbl_endorsement_t1", "tbl_endorsement_t2")
+
+class CombinedViewRefresher():
+    """
+    Refreshes the endorsement_combined materialized view after the endorsement tables change.
+
+    request_refresh() only (re)starts a timer: a burst of saves causes one
+    REFRESH MATERIALIZED VIEW CONCURRENTLY once no save happened for debounce
+    seconds. The refresh runs on a daemon thread and never blocks readers
+    (CONCURRENTLY uses the unique index on (t_source_table, id)). A request
+    that arrives while a refresh is running schedules one more refresh.
+
+    Args:
+        debounce (float): Quiet seconds before the refresh. Defaults to COMBINED_VIEW_REFRESH_DEBOUNCE (2).
+    """
+    def __init__(self, debounce: float = None):
+        self.debounce = debounce if debounce is not None else float(os.getenv("COMBINED_VIEW_REFRESH_DEBOUNCE", 2))
+
+        self.refresh_count = 0
+        self.last_refresh_ms: Optional[float] = None
+
+        self._timer: Optional[threading.Timer] = None
+        self._running = False
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def request_refresh(self) -> None:
+        """Called after a commit that changed tbl_endorsement_t1 / tbl_endorsement_t2 (thread-safe)."""
+        with self._lock:
+            if self._running:
+                self._pending = True
+                return
+
+            if self._timer is not None:
+                self._timer.cancel()
+
+            self._timer = threading.Timer(self.debounce, self._refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _refresh(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._running = True
+
+        start = time.perf_counter()
+
+        try:
+            # CONCURRENTLY CANNOT RUN INSIDE A TRANSACTION BLOCK
+            with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY public.endorsement_combined"))
+
+            self.refresh_count += 1
+            self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            print(f"Refresh of endorsement_combined failed: {e}")
+            traceback.print_exc()
+        finally:
+            with self._lock:
+                self._running = False
+                pending, self._pending = self._pending, False
+
+            if pending:
+                self.request_refresh()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    # ------------------------ ORM SESSIONS ------------------------
+    def watch_sessions(self) -> None:
+        """Requests a refresh after every ORM commit that flushed endorsement rows (the psycopg writer calls request_refresh itself)."""
+        if event.contains(Session, "after_flush", self._after_flush):
+            return
+
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    def _after_flush(self, session, flush_context):
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            if getattr(instance, "__tablename__", None) in SOURCE_TABLES:
+                session.info["endorsement_combined_stale"] = True
+                return
+
+    def _after_commit(self, session):
+        if session.info.pop("endorsement_combined_stale", False):
+            self.request_refresh()
+
+    def _after_rollback(self, session):
+        session.info.pop("endorsement_combined_stale", None)
+
+# ------------------------ SINGLETON ------------------------
+_refresher = None
+
+def get_combined_view_refresher() -> CombinedViewRefresher:
+    global _refresher
+
+    if _refresher is None:
+        _refresher = CombinedViewRefresher()
+
+    return _refresher
@@ -0,0 +1,36 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+from config.db import check_connection, get_engine, get_prodcode_engine
+
+import time
+
+class ConnectionProbeThread(QThread):
+    """
+    Checks the connectivity of the main and prodcode databases off the GUI thread.
+
+    Emits probe_finished with a dictionary per database:
+        {
+            "main": {"connected": True, "error": None, "elapsed_ms": 12.3},
+            "prodcode": {"connected": False, "error": "...", "elapsed_ms": 5000.4}
+        }
+    """
+
+    probe_finished = pyqtSignal(dict)
+
+    def run(self):
+        result = {}
+
+        for name, get_db_engine in (("main", get_engine), ("prodcode", get_prodcode_engine)):
+            start = time.perf_counter()
+
+            try:
+                connected, error = check_connection(get_db_engine())
+            except Exception as e:
+                connected, error = False, str(e)
+
+            result[name] = {
+                "connected": connected,
+                "error": error,
+                "elapsed_ms": (time.perf_counter() - start) * 1000
+            }
+
+        self.probe_finished.emit(result)
@@ -0,0 +1,123 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+from sqlalchemy import text
+from config.db import get_engine, get_prodcode_engine, prodcode_db
+from collections import deque
+from typing import Dict, Optional
+
+import os
+import threading
+import time
+
+# ------------------------ HEALTH STATES ------------------------
+CONNECTED = "connected"
+DEGRADED = "degraded"
+DOWN = "down"
+
+class DatabaseHeartbeat(QThread):
+    """
+    Pings the main and prodcode databases every few seconds off the GUI thread.
+
+    Every round emits health_updated with a dictionary per database:
+        {
+            "main": {"state": "connected", "latency_ms": 4.1, "p50_ms": 3.9, "p95_ms": 8.2, "error": None},
+            "prodcode": {"state": "down", "latency_ms": None, "p50_ms": None, "p95_ms": None, "error": "..."}
+        }
+
+    state_changed(name, state) is only emitted on a transition, views connect to it
+    to pause their database polling while a database is down.
+    """
+
+    health_updated = pyqtSignal(dict)
+    state_changed = pyqtSignal(str, str)
+
+    def __init__(
+        self,
+        interval: float = None,
+        degraded_ms: float = None,
+        window: int = 30,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.interval = interval or float(os.getenv("DB_HEARTBEAT_INTERVAL", 10))
+        self.degraded_ms = degraded_ms or float(os.getenv("DB_HEARTBEAT_DEGRADED_MS", 500))
+
+        self.engines = {"main": get_engine}
+
+        # THE HOME ENVIRONMENT HAS NO PRODCODE DATABASE
+        if prodcode_db is not None:
+            self.engines["prodcode"] = get_prodcode_engine
+
+        self.latencies = {name: deque(maxlen=window) for name in self.engines}
+        self.states: Dict[str, Optional[str]] = {name: None for name in self.engines}
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def percentile(samples, pct: float) -> Optional[float]:
+        if not samples:
+            return None
+
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+
+        return round(ordered[index], 2)
+
+    def state(self, name: str) -> Optional[str]:
+        """Last known state of a database (None before the first ping or if it is not configured)."""
+        return self.states.get(name)
+
+    def is_down(self, name: str) -> bool:
+        return self.states.get(name) == DOWN
+
+    def ping(self, name: str) -> dict:
+        start = time.perf_counter()
+
+        try:
+            with self.engines[name]().connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            return {"state": DOWN, "latency_ms": None, "error": str(e)}
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.latencies[name].append(latency_ms)
+        p95_ms = self.percentile(self.latencies[name], 95)
+
+        return {
+            "state": DEGRADED if p95_ms > self.degraded_ms else CONNECTED,
+            "latency_ms": round(latency_ms, 2),
+            "error": None
+        }
+
+    def run(self):
+        self._stop_event.clear()
+
+        while not self._stop_event.is_set():
+            health = {}
+
+            for name in self.engines:
+                result = self.ping(name)
+                result["p50_ms"] = self.percentile(self.latencies[name], 50)
+                result["p95_ms"] = self.percentile(self.latencies[name], 95)
+                health[name] = result
+
+                if self.states[name] != result["state"]:
+                    self.states[name] = result["state"]
+                    self.state_changed.emit(name, result["state"])
+
+            self.health_updated.emit(health)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.wait()
+
+# ------------------------ SINGLETON ------------------------
+_heartbeat = None
+
+def get_database_heartbeat() -> DatabaseHeartbeat:
+    """Returns the heartbeat shared by the dashboard and the views (created on first call, not started)."""
+    global _heartbeat
+
+    if _heartbeat is None:
+        _heartbeat = DatabaseHeartbeat()
+
+    return _heartbeat
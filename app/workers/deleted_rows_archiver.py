@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from typing import Dict, Optional
+
+from config.db import get_engine
+from models import EndorsementModel, EndorsementModelT2, EndorsementLotExcessModel
+
+import os
+import threading
+import time
+import traceback
+
+# ------------------------ STATEMENTS ------------------------
+# The archive tables have the columns of the live table plus archived_at (migration e1b4d7c2a9f6).
+# The columns are named (from the models): a column added later to both tables lands at a different position.
+def archive_sql(model, where: str, join: str = "") -> text:
+    columns = [column.name for column in model.__table__.columns]
+    table = model.__tablename__
+
+    return text(
+        f"INSERT INTO {table}_archive ({', '.join(columns)}) "
+        f"SELECT {', '.join(f'{table}.{column}' for column in columns)} FROM {table} {join} WHERE {where}"
+    )
+
+# FOR UPDATE SKIP LOCKED: TWO CLIENTS RUNNING THE JOB AT THE SAME TIME TAKE DIFFERENT ROWS
+DELETED_PARENTS_SQL = text("""
+    SELECT t_id FROM tbl_endorsement_t1
+    WHERE is_deleted = true AND deleted_at < :cutoff
+    ORDER BY deleted_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+""")
+
+# DELETED LOTS OF ENDORSEMENTS THAT ARE STILL ACTIVE. THE LOTS OF A DELETED ENDORSEMENT ARE ONLY ARCHIVED WITH
+# THEIR PARENT (ARCHIVE_PARENTS_SQL): ANOTHER CLIENT ARCHIVING THE PARENT ONLY LOCKS THE t1 ROW, BOTH WOULD
+# INSERT THE SAME LOT IN tbl_endorsement_t2_archive
+DELETED_LOTS_SQL = text("""
+    SELECT t_id FROM tbl_endorsement_t2
+    WHERE is_deleted = true AND deleted_at < :cutoff
+      AND EXISTS (
+          SELECT 1 FROM tbl_endorsement_t1 t1
+          WHERE t1.t_id = tbl_endorsement_t2.t1_id
+            AND t1.t_date_endorsed = tbl_endorsement_t2.t_date_endorsed
+            AND NOT t1.is_deleted
+      )
+    ORDER BY deleted_at
+    LIMIT :batch_size
+    FOR UPDATE SKIP LOCKED
+""")
+
+ARCHIVE_PARENTS_SQL = (
+    archive_sql(EndorsementModel, "t_id = ANY(:ids)"),
+    archive_sql(EndorsementModelT2, "t1_id = ANY(:ids)"),
+    archive_sql(
+        EndorsementLotExcessModel,
+        "t2.t1_id = ANY(:ids)",
+        join=(
+            "JOIN tbl_endorsement_t2 t2 ON t2.t_id = tbl_endorsement_lot_excess.tbl_endorsement_t2_ref "
+            "AND t2.t_date_endorsed = tbl_endorsement_lot_excess.t2_date_endorsed"
+        )
+    ),
+    # ON DELETE CASCADE REMOVES THE LOTS AND THEIR EXCESS ROWS
+    text("DELETE FROM tbl_endorsement_t1 WHERE t_id = ANY(:ids)"),
+)
+
+ARCHIVE_LOTS_SQL = (
+    archive_sql(EndorsementModelT2, "t_id = ANY(:ids)"),
+    archive_sql(EndorsementLotExcessModel, "tbl_endorsement_t2_ref = ANY(:ids)"),
+    text("DELETE FROM tbl_endorsement_t2 WHERE t_id = ANY(:ids)"),
+)
+
+class DeletedRowsArchiver():
+    """
+    Moves soft deleted endorsement rows into the _archive tables.
+
+    A daemon thread runs the job every interval seconds (the first run is delayed so it
+    does not compete with the login warm-up). Rows deleted more than older_than_days ago
+    are moved in batches of batch_size, one short transaction per batch, so the live
+    tables and their indexes only keep the rows the application can show.
+
+    Args:
+        older_than_days (float): Defaults to ARCHIVE_DELETED_AFTER_DAYS (30), 0 turns the job off.
+        batch_size (int): Rows per transaction. Defaults to ARCHIVE_BATCH_SIZE (500).
+        interval (float): Seconds between runs. Defaults to ARCHIVE_INTERVAL (3600).
+        start_delay (float): Seconds before the first run. Defaults to 60.
+    """
+    def __init__(
+        self,
+        older_than_days: float = None,
+        batch_size: int = None,
+        interval: float = None,
+        start_delay: float = 60
+    ):
+        self.older_than_days = older_than_days if older_than_days is not None else float(os.getenv("ARCHIVE_DELETED_AFTER_DAYS", 30))
+        self.batch_size = batch_size or int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+        self.interval = interval or float(os.getenv("ARCHIVE_INTERVAL", 3600))
+        self.start_delay = start_delay
+
+        self.last_run: Optional[Dict[str, float]] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.older_than_days > 0
+
+    def start(self) -> "DeletedRowsArchiver":
+        if not self.enabled or self._thread is not None:
+            return self
+
+        self._thread = threading.Thread(target=self._run_forever, name="deleted-rows-archiver", daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run_forever(self) -> None:
+        delay = self.start_delay
+
+        while not self._stop_event.wait(delay):
+            delay = self.interval
+
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Archival of the deleted endorsements failed: {e}")
+                traceback.print_exc()
+
+    # ------------------------ JOB ------------------------
+    def run_once(self) -> Dict[str, float]:
+        """
+        Archives every row deleted before the cutoff, batch by batch.
+
+        Returns:
+            Dict: {"parents": archived endorsements, "lots": archived lots of active endorsements, "elapsed_ms": ...}
+        """
+        start = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.older_than_days)
+
+        parents = self._archive_batches(DELETED_PARENTS_SQL, ARCHIVE_PARENTS_SQL, cutoff)
+        lots = self._archive_batches(DELETED_LOTS_SQL, ARCHIVE_LOTS_SQL, cutoff)
+
+        self.last_run = {"parents": parents, "lots": lots, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+        if parents or lots:
+            # NOTE: endorsement_combined ONLY HAS ACTIVE ROWS, IT DOES NOT CHANGE AND IS NOT REFRESHED
+            print(f"Archived {parents} deleted endorsement(s) and {lots} deleted lot(s) in {self.last_run['elapsed_ms']:.0f} ms")
+
+        return self.last_run
+
+    def _archive_batches(self, select_ids, statements, cutoff: datetime) -> int:
+        archived = 0
+
+        while not self._stop_event.is_set():
+            with get_engine().begin() as connection:
+                ids = connection.execute(select_ids, {"cutoff": cutoff, "batch_size": self.batch_size}).scalars().all()
+
+                if not ids:
+                    break
+
+                for statement in statements:
+                    connection.execute(statement, {"ids": ids})
+
+            archived += len(ids)
+
+            if len(ids) < self.batch_size:
+                break
+
+        return archived
+
+# ------------------------ SINGLETON ------------------------
+_archiver = None
+
+def get_deleted_rows_archiver() -> DeletedRowsArchiver:
+    global _archiver
+
+    if _archiver is None:
+        _archiver = DeletedRowsArchiver()
+
+    return _archiver
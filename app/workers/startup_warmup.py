@@ -0,0 +1,220 @@
+from sqlalchemy.orm import Session, selectinload
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from app.helpers import fetch_current_t_refno_in_endorsement
+from app.repositories import get_prodcode_index
+from app.repositories.partitions import ensure_endorsement_partitions
+from config.db import get_engine, get_prodcode_engine
+from constants.Enums import PageEnum
+from models import EndorsementModel, User
+
+import threading
+import time
+import traceback
+
+class StartupWarmup():
+    """
+    Warm-up stage that runs between a successful login and the dashboard display.
+
+    Every step runs in parallel on a small thread pool the moment the credentials
+    are validated (while the welcome message box is still open). The dashboard
+    then reads the results with result() instead of running its first queries
+    serially on the GUI thread. A timing report of every step is printed once
+    all of them are finished.
+
+    Steps (names used with result()):
+        pool_connections: opens connections in both engine pools
+        user_directory: list of usernames for the 'Endorsed By' combo box
+        prodcode_index: loads the in-memory product code index
+        first_list_page: (total_items, records) of the first endorsement table page
+        next_refno: the reference number displayed on the create form
+        t2_partitions: creates the monthly partitions of tbl_endorsement_t2 ahead of time
+
+    Args:
+        session_factory (Callable[..., Session]): Factory function to create SQLAlchemy sessions.
+        items_per_page (int): Page size of the first table page.
+    """
+
+    def __init__(
+        self, 
+        session_factory: Callable[..., Session], 
+        items_per_page: int = PageEnum.ITEMS_PER_PAGE.value
+    ):
+        self.Session = session_factory
+        self.items_per_page = items_per_page
+
+        self.steps: Dict[str, Callable[[], Any]] = {
+            "pool_connections": self._open_pool_connections,
+            "user_directory": self._load_user_directory,
+            "prodcode_index": self._load_prodcode_index,
+            "first_list_page": self._load_first_list_page,
+            "next_refno": self._load_next_refno,
+            "t2_partitions": self._ensure_t2_partitions,
+        }
+        self.futures: Dict[str, Future] = {}
+        self.timings: Dict[str, Dict[str, Any]] = {}
+
+        self._executor = None
+        self._started_at = None
+        self._reported = False
+        self._lock = threading.Lock()
+
+    def start(self) -> "StartupWarmup":
+        """Submit every warm-up step. Returns immediately."""
+        self._started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.steps), 
+            thread_name_prefix="startup-warmup"
+        )
+
+        for name, step in self.steps.items():
+            self.futures[name] = self._executor.submit(self._run_step, name, step)
+
+        for future in list(self.futures.values()):
+            future.add_done_callback(self._on_step_done)
+
+        # THE THREADS EXIT ONCE THE SUBMITTED STEPS ARE FINISHED
+        self._executor.shutdown(wait=False)
+
+        return self
+
+    def result(self, name: str, timeout: Optional[float] = 10.0) -> Any:
+        """
+        Returns the value of a warm-up step, waiting for it if it is still running.
+
+        Returns None if the warm-up was not started, the step failed or timed out,
+        so callers can fall back to running the query themselves.
+        """
+        future = self.futures.get(name)
+
+        if future is None:
+            return None
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            print(f"Warm-up step '{name}' is still running, falling back to a direct query")
+        except Exception:
+            pass  # already reported in the timing report
+
+        return None
+
+    # ------------------------ STEP RUNNER AND REPORT ------------------------
+    def _run_step(self, name: str, step: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        error = None
+
+        try:
+            return step()
+        except Exception as e:
+            error = str(e)
+            traceback.print_exc()
+            
+            raise
+        finally:
+            with self._lock:
+                self.timings[name] = {
+                    "elapsed_ms": (time.perf_counter() - start) * 1000,
+                    "error": error,
+                }
+
+    def _on_step_done(self, _future: Future):
+        with self._lock:
+            if self._reported or len(self.futures) != len(self.steps):
+                return
+
+            if not all(future.done() for future in self.futures.values()):
+                return
+
+            self._reported = True
+
+        self.print_report()
+
+    def print_report(self):
+        total_ms = (time.perf_counter() - self._started_at) * 1000
+        border = "-" * 60
+
+        print(f"\n{border}\n STARTUP WARM-UP REPORT\n{border}")
+
+        with self._lock:
+            for name in self.steps:
+                timing = self.timings.get(name)
+
+                if timing is None:
+                    continue
+
+                status = "OK" if timing["error"] is None else f"FAILED ({timing['error'].splitlines()[0]})"
+                print(f" {name:<20} {timing['elapsed_ms']:>9.1f} ms   {status}")
+
+        print(f" {'total (wall clock)':<20} {total_ms:>9.1f} ms\n{border}\n")
+
+    # ------------------------ WARM-UP STEPS ------------------------
+    @staticmethod
+    def _open_pool_connections() -> int:
+        """Check out connections at the same time so the pool keeps them open for the dashboard."""
+        opened = 0
+        connections = []
+        main_engine = get_engine()
+
+        try:
+            for _ in range(max(1, min(main_engine.pool.size(), 3))):
+                connections.append(main_engine.connect())
+                opened += 1
+
+            try:
+                connections.append(get_prodcode_engine().connect())
+                opened += 1
+            except Exception as e:
+                # THE PRODCODE DATABASE IS OPTIONAL FOR THE DASHBOARD
+                print(f"Warm-up: prodcode database unavailable: {e}")
+        finally:
+            for connection in connections:
+                connection.close()
+
+        return opened
+
+    def _load_user_directory(self) -> list:
+        session = self.Session()
+
+        try:
+            return [username for (username,) in session.query(User.username).all()]
+        finally:
+            session.close()
+
+    @staticmethod
+    def _load_prodcode_index() -> int:
+        index = get_prodcode_index()
+        index.reload()
+
+        return len(index)
+
+    def _load_first_list_page(self) -> tuple:
+        session = self.Session()
+
+        try:
+            # SAME QUERY AS TableWidget.load_data (ACTIVE ROWS ONLY)
+            query = session.query(EndorsementModel).filter(EndorsementModel.is_deleted == False)
+            total_items = query.count()
+
+            # NOTE: t2 items are eager loaded because the records are used after the session is closed
+            records = query\
+                .options(selectinload(EndorsementModel.endorsement_t2_items))\
+                .order_by(EndorsementModel.created_at.asc())\
+                .limit(self.items_per_page).all()
+
+            return total_items, records
+        finally:
+            session.close()
+
+    def _load_next_refno(self) -> str:
+        session = self.Session()
+
+        try:
+            return fetch_current_t_refno_in_endorsement(session, EndorsementModel)
+        finally:
+            session.close()
+
+    @staticmethod
+    def _ensure_t2_partitions() -> int:
+        return len(ensure_endorsement_partitions())
@@ -1,9 +1,12 @@
 from sqlalchemy import create_engine
-from sqlalchemy.engine import URL
+from sqlalchemy.engine import URL, Engine
 from sqlalchemy.exc import OperationalError
 from dotenv import load_dotenv
+from typing import Callable, Dict, List, Optional, Tuple
+from config.pool import pool_options_from_env
 import os
 import sys
+import threading
 
 print("--- STARTING DB CONFIGURATION ---")
 
@@ -65,21 +68,142 @@ elif environment_value == "HOME":
         port=os.getenv("DB_PORT_HOME"),
         password=os.getenv("DB_PASSWORD_HOME")
     )
+    prodcode_db = None
 else:
     raise ValueError("Environment not valid.")
 
-if prodcode_db:
-    prodcode_engine = create_engine(prodcode_db)
+# SECONDS BEFORE A CONNECTION ATTEMPT IS ABANDONED (OTHERWISE A DOWN HOST BLOCKS FOR THE FULL TCP TIMEOUT)
+connect_timeout = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
 
-engine = create_engine(url)
-is_connected = None
-is_prodcode_connected = None
+# ---------------------------- LAZY ENGINES ----------------------------
+# NOTE: Nothing connects at import time anymore. The engines are created on first use
+# (create_engine itself does not open a connection) and the connectivity is checked by
+# check_connection() on a background thread after the login window is shown.
+_engine = None
+_prodcode_engine = None
+_async_engine = None
+_async_engine_hooks: List[Callable[[Engine], None]] = []
+_engine_lock = threading.Lock()
 
+def get_engine() -> Engine:
+    """Returns the engine of the main database (created on first call)."""
+    global _engine
 
-try:
-    with engine.connect() as conn:
-        is_connected = True
-    with prodcode_engine.connect() as prod_conn:
-        is_prodcode_connected = True    
-except OperationalError as e:
-    is_connected = str(e)
\ No newline at end of file
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # POOL SETTINGS COME FROM .env (DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING)
+                # pool_pre_ping AVOIDS THE STALE CONNECTION ERROR ON THE FIRST QUERY AFTER THE SERVER DROPS IDLE SESSIONS.
+                _engine = create_engine(
+                    url,
+                    **pool_options_from_env(),
+                    connect_args={"connect_timeout": connect_timeout}
+                )
+
+    return _engine
+
+def get_prodcode_engine() -> Engine:
+    """Returns the engine of the prodcode database 'dbinv' (created on first call)."""
+    global _prodcode_engine
+
+    if prodcode_db is None:
+        raise RuntimeError(f"Prodcode database is not configured for the '{environment_value}' environment.")
+
+    if _prodcode_engine is None:
+        with _engine_lock:
+            if _prodcode_engine is None:
+                # THE PRODCODE DATABASE IS ONLY READ FROM (LOOKUPS AND SEARCHES) SO A SMALL POOL IS ENOUGH.
+                # SAME VARIABLES AS THE MAIN ENGINE WITH THE _ALT_PRODCODE_DB SUFFIX
+                _prodcode_engine = create_engine(
+                    prodcode_db,
+                    **pool_options_from_env("_ALT_PRODCODE_DB", pool_size=2, max_overflow=3),
+                    connect_args={"connect_timeout": connect_timeout}
+                )
+
+    return _prodcode_engine
+
+def get_async_engine():
+    """
+    Returns the asyncio engine of the main database (created on first call).
+
+    Uses the psycopg 3 async driver on the same database and the same DB_POOL_* settings
+    as get_engine(). It must only be used on the loop of app.workers.async_bridge.
+    """
+    global _async_engine
+
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                # IMPORTED HERE, THE SYNC-ONLY STARTUP DOES NOT NEED THE ASYNCIO EXTENSION
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                # THE ASYNC ENGINE USES ITS OWN ASYNCIO-AWARE QUEUE POOL, NOT TimedQueuePool
+                pool_options = pool_options_from_env()
+                pool_options.pop("poolclass")
+
+                _async_engine = create_async_engine(
+                    url.set(drivername="postgresql+psycopg"),
+                    **pool_options,
+                    connect_args={"connect_timeout": connect_timeout}
+                )
+
+                # e.g. THE QUERY METRICS / SLOW QUERY LOG ENABLED AT STARTUP (BEFORE THE FIRST ASYNC QUERY)
+                for hook in _async_engine_hooks:
+                    hook(_async_engine.sync_engine)
+
+    return _async_engine
+
+def on_async_engine_created(hook: Callable[[Engine], None]) -> None:
+    """
+    Calls hook(sync_engine) of the asyncio engine once it exists, without creating it (a hook already pending is not added twice).
+
+    The engine events are listened to on AsyncEngine.sync_engine. If the engine was already
+    created the hook runs immediately, otherwise when get_async_engine() first creates it,
+    so the startup never imports sqlalchemy.ext.asyncio / psycopg just to instrument it.
+    """
+    with _engine_lock:
+        if _async_engine is None:
+            if hook not in _async_engine_hooks:
+                _async_engine_hooks.append(hook)
+            return
+
+    hook(_async_engine.sync_engine)
+
+def check_connection(db_engine: Engine) -> Tuple[bool, Optional[str]]:
+    """
+    Opens (and returns to the pool) one connection.
+
+    Returns:
+        Tuple[bool, Optional[str]]: (True, None) if connected, otherwise (False, error message)
+    """
+    try:
+        with db_engine.connect():
+            return True, None
+    except OperationalError as e:
+        return False, str(e)
+
+def get_pool_stats() -> Dict[str, dict]:
+    """
+    Returns the pool statistics of the engines that were already created.
+
+    Returns:
+        Dict[str, dict]: {"main": {...}, "prodcode": {...}} with checkouts, avg/max/last wait in ms,
+        size, in_use, overflow, timeouts and connect_failures. An engine that was never used is left out.
+    """
+    pool_stats = {}
+
+    for name, db_engine in (("main", _engine), ("prodcode", _prodcode_engine)):
+        if db_engine is not None and hasattr(db_engine.pool, "get_stats"):
+            pool_stats[name] = db_engine.pool.get_stats()
+
+    return pool_stats
+
+def __getattr__(name: str):
+    # KEEPS 'from config.db import engine, prodcode_engine' WORKING WITHOUT CREATING THE ENGINES AT IMPORT
+    if name == "engine":
+        return get_engine()
+    
+    if name == "prodcode_engine":
+        return get_prodcode_engine()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
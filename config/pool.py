@@ -0,0 +1,125 @@
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from typing import Dict
+import os
+import threading
+import time
+
+class PoolStats:
+    """
+    Thread-safe counters of the connection checkouts of one pool.
+
+    timeouts counts the checkouts that waited pool_timeout for a free connection (pool exhausted),
+    connect_failures the new connections the server refused or never answered (database down, bad credentials).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connect_failures = 0
+            self.total_wait_ms = 0.0
+            self.max_wait_ms = 0.0
+            self.last_wait_ms = 0.0
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.last_wait_ms = wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect_failure(self) -> None:
+        with self._lock:
+            self.connect_failures += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            avg_wait_ms = self.total_wait_ms / self.checkouts if self.checkouts else 0.0
+
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connect_failures": self.connect_failures,
+                "avg_wait_ms": round(avg_wait_ms, 2),
+                "max_wait_ms": round(self.max_wait_ms, 2),
+                "last_wait_ms": round(self.last_wait_ms, 2),
+            }
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long every checkout waited for a connection.
+
+    The wait includes opening a new connection when the pool is not full yet,
+    so a slow server shows up here as well as an exhausted pool.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            raise
+        except Exception:
+            # OPENING A NEW CONNECTION FAILED (e.g. THE HEARTBEAT WHILE THE SERVER IS DOWN), NOT AN EXHAUSTED POOL
+            self.stats.record_connect_failure()
+            raise
+
+        self.stats.record_checkout((time.perf_counter() - start) * 1000)
+
+        return connection
+
+    def recreate(self):
+        # engine.dispose() AND INVALIDATION RECREATE THE POOL, KEEP THE COUNTERS ACROSS IT
+        pool = super().recreate()
+        pool.stats = self.stats
+
+        return pool
+
+    def get_stats(self) -> Dict[str, float]:
+        """Returns the checkout counters together with the current pool usage."""
+        stats = self.stats.snapshot()
+        stats.update({
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "in_use": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+        })
+
+        return stats
+
+def pool_options_from_env(suffix: str = "", **defaults) -> dict:
+    """
+    Reads the create_engine() pool options from the environment.
+
+    Args:
+        suffix (str): Suffix of the variables, e.g. "_ALT_PRODCODE_DB" reads DB_POOL_SIZE_ALT_PRODCODE_DB.
+        **defaults: Values used when a variable is not set (pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping).
+
+    Returns:
+        dict: Keyword arguments for create_engine().
+    """
+    def env(name: str, default):
+        return os.getenv(f"{name}{suffix}", default)
+
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(env("DB_POOL_SIZE", defaults.get("pool_size", 5))),
+        "max_overflow": int(env("DB_POOL_MAX_OVERFLOW", defaults.get("max_overflow", 5))),
+        "pool_timeout": float(env("DB_POOL_TIMEOUT", defaults.get("pool_timeout", 10))),
+        "pool_recycle": int(env("DB_POOL_RECYCLE", defaults.get("pool_recycle", 1800))),
+        "pool_pre_ping": str(env("DB_POOL_PRE_PING", defaults.get("pool_pre_ping", True))).lower() in ("1", "true", "yes"),
+    }
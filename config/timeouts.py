@@ -0,0 +1,58 @@
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from typing import Optional
+import os
+
+# SQLSTATE OF query_canceled, RAISED FOR BOTH statement_timeout AND pg_cancel_backend()
+QUERY_CANCELED_SQLSTATE = "57014"
+
+# DEFAULT statement_timeout (ms) OF THE QUERIES OF EACH VIEW, 0 MEANS NO TIMEOUT.
+# OVERRIDE WITH STATEMENT_TIMEOUT_MS_<VIEW> IN .env, e.g. STATEMENT_TIMEOUT_MS_ENDORSEMENT_LIST=60000
+DEFAULT_STATEMENT_TIMEOUTS_MS = {
+    "endorsement-list": 30000,   # FILTERS CAN SPAN YEARS, STILL STOP BEFORE THE USER GIVES UP
+    "endorsement-create": 10000, # TABLE PAGE, CHECKS AND SAVE OF ONE ENDORSEMENT
+}
+
+def statement_timeout_ms(view_type: Optional[str] = None) -> int:
+    """
+    Returns the statement_timeout in milliseconds of the queries of a view.
+
+    Args:
+        view_type (str, optional): e.g. "endorsement-list". Reads STATEMENT_TIMEOUT_MS_ENDORSEMENT_LIST,
+            then the default of DEFAULT_STATEMENT_TIMEOUTS_MS, then STATEMENT_TIMEOUT_MS (15000).
+    """
+    default = int(os.getenv("STATEMENT_TIMEOUT_MS", 15000))
+
+    if not view_type:
+        return default
+
+    variable = f"STATEMENT_TIMEOUT_MS_{view_type.upper().replace('-', '_')}"
+
+    return int(os.getenv(variable, DEFAULT_STATEMENT_TIMEOUTS_MS.get(view_type, default)))
+
+def statement_timeout_clause(timeout_ms: int) -> TextClause:
+    """
+    Statement that sets the statement_timeout for the rest of the current transaction (like SET LOCAL).
+
+    SET cannot take bind parameters, set_config(..., true) can. Execute it first in the session,
+    the timeout is gone once the session commits, rolls back or is closed.
+    """
+    return text("SELECT set_config('statement_timeout', :timeout, true)").bindparams(timeout=f"{int(timeout_ms)}ms")
+
+def error_sqlstate(error: BaseException) -> Optional[str]:
+    """SQLSTATE of the error or of the DBAPI error it wraps (e.g. "57014"), None if there is none."""
+    while error is not None:
+        # psycopg 3 HAS .sqlstate, psycopg2 HAS .pgcode
+        sqlstate = getattr(error, "sqlstate", None) or getattr(error, "pgcode", None)
+
+        if sqlstate:
+            return sqlstate
+
+        # SQLAlchemy DBAPIError KEEPS THE DRIVER ERROR IN .orig
+        error = getattr(error, "orig", None) or error.__cause__
+
+    return None
+
+def is_query_canceled(error: BaseException) -> bool:
+    """True if the error (or the DBAPI error it wraps) is a statement timeout or a cancel request."""
+    return error_sqlstate(error) == QUERY_CANCELED_SQLSTATE
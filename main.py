@@ -1,24 +1,46 @@
-from config.db import is_connected, engine
+from config.db import get_engine
 from sqlalchemy.orm import sessionmaker
 from app.auth.login import LoginForm
 from PyQt6.QtWidgets import QApplication
-from config.pyqtConfig import print_connection_status, enforce_light_theme
+from config.pyqtConfig import enforce_light_theme
+from app.instrumentation import enable_query_metrics, enable_slow_query_log, EventLoopWatchdog
+from app.workers.combined_view_refresh import get_combined_view_refresher
+from app.workers.deleted_rows_archiver import get_deleted_rows_archiver
+import os
 import sys
 
 if __name__ == "__main__":
-    print_connection_status(is_connected, engine)
-    
-    if is_connected == True:
-        app = QApplication(sys.argv)
-        enforce_light_theme(app)
-
-        # load the login application here
-        session_factory = sessionmaker(engine)
-
-        login_view = LoginForm(session_factory=session_factory)
-        login_view.show()
-
-        sys.exit(app.exec())
-    else:
-        print("Database not connected")
-        sys.exit(1)
+    app = QApplication(sys.argv)
+    enforce_light_theme(app)
+
+    # REPORTS WHEN THE GUI THREAD IS BLOCKED (THE SUMMARY IS WRITTEN TO logs/ui_stalls.log ON EXIT)
+    if os.getenv("UI_WATCHDOG_ENABLED", "true").lower() in ("1", "true", "yes"):
+        watchdog = EventLoopWatchdog().start()
+        app.aboutToQuit.connect(watchdog.stop_and_report)
+
+    # load the login application here
+    # NOTE: sessionmaker does not connect, the connectivity is checked in the background by the login form
+    session_factory = sessionmaker(get_engine())
+
+    # QUERY METRICS CAN ALSO BE TOGGLED AT RUNTIME IN THE DASHBOARD (Ctrl+Shift+M)
+    # NOTE: THE ASYNC ENGINE IS NOT CREATED HERE, IT IS INSTRUMENTED WHEN THE FIRST ASYNC QUERY CREATES IT
+    if os.getenv("QUERY_METRICS_ENABLED", "false").lower() in ("1", "true", "yes"):
+        enable_query_metrics()
+
+    # SLOW STATEMENTS GO TO logs/slow_queries.log (SLOW_QUERY_THRESHOLD_MS=0 TURNS IT OFF)
+    if float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 500)) > 0:
+        enable_slow_query_log()
+
+    # ORM COMMITS THAT CHANGE THE ENDORSEMENT TABLES REFRESH THE endorsement_combined MATERIALIZED VIEW
+    get_combined_view_refresher().watch_sessions()
+    app.aboutToQuit.connect(get_combined_view_refresher().cancel)
+
+    # SOFT DELETED ROWS OLDER THAN ARCHIVE_DELETED_AFTER_DAYS ARE MOVED TO THE _archive TABLES (0 TURNS IT OFF)
+    archiver = get_deleted_rows_archiver().start()
+    app.aboutToQuit.connect(archiver.stop)
+
+    login_view = LoginForm(session_factory=session_factory)
+    login_view.show()
+    login_view.start_connection_probe()
+
+    sys.exit(app.exec())
@@ -6,7 +6,18 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('app', 'app'), ('config', 'config'), ('models', 'models'), ('alembic', 'alembic'), ('alembic.ini', '.'), ('.env', '.')],
-    hiddenimports=[],
+    # modules imported lazily (importlib / inside functions) are not always found by the analysis
+    hiddenimports=[
+        'app.dashboard.dashboard', 'app.auth.registration',
+        'app.views.QCFailedToPassed', 'app.views.QCLabExcess', 'app.views.ReceivingReport',
+        'app.views.DeliveryReceipt', 'app.views.ReturnReplacement', 'app.views.OutgoingRecord',
+        'app.views.RequisitionLogbook', 'app.views.QCFailedEndorsement',
+        'app.views.endorsement.EndorsementMainView',
+        'app.widgets.combobox', 'app.widgets.lineedits', 'app.widgets.tablewidget',
+        'app.widgets.dateedit', 'app.widgets.doubleSpinBox', 'app.widgets.checkbox', 'app.widgets.spinbox',
+        'app.repositories.async_repository', 'app.repositories.endorsement_writer', 'sqlalchemy.ext.asyncio', 'psycopg',
+        'pandas', 'openpyxl', 'qtawesome',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
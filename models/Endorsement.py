@@ -8,14 +8,51 @@ from sqlalchemy import (
     String, 
     Float, 
     func,
-    ForeignKey,
+    ForeignKeyConstraint,
+    UniqueConstraint,
+    Computed,
+    Index,
+    text,
 )
 from constants.Enums import CategoryEnum, StatusEnum
 from models import Base
 from sqlalchemy.orm import relationship
 
+# ------  GENERATED LOT NUMBER COLUMNS (see app.repositories.lot_numbers) ------
+# '1234AB-1240AB' -> lot_start_num 1234, lot_end_num 1240, lot_suffix 'AB'. A single lot has start = end.
+def lot_start_num_sql(column: str) -> str:
+    return f"(substring({column} from '^([0-9]{{4}})'))::integer"
+
+def lot_end_num_sql(column: str) -> str:
+    return f"(substring(COALESCE(NULLIF(split_part({column}, '-', 2), ''), {column}) from '^([0-9]{{4}})'))::integer"
+
+def lot_suffix_sql(column: str) -> str:
+    return f"substring(split_part({column}, '-', 1) from '^[0-9]{{4}}(.*)$')"
+
 class EndorsementModel(Base):
     __tablename__ = "tbl_endorsement_t1"
+    __table_args__ = (
+        # PARTIAL INDEXES: THE APP ONLY QUERIES THE ACTIVE ROWS (is_deleted = false)
+        Index(
+            "ix_tbl_endorsement_t1_lot_range",
+            "lot_suffix", "lot_start_num", "lot_end_num",
+            postgresql_where=text("is_deleted = false")
+        ),
+        Index("ix_tbl_endorsement_t1_date_endorsed_active", "t_date_endorsed", postgresql_where=text("is_deleted = false")),
+        Index("ix_tbl_endorsement_t1_created_at_active", "created_at", postgresql_where=text("is_deleted = false")),
+        # PREFIX SEARCH OF THE LIST VIEW (LIKE '1234A%', see app.repositories.lot_numbers.lot_prefix): THE UNIQUE
+        # INDEX OF t_lotnumberwhole USES THE DATABASE COLLATION AND CANNOT ANSWER A LIKE
+        Index(
+            "ix_tbl_endorsement_t1_lotnumberwhole_prefix",
+            "t_lotnumberwhole",
+            postgresql_ops={"t_lotnumberwhole": "text_pattern_ops"},
+            postgresql_where=text("is_deleted = false")
+        ),
+        # OLDEST DELETED ROWS FIRST FOR THE ARCHIVAL JOB (app.workers.deleted_rows_archiver)
+        Index("ix_tbl_endorsement_t1_deleted_at", "deleted_at", postgresql_where=text("is_deleted = true")),
+        # TARGET OF THE (t1_id, t_date_endorsed) FOREIGN KEY OF THE PARTITIONED tbl_endorsement_t2
+        UniqueConstraint("t_id", "t_date_endorsed", name="uq_tbl_endorsement_t1_id_date_endorsed"),
+    )
 
     t_id = Column(
         Integer(), 
@@ -51,6 +88,21 @@ class EndorsementModel(Base):
         unique=True,
         comment="Complete lot number (e.g., '1234AB' or '1234AB-5678CD'). Must be unique."
     ) 
+    lot_start_num = Column(
+        Integer,
+        Computed(lot_start_num_sql("t_lotnumberwhole"), persisted=True),
+        comment="Generated: first lot number of t_lotnumberwhole (1234 for '1234AB-1240AB')."
+    )
+    lot_end_num = Column(
+        Integer,
+        Computed(lot_end_num_sql("t_lotnumberwhole"), persisted=True),
+        comment="Generated: last lot number of t_lotnumberwhole (1240 for '1234AB-1240AB')."
+    )
+    lot_suffix = Column(
+        String,
+        Computed(lot_suffix_sql("t_lotnumberwhole"), persisted=True),
+        comment="Generated: letter suffix of t_lotnumberwhole ('AB' for '1234AB-1240AB')."
+    )
     t_qtykg = Column(
         Float, 
         nullable=False,
@@ -73,6 +125,13 @@ class EndorsementModel(Base):
         nullable=False,
         comment="Flag indicating if the quantity exceeds standard lot weights (partial lots)."
     )
+    # NOTE: WRITTEN BY THE TRIGGER OF tbl_endorsement_lot_excess (migration 7d2c5e8a3f14), NEVER BY THE APP
+    t_excess_kg = Column(
+        Float,
+        nullable=False,
+        server_default=text("0"),
+        comment="Sum of the tbl_endorsement_lot_excess amounts of the lots, kept by trigger."
+    )
     # t_bag_num = Column(Integer, nullable=True)
     t_endorsed_by = Column(
         String, 
@@ -87,9 +146,16 @@ class EndorsementModel(Base):
 
     is_deleted = Column(
         Boolean, 
+        nullable=False,
         default=False,
+        server_default=text("false"),
         comment="Soft delete flag. True indicates the record is marked for deletion."
     )
+    deleted_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Set by trigger when is_deleted becomes true, the archival job moves the row after ARCHIVE_DELETED_AFTER_DAYS."
+    )
     created_at = Column(
         DateTime(timezone=True), 
         server_default=func.now(),
@@ -102,14 +168,43 @@ class EndorsementModel(Base):
     )
 
     # REVERSE lookup for t2
+    # NOTE: JOINS ON (t1_id, t_date_endorsed), THE DATE LETS POSTGRES SCAN ONLY THE PARTITIONS OF THE LOADED PARENTS.
+    # passive_deletes LETS THE ON DELETE CASCADE OF THE DATABASE REMOVE THE LOTS
     endorsement_t2_items = relationship(
         "EndorsementModelT2", 
         back_populates="endorsement_parent", 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
 class EndorsementModelT2(Base):
+    """
+    Lots of an endorsement. The table is partitioned by month of t_date_endorsed
+    (migration c3e91a7f5d20), the partitions are created ahead by app.repositories.partitions.
+    """
     __tablename__ = "tbl_endorsement_t2"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["t1_id", "t_date_endorsed"],
+            ["tbl_endorsement_t1.t_id", "tbl_endorsement_t1.t_date_endorsed"],
+            name="tbl_endorsement_t2_t1_id_date_fkey",
+            ondelete="CASCADE",
+            onupdate="CASCADE"
+        ),
+        Index(
+            "ix_tbl_endorsement_t2_lot_range",
+            "lot_suffix", "lot_start_num", "lot_end_num",
+            postgresql_where=text("is_deleted = false")
+        ),
+        Index("ix_tbl_endorsement_t2_deleted_at", "deleted_at", postgresql_where=text("is_deleted = true")),
+        # DUPLICATE LOT CHECK OF THE SAVE (see EndorsementWriter.precheck), ONLY THE ACTIVE ROWS
+        Index(
+            "ix_tbl_endorsement_t2_lotnumbersingle_active",
+            "t_lotnumbersingle",
+            postgresql_where=text("is_deleted = false")
+        ),
+        {"postgresql_partition_by": "RANGE (t_date_endorsed)"},
+    )
 
     t_id = Column(
         Integer(), 
@@ -117,17 +212,44 @@ class EndorsementModelT2(Base):
         autoincrement=True,
         comment="Primary key identifier for the endorsement line item. Auto-increments."
     )
+    # THE PARTITION KEY IS PART OF THE PRIMARY KEY OF A PARTITIONED TABLE
+    t_date_endorsed = Column(
+        Date,
+        primary_key=True,
+        nullable=False,
+        comment="Copy of tbl_endorsement_t1.t_date_endorsed, partition key of the monthly partitions."
+    )
+    t1_id = Column(
+        Integer,
+        nullable=False,
+        index=True,
+        comment="Foreign key to tbl_endorsement_t1.t_id (integer join, replaces the t_refno foreign key)."
+    )
     t_refno = Column(
         String, 
-        ForeignKey("tbl_endorsement_t1.t_refno"), 
         nullable=False,
-        comment="Foreign key reference to the parent endorsement in tbl_endorsement_t1."
+        comment="Reference number of the parent endorsement (copy of tbl_endorsement_t1.t_refno, no longer a foreign key)."
     )
     t_lotnumbersingle = Column(
         String(10), 
         nullable=False,
         comment="Individual lot number (extracted from t_lotnumberwhole in parent). Max 10 chars."
     )
+    lot_start_num = Column(
+        Integer,
+        Computed(lot_start_num_sql("t_lotnumbersingle"), persisted=True),
+        comment="Generated: lot number of t_lotnumbersingle (1237 for '1237AB')."
+    )
+    lot_end_num = Column(
+        Integer,
+        Computed(lot_end_num_sql("t_lotnumbersingle"), persisted=True),
+        comment="Generated: same as lot_start_num (a single lot), kept for the shared range predicates."
+    )
+    lot_suffix = Column(
+        String,
+        Computed(lot_suffix_sql("t_lotnumbersingle"), persisted=True),
+        comment="Generated: letter suffix of t_lotnumbersingle ('AB' for '1237AB')."
+    )
     t_qty = Column(
         Float, 
         nullable=False,
@@ -140,9 +262,16 @@ class EndorsementModelT2(Base):
     )
     is_deleted = Column(
         Boolean, 
+        nullable=False,
         default=False,
+        server_default=text("false"),
         comment="Soft delete flag. True indicates the record is marked for deletion."
     )
+    deleted_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Set by trigger when is_deleted becomes true, the archival job moves the row after ARCHIVE_DELETED_AFTER_DAYS."
+    )
     t_remarks = Column(
         String(100), 
         nullable=True,
@@ -175,18 +304,33 @@ class EndorsementModelT2(Base):
         back_populates="lot",
         uselist=False,
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 class EndorsementLotExcessModel(Base):
     __tablename__ = "tbl_endorsement_lot_excess"
+    __table_args__ = (
+        # A FOREIGN KEY TO THE PARTITIONED tbl_endorsement_t2 MUST INCLUDE ITS PARTITION KEY
+        ForeignKeyConstraint(
+            ["tbl_endorsement_t2_ref", "t2_date_endorsed"],
+            ["tbl_endorsement_t2.t_id", "tbl_endorsement_t2.t_date_endorsed"],
+            name="tbl_endorsement_lot_excess_tbl_endorsement_t2_ref_fkey",
+            ondelete="CASCADE",
+            onupdate="CASCADE"
+        ),
+    )
 
     t_id = Column(Integer, primary_key=True, autoincrement=True)
     tbl_endorsement_t2_ref = Column(
         Integer,
-        ForeignKey("tbl_endorsement_t2.t_id"),
         nullable=False,
         unique=True  # ensures one-to-one mapping
     )
+    t2_date_endorsed = Column(
+        Date,
+        nullable=False,
+        comment="t_date_endorsed of the tbl_endorsement_t2 row (part of the foreign key to the partitioned table)."
+    )
     t_excess_amount = Column(
         Float,
         nullable=False
@@ -197,15 +341,57 @@ class EndorsementLotExcessModel(Base):
 
     lot = relationship("EndorsementModelT2", back_populates="lot_excess")
 
+# ------  DAILY ROLLUP (MAINTAINED BY THE DATABASE, NEVER WRITTEN BY THE APP) ------
+class EndorsementDailyRollupModel(Base):
+    """
+    Kg endorsed per day, prodcode, category and status of the active endorsements.
+
+    Kept up to date by the trigger trg_tbl_endorsement_t1_daily_rollup (migration 4a7f2e9c1b58),
+    read it through app.repositories.rollups instead of aggregating tbl_endorsement_t1.
+    """
+    __tablename__ = "endorsement_daily_rollup"
+    __table_args__ = (
+        Index("ix_endorsement_daily_rollup_prodcode_date", "t_prodcode", "t_date_endorsed"),
+    )
+
+    t_date_endorsed = Column(Date, primary_key=True)
+    t_prodcode = Column(String, primary_key=True)
+    t_category = Column(String, primary_key=True)
+    t_status = Column(String, primary_key=True)
+    total_kg = Column(
+        Float,
+        nullable=False,
+        server_default=text("0"),
+        comment="Sum of t_qtykg of the active endorsements."
+    )
+    excess_kg = Column(
+        Float,
+        nullable=False,
+        server_default=text("0"),
+        comment="Sum of t_excess_kg of the active endorsements."
+    )
+    endorsement_count = Column(
+        Integer,
+        nullable=False,
+        server_default=text("0"),
+        comment="Number of active endorsements."
+    )
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
 # ------  A SCHEMA FOR THE VIEW EXISTING ON THE DATABASE ------
 class EndorsementCombinedView(Base):
     """
     The columns here needs to match the views on the pg admin view
+
+    endorsement_combined is a MATERIALIZED VIEW (migration d5d3d06c7410), refreshed
+    concurrently a moment after the endorsement tables change (see app.workers.combined_view_refresh).
+    A row is identified by (t_source_table, id), the same columns as its unique index.
     """
     __tablename__ = "endorsement_combined"
     __table_args__ = {"schema": "public"}
 
-    id = Column(Integer, primary_key=True)  # <- synthetic primary key
+    id = Column(Integer, primary_key=True)  # t_id of the source table
+    t_source_table = Column(String, primary_key=True) # 'tbl_endorsement_t1' or 'tbl_endorsement_t2'
     t_refno = Column(String)
     t_lot_number = Column(String)
     t_date_endorsed = Column(Date)
@@ -216,5 +402,4 @@ class EndorsementCombinedView(Base):
     t_bag_num = Column(String)
     t_category = Column(String)
     t_has_excess = Column(Boolean)
-    t_source_table = Column(String)
     
\ No newline at end of file
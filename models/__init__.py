@@ -3,5 +3,11 @@ from sqlalchemy.orm import declarative_base
 # this will be used for the rest of the based on the models
 Base = declarative_base()
 
-from .Endorsement import EndorsementModel, EndorsementModelT2, EndorsementLotExcessModel, EndorsementCombinedView
+from .Endorsement import (
+    EndorsementModel, 
+    EndorsementModelT2, 
+    EndorsementLotExcessModel, 
+    EndorsementCombinedView, 
+    EndorsementDailyRollupModel
+)
 from .User import User, AuthLog
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Latency benchmark of the endorsement save: ORM round trips vs psycopg 3 pipeline mode.
+
+Starts a local TCP proxy in front of a (local, non-production) Postgres that delays every
+forwarded chunk by --delay-ms in both directions, then saves the same endorsements with:
+    orm       the previous save path (overlap query, duplicate lot query, session.add, commit, refno query)
+    pipeline  EndorsementWriter.precheck() + EndorsementWriter.save()
+
+The rows use reference numbers starting with BENCH- and are deleted at the end.
+
+Usage (from the project root, ENVIRONMENT=HOME pointing to a local database):
+    python scripts/benchmark_save_pipeline.py
+    python scripts/benchmark_save_pipeline.py --delay-ms 20 --saves 20 --lots 10
+"""
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from types import SimpleNamespace
+from typing import Callable, List
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config.db import url  # noqa: E402
+from app.helpers import populate_endorsement_items, fetch_current_t_refno_in_endorsement  # noqa: E402
+from app.repositories.endorsement_writer import EndorsementWriter, endorsement_rows  # noqa: E402
+from models import EndorsementModel, EndorsementModelT2, EndorsementLotExcessModel  # noqa: E402
+
+# ------------------------ DELAYING PROXY ------------------------
+class DelayProxy():
+    """TCP proxy that delivers every chunk delay_ms after it was received (order is kept)."""
+
+    def __init__(self, target_host: str, target_port: int, delay_ms: float):
+        self.target_host = target_host
+        self.target_port = target_port
+        self.delay = delay_ms / 1000
+        self.port = None
+        self._ready = threading.Event()
+
+    def start(self) -> int:
+        threading.Thread(target=lambda: asyncio.run(self._serve()), daemon=True).start()
+        self._ready.wait()
+
+        return self.port
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(self.target_host, self.target_port)
+
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer),
+            self._pipe(server_reader, client_writer),
+            return_exceptions=True
+        )
+
+    async def _pipe(self, reader, writer):
+        queue = asyncio.Queue()
+
+        async def deliver():
+            while True:
+                due, chunk = await queue.get()
+
+                if chunk is None:
+                    writer.close()
+                    return
+
+                await asyncio.sleep(max(0, due - time.monotonic()))
+                writer.write(chunk)
+                await writer.drain()
+
+        delivery = asyncio.create_task(deliver())
+
+        while True:
+            chunk = await reader.read(65536)
+            await queue.put((time.monotonic() + self.delay, chunk or None))
+
+            if not chunk:
+                break
+
+        await delivery
+
+# ------------------------ SAVE PATHS ------------------------
+def build_endorsement(lot_start: int, lots: int) -> EndorsementModel:
+    lot_number = f"{lot_start:04d}ZZ-{lot_start + lots - 1:04d}ZZ"
+    validated_data = SimpleNamespace(
+        t_refno=f"BENCH-{uuid.uuid4().hex[:10]}",
+        t_lotnumberwhole=lot_number,
+        t_qtykg=lots * 25.0 - 5.0,  # the last lot is an excess lot
+        t_wtlot=25.0,
+        t_bag_num=1,
+    )
+    endorsement = EndorsementModel(
+        t_refno=validated_data.t_refno,
+        t_date_endorsed=time.strftime("%Y-%m-%d"),
+        t_category="MB",
+        t_prodcode="BENCHMARK-PRODCODE",
+        t_lotnumberwhole=lot_number,
+        t_qtykg=validated_data.t_qtykg,
+        t_wtlot=validated_data.t_wtlot,
+        t_status="PASSED",
+        t_has_excess=True,
+        t_endorsed_by="benchmark",
+        is_deleted=False,
+    )
+    populate_endorsement_items(
+        endorsement_model=endorsement,
+        endorsement_model_t2=EndorsementModelT2,
+        endorsement_lot_excess_model=EndorsementLotExcessModel,
+        validated_data=validated_data,
+        category="MB",
+        has_excess=True
+    )
+
+    return endorsement
+
+def orm_save(Session: Callable, endorsement: EndorsementModel) -> None:
+    session = Session()
+
+    try:
+        lot_number = endorsement.t_lotnumberwhole
+        session.query(EndorsementModel.t_lotnumberwhole, EndorsementModel.t_prodcode).filter(
+            EndorsementModel.is_deleted == False,
+            EndorsementModel.t_lotnumberwhole != lot_number,
+            EndorsementModel.t_lotnumberwhole.contains("-")
+        ).all()
+        session.query(EndorsementModelT2).filter(EndorsementModelT2.t_lotnumbersingle == lot_number).first()
+
+        session.add(endorsement)
+        session.commit()
+
+        fetch_current_t_refno_in_endorsement(session, EndorsementModel)
+    finally:
+        session.close()
+
+def pipeline_save(writer: EndorsementWriter, endorsement: EndorsementModel) -> None:
+    writer.precheck(endorsement.t_lotnumberwhole)
+    t1_row, t2_rows = endorsement_rows(endorsement)
+    writer.save(t1_row, t2_rows)
+
+def cleanup(engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(
+            "DELETE FROM tbl_endorsement_lot_excess WHERE tbl_endorsement_t2_ref IN "
+            "(SELECT t_id FROM tbl_endorsement_t2 WHERE t_refno LIKE 'BENCH-%')"
+        ))
+        connection.execute(text("DELETE FROM tbl_endorsement_t2 WHERE t_refno LIKE 'BENCH-%'"))
+        connection.execute(text("DELETE FROM tbl_endorsement_t1 WHERE t_refno LIKE 'BENCH-%'"))
+
+def measure(label: str, save: Callable[[EndorsementModel], None], saves: int, lots: int, lot_base: int) -> List[float]:
+    timings = []
+
+    for index in range(saves):
+        endorsement = build_endorsement(lot_base + index * lots, lots)
+        start = time.perf_counter()
+        save(endorsement)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"{label:<10} median {statistics.median(timings):8.1f} ms   min {min(timings):8.1f} ms   max {max(timings):8.1f} ms")
+
+    return timings
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay-ms", type=float, default=10, help="one-way delay added by the proxy")
+    parser.add_argument("--saves", type=int, default=10)
+    parser.add_argument("--lots", type=int, default=10, help="t2 rows per endorsement")
+    args = parser.parse_args()
+
+    target_host = url.host or "localhost"
+    target_port = int(url.port or 5432)
+    proxy_port = DelayProxy(socket.gethostbyname(target_host), target_port, args.delay_ms).start()
+    proxied_url = url.set(host="127.0.0.1", port=proxy_port)
+
+    engine = create_engine(proxied_url)
+    Session = sessionmaker(engine)
+    writer = EndorsementWriter(proxied_url.set(drivername="postgresql").render_as_string(hide_password=False))
+
+    print(f"Proxy 127.0.0.1:{proxy_port} -> {target_host}:{target_port}, {args.delay_ms} ms each way, "
+          f"{args.saves} saves of {args.lots} lots\n")
+
+    try:
+        # WARM UP BOTH PATHS (CONNECTIONS, PREPARED STATEMENTS, MAPPER CONFIGURATION)
+        orm_save(Session, build_endorsement(9000, args.lots))
+        pipeline_save(writer, build_endorsement(9100, args.lots))
+
+        orm = measure("orm", lambda e: orm_save(Session, e), args.saves, args.lots, 1000)
+        pipeline = measure("pipeline", lambda e: pipeline_save(writer, e), args.saves, args.lots, 5000)
+
+        print(f"\nspeed-up: {statistics.median(orm) / statistics.median(pipeline):.1f}x")
+    finally:
+        cleanup(engine)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
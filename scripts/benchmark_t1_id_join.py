@@ -0,0 +1,180 @@
+"""
+Join and cascade benchmark: t2 -> t1 on the t_refno string vs the integer t1_id (migration b597257f8202).
+
+The live tables cannot be used for the comparison: t2.t_refno has had no index since
+9bf0ba2a631f (a seq scan against an index scan measures the index, not the key type) and
+every delete of t1 now runs the t1_id ON DELETE CASCADE. So both schemas are rebuilt as
+temporary copies of the current data, each with the index of its join key:
+    bench_*_refno   t2.t_refno indexed, plain foreign keys (the old schema, children deleted first)
+    bench_*_t1_id   t2.t1_id indexed, ON DELETE CASCADE foreign keys (the current schema)
+
+Runs each statement --repeat times and prints the median server execution time taken
+from EXPLAIN (ANALYZE) (network time is left out, the trigger time of the foreign keys is in):
+    join       every t2 row joined to its parent (what endorsement_combined does)
+    page       the t2 items of one page of parents (what selectinload does for the table)
+    cascade    deleting --parents endorsements with their lots and excess rows
+
+Everything runs in one transaction that is rolled back (the copies are ON COMMIT DROP),
+nothing is written to the database.
+
+Usage (from the project root, ENVIRONMENT=HOME pointing to a local, non-production database):
+    python scripts/benchmark_t1_id_join.py
+    python scripts/benchmark_t1_id_join.py --repeat 20 --parents 50
+"""
+from sqlalchemy import create_engine, text
+from typing import Dict, List
+
+import argparse
+import os
+import re
+import statistics
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config.db import url  # noqa: E402
+
+# ------------------------ SCRATCH SCHEMAS (SAME ROWS, ONE PER JOIN KEY) ------------------------
+COPY_SCHEMA_SQL = [
+    # OLD SCHEMA: t2 REFERENCES t1 BY t_refno, NO CASCADE (THE ORM DELETED THE CHILDREN FIRST)
+    "CREATE TEMP TABLE bench_t1_refno ON COMMIT DROP AS SELECT t_id, t_refno FROM tbl_endorsement_t1",
+    "ALTER TABLE bench_t1_refno ADD PRIMARY KEY (t_id), ADD UNIQUE (t_refno)",
+    """CREATE TEMP TABLE bench_t2_refno ON COMMIT DROP AS
+       SELECT t_id, t_refno, t_lotnumbersingle, t_qty, t_bag_num FROM tbl_endorsement_t2""",
+    "ALTER TABLE bench_t2_refno ADD PRIMARY KEY (t_id)",
+    "CREATE INDEX ON bench_t2_refno (t_refno)",
+    "ALTER TABLE bench_t2_refno ADD FOREIGN KEY (t_refno) REFERENCES bench_t1_refno (t_refno)",
+    """CREATE TEMP TABLE bench_excess_refno ON COMMIT DROP AS
+       SELECT t_id, tbl_endorsement_t2_ref, t_excess_amount FROM tbl_endorsement_lot_excess""",
+    "ALTER TABLE bench_excess_refno ADD PRIMARY KEY (t_id)",
+    "CREATE INDEX ON bench_excess_refno (tbl_endorsement_t2_ref)",
+    "ALTER TABLE bench_excess_refno ADD FOREIGN KEY (tbl_endorsement_t2_ref) REFERENCES bench_t2_refno (t_id)",
+
+    # CURRENT SCHEMA: t2 REFERENCES t1 BY t1_id, THE SERVER CASCADES THE DELETES
+    "CREATE TEMP TABLE bench_t1_t1_id ON COMMIT DROP AS SELECT t_id, t_refno FROM tbl_endorsement_t1",
+    "ALTER TABLE bench_t1_t1_id ADD PRIMARY KEY (t_id), ADD UNIQUE (t_refno)",
+    """CREATE TEMP TABLE bench_t2_t1_id ON COMMIT DROP AS
+       SELECT t_id, t1_id, t_lotnumbersingle, t_qty, t_bag_num FROM tbl_endorsement_t2""",
+    "ALTER TABLE bench_t2_t1_id ADD PRIMARY KEY (t_id)",
+    "CREATE INDEX ON bench_t2_t1_id (t1_id)",
+    "ALTER TABLE bench_t2_t1_id ADD FOREIGN KEY (t1_id) REFERENCES bench_t1_t1_id (t_id) ON DELETE CASCADE",
+    """CREATE TEMP TABLE bench_excess_t1_id ON COMMIT DROP AS
+       SELECT t_id, tbl_endorsement_t2_ref, t_excess_amount FROM tbl_endorsement_lot_excess""",
+    "ALTER TABLE bench_excess_t1_id ADD PRIMARY KEY (t_id)",
+    "CREATE INDEX ON bench_excess_t1_id (tbl_endorsement_t2_ref)",
+    "ALTER TABLE bench_excess_t1_id ADD FOREIGN KEY (tbl_endorsement_t2_ref) REFERENCES bench_t2_t1_id (t_id) ON DELETE CASCADE",
+
+    # AUTOVACUUM NEVER ANALYZES TEMPORARY TABLES, THE PLANNER NEEDS THE STATISTICS
+    "ANALYZE bench_t1_refno, bench_t2_refno, bench_excess_refno, bench_t1_t1_id, bench_t2_t1_id, bench_excess_t1_id",
+]
+
+STATEMENTS: Dict[str, Dict[str, str]] = {
+    "join": {
+        "t_refno": """
+            SELECT t1.t_id, sum(t2.t_qty) FROM bench_t1_refno t1
+            JOIN bench_t2_refno t2 ON t1.t_refno = t2.t_refno GROUP BY t1.t_id
+        """,
+        "t1_id": """
+            SELECT t1.t_id, sum(t2.t_qty) FROM bench_t1_t1_id t1
+            JOIN bench_t2_t1_id t2 ON t1.t_id = t2.t1_id GROUP BY t1.t_id
+        """,
+    },
+    "page": {
+        "t_refno": "SELECT * FROM bench_t2_refno WHERE t_refno = ANY(:refnos)",
+        "t1_id": "SELECT * FROM bench_t2_t1_id WHERE t1_id = ANY(:ids)",
+    },
+    # THE OLD SCHEMA DELETED THE CHILDREN FIRST, THE t_refno FOREIGN KEY IS STILL CHECKED ON THE t1 DELETE
+    "cascade": {
+        "t_refno": """
+            WITH lots AS (
+                SELECT t_id FROM bench_t2_refno WHERE t_refno = ANY(:refnos)
+            ), excess AS (
+                DELETE FROM bench_excess_refno WHERE tbl_endorsement_t2_ref IN (SELECT t_id FROM lots)
+            ), deleted_lots AS (
+                DELETE FROM bench_t2_refno WHERE t_id IN (SELECT t_id FROM lots)
+            )
+            SELECT 1
+        """,
+        "t1_id": "DELETE FROM bench_t1_t1_id WHERE t_id = ANY(:ids)",
+    },
+}
+
+# THE PARENTS OF THE OLD SCHEMA ARE DELETED IN A SECOND STATEMENT (A CTE CANNOT SEE THE CHILDREN DELETED
+# BY ANOTHER PART OF THE SAME STATEMENT, THE FOREIGN KEY WOULD REJECT IT), BOTH TIMES ARE ADDED
+REFNO_PARENTS_DELETE = "DELETE FROM bench_t1_refno WHERE t_refno = ANY(:refnos)"
+
+_EXECUTION_TIME = re.compile(r"Execution Time: ([\d.]+) ms")
+
+def execution_ms(connection, statement: str, parameters: dict) -> float:
+    plan = connection.execute(text(f"EXPLAIN (ANALYZE) {statement}"), parameters).scalars().all()
+
+    for line in reversed(plan):
+        match = _EXECUTION_TIME.search(line)
+
+        if match:
+            return float(match.group(1))
+
+    raise RuntimeError("EXPLAIN ANALYZE returned no execution time")
+
+def measure(connection, name: str, variant: str, statement: str, parameters: dict, repeat: int) -> List[float]:
+    timings = []
+
+    for _ in range(repeat):
+        # EVERY RUN IS ROLLED BACK TO A SAVEPOINT, THE NEXT ONE DELETES THE SAME ROWS AGAIN
+        savepoint = connection.begin_nested()
+
+        elapsed_ms = execution_ms(connection, statement, parameters)
+        if name == "cascade" and variant == "t_refno":
+            elapsed_ms += execution_ms(connection, REFNO_PARENTS_DELETE, parameters)
+
+        timings.append(elapsed_ms)
+        savepoint.rollback()
+
+    return timings
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--parents", type=int, default=20, help="endorsements in the page and cascade runs")
+    args = parser.parse_args()
+
+    engine = create_engine(url)
+
+    # ONE TRANSACTION FOR THE WHOLE RUN, ROLLED BACK ON EXIT (THE TEMPORARY COPIES GO WITH IT)
+    with engine.connect() as connection:
+        parents = connection.execute(text(
+            "SELECT t_id, t_refno FROM tbl_endorsement_t1 ORDER BY created_at DESC LIMIT :parents"
+        ), {"parents": args.parents}).all()
+
+        if not parents:
+            print("tbl_endorsement_t1 is empty, nothing to measure.")
+            return 1
+
+        print("Copying the endorsement tables into the two scratch schemas...")
+        for statement in COPY_SCHEMA_SQL:
+            connection.execute(text(statement))
+
+        lots = connection.execute(text("SELECT count(*) FROM bench_t2_t1_id")).scalar()
+        parameters = {"ids": [row.t_id for row in parents], "refnos": [row.t_refno for row in parents]}
+
+        print(f"{lots} lots, {len(parents)} parents per page/cascade run, {args.repeat} runs (median of EXPLAIN ANALYZE execution time)\n")
+
+        for name, variants in STATEMENTS.items():
+            medians = {}
+
+            for variant, statement in variants.items():
+                medians[variant] = statistics.median(measure(connection, name, variant, statement, parameters, args.repeat))
+
+            print(
+                f"{name:<8} t_refno {medians['t_refno']:8.2f} ms   t1_id {medians['t1_id']:8.2f} ms   "
+                f"speed-up {medians['t_refno'] / max(medians['t1_id'], 0.001):.1f}x"
+            )
+
+        connection.rollback()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
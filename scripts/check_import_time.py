@@ -0,0 +1,131 @@
+"""
+Import-time budget check for the application cold start.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter, sums the
+self time of every imported module and fails (exit code 1) if the total exceeds
+the budget or if a module that must stay lazy was imported. By default both the
+login form and main.py itself (everything it imports before the login window,
+e.g. the instrumentation and the background workers) are checked.
+
+Usage (from the project root):
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --module app.auth.login --budget-ms 600 --runs 5
+    python scripts/check_import_time.py --module main --module app.auth.login
+
+The budget can also be set with the IMPORT_TIME_BUDGET_MS environment variable.
+"""
+from typing import Dict, List, Tuple
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# EVERYTHING IMPORTED BEFORE THE LOGIN WINDOW IS SHOWN (main.py ALSO IMPORTS app.auth.login)
+DEFAULT_MODULES = ("app.auth.login", "main")
+DEFAULT_BUDGET_MS = 600
+
+# MODULES THAT ARE ONLY NEEDED AFTER LOGIN (OR ON A SPECIFIC ACTION) AND MUST NOT BE IMPORTED AT STARTUP
+LAZY_MODULES = (
+    "pandas",
+    "openpyxl",
+    "qtawesome",
+    "pydantic",
+    "app.dashboard.dashboard",
+    "app.auth.registration",
+    "app.widgets.tablewidget",
+    "app.views.endorsement.EndorsementMainView",
+    "app.repositories.async_repository",
+    "app.repositories.endorsement_writer",
+    # THE ASYNCIO ENGINE (AND ITS psycopg 3 DRIVER) IS ONLY CREATED BY THE FIRST ASYNC QUERY
+    "sqlalchemy.ext.asyncio",
+    "psycopg",
+)
+
+
+def run_importtime(module: str) -> List[Tuple[str, int, int]]:
+    """Returns (module name, self us, cumulative us) for every import of one cold interpreter run."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    entries = []
+
+    for line in completed.stderr.splitlines():
+        # import time:       self [us] |   cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return entries
+
+
+def check_module(module: str, args: argparse.Namespace) -> bool:
+    """Prints the import time of one module, returns True if it failed the check."""
+    totals_ms = []
+    last_run: Dict[str, Tuple[int, int]] = {}
+
+    for _ in range(args.runs):
+        entries = run_importtime(module)
+        totals_ms.append(sum(self_us for _, self_us, _ in entries) / 1000)
+        last_run = {name: (self_us, cumulative_us) for name, self_us, cumulative_us in entries}
+
+    total_ms = statistics.median(totals_ms)
+
+    print(f"\nImport time of '{module}': {total_ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print(f"\nSlowest {args.top} imports by cumulative time:")
+
+    slowest = sorted(last_run.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {cumulative_us / 1000:9.1f} ms  (self {self_us / 1000:7.1f} ms)  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in last_run]
+
+    if eager:
+        failed = True
+        print(f"\nFAILED ({module}): modules that must be imported lazily were imported at startup: {', '.join(eager)}")
+
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"\nFAILED ({module}): import time {total_ms:.1f} ms exceeds the budget of {args.budget_ms:.0f} ms")
+
+    return failed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help=f"module to import, repeatable (default: {', '.join(DEFAULT_MODULES)})")
+    parser.add_argument(
+        "--budget-ms", 
+        type=float, 
+        default=float(os.getenv("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS))
+    )
+    parser.add_argument("--runs", type=int, default=3, help="median of N runs is compared with the budget")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to print")
+    args = parser.parse_args()
+
+    failed = False
+
+    for module in args.module or DEFAULT_MODULES:
+        failed = check_module(module, args) or failed
+
+    if not failed:
+        print("\nOK")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Partition pruning check of the monthly partitions of tbl_endorsement_t2 (migration c3e91a7f5d20).
+
+Runs EXPLAIN (FORMAT JSON) on the queries the application scopes by endorsement date and
+fails (exit code 1) if a plan scans a partition outside the requested months:
+    month      lots of one month (date range of the list view)
+    day        lots of one day
+    lot        one lot by (t_id, t_date_endorsed), what the save updates
+    parents    the lots of a page of parents, joined on (t1_id, t_date_endorsed)
+
+Usage (from the project root, ENVIRONMENT=HOME pointing to a local database):
+    python scripts/check_partition_pruning.py
+    python scripts/check_partition_pruning.py --month 2026-10
+"""
+from datetime import date
+from sqlalchemy import create_engine, text
+from typing import Any, Dict, List, Set
+
+import argparse
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config.db import url  # noqa: E402
+
+PARTITION_PREFIX = "tbl_endorsement_t2_"
+
+STATEMENTS: Dict[str, str] = {
+    "month": """
+        SELECT * FROM tbl_endorsement_t2
+        WHERE t_date_endorsed >= :month_start AND t_date_endorsed < :month_end
+    """,
+    "day": "SELECT * FROM tbl_endorsement_t2 WHERE t_date_endorsed = :month_start",
+    "lot": "SELECT * FROM tbl_endorsement_t2 WHERE t_id = 1 AND t_date_endorsed = :month_start",
+    "parents": """
+        SELECT t2.* FROM tbl_endorsement_t1 t1
+        JOIN tbl_endorsement_t2 t2 ON t2.t1_id = t1.t_id AND t2.t_date_endorsed = t1.t_date_endorsed
+        WHERE t1.t_date_endorsed >= :month_start AND t1.t_date_endorsed < :month_end
+          AND t2.t_date_endorsed >= :month_start AND t2.t_date_endorsed < :month_end
+    """,
+}
+
+def scanned_relations(plan: Dict[str, Any]) -> Set[str]:
+    """Every relation name of the plan tree (Seq Scan, Index Scan, Bitmap Heap Scan ...)."""
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+
+    for child in plan.get("Plans", []):
+        relations |= scanned_relations(child)
+
+    return relations
+
+def month_partition(month_start: date) -> str:
+    return f"{PARTITION_PREFIX}{month_start:%Y_%m}"
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--month", default=date.today().strftime("%Y-%m"), help="month to query, YYYY-MM (default: current)")
+    args = parser.parse_args()
+
+    year, month = (int(part) for part in args.month.split("-"))
+    month_start = date(year, month, 1)
+    month_end = date(year + month // 12, month % 12 + 1, 1)
+    parameters = {"month_start": month_start, "month_end": month_end}
+    expected = month_partition(month_start)
+
+    engine = create_engine(url)
+
+    with engine.connect() as connection:
+        partitions: List[str] = connection.execute(text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits "
+            "WHERE inhparent = 'tbl_endorsement_t2'::regclass ORDER BY 1"
+        )).scalars().all()
+
+        if expected not in partitions:
+            print(f"Partition {expected} does not exist (run the app once or SELECT create_endorsement_t2_partition('{month_start}')).")
+            return 1
+
+        print(f"{len(partitions)} partitions of tbl_endorsement_t2, expecting only {expected} to be scanned\n")
+
+        failed = False
+
+        for name, statement in STATEMENTS.items():
+            plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {statement}"), parameters).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+
+            scanned = sorted(relation for relation in scanned_relations(plan[0]["Plan"]) if relation.startswith(PARTITION_PREFIX))
+            status = "OK" if scanned == [expected] else "FAILED"
+            failed = failed or status == "FAILED"
+
+            print(f"  {name:<8} {status:<7} scans {', '.join(scanned) or 'no partition'}")
+
+    print("\nOK" if not failed else "\nFAILED: a query scanned partitions outside the requested month")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())